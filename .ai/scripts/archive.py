@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Workflow Archive
+Packs finished workflows (completed features, closed bugs) into zip files
+under .ai/archive and removes them from the live tree, so scans only pay for
+active work.
+
+Every `pack` run writes new pack files (at most PACK_MAX_WORKFLOWS workflows
+each); packs are never modified afterwards. The zip central directory is
+each pack's own trailing index, and .ai/archive/index.sqlite maps (type,
+name) to the pack holding a workflow, so get-workflow-info and create-pr
+find archived workflows with one indexed lookup. The index can be rebuilt
+from the packs alone (`reindex`).
+
+Usage:
+  python archive.py pack                           # Archive completed features and closed bugs (JSON output)
+  python archive.py pack --older-than 30 --dry-run # Preview: only those not updated for 30 days
+  python archive.py pack --type idea --status shelved
+  python archive.py list                           # List archived workflows
+  python archive.py show my-feature                # Archive entry and files of one workflow
+  python archive.py restore my-feature             # Move a workflow back into the live tree
+  python archive.py reindex                        # Rebuild the index from the pack files
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("archive")
+
+try:
+    from config import cfg, read_global_state
+    from model import WorkflowState
+    from scanner import WORKFLOW_TYPES, load_entry, scan
+    import statefile
+    import timing
+except ImportError:
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
+
+
+ARCHIVE_DIRNAME = "archive"
+INDEX_FILENAME = "index.sqlite"
+SCHEMA_VERSION = 1
+
+# Types archived when --type is not given
+DEFAULT_TYPES = ("feature", "bug")
+
+# Workflows per pack file: opening a pack reads its whole central directory,
+# so bounded packs keep a read-through lookup constant-time
+PACK_MAX_WORKFLOWS = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS archived (
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pack TEXT NOT NULL,
+    status TEXT,
+    created TEXT,
+    updated TEXT,
+    archived TEXT NOT NULL,
+    PRIMARY KEY (type, name)
+);
+"""
+
+COLUMNS = ["type", "name", "pack", "status", "created", "updated", "archived"]
+
+
+def get_archive_path() -> Path:
+    """Get path to the .ai/archive folder."""
+    return cfg.get_features_path().parent / ARCHIVE_DIRNAME
+
+
+def get_index_path() -> Path:
+    """Get path to the archive index."""
+    return get_archive_path() / INDEX_FILENAME
+
+
+@dataclass(frozen=True)
+class ArchivedWorkflow:
+    """A workflow stored in a pack file."""
+    name: str
+    workflow_type: str
+    pack: Path
+    status: Optional[str] = None
+    updated: Optional[str] = None
+    archived: Optional[str] = None
+
+    @property
+    def prefix(self) -> str:
+        """Member name prefix of this workflow inside its pack."""
+        return f"{self.workflow_type}/{self.name}/"
+
+    def members(self) -> list:
+        """Paths of the workflow's files and folders, relative to its folder."""
+        import zipfile
+
+        with zipfile.ZipFile(self.pack) as zf:
+            return [
+                info.filename[len(self.prefix):]
+                for info in zf.infolist()
+                if info.filename.startswith(self.prefix) and info.filename != self.prefix
+            ]
+
+    def extract(self, dest: Path) -> Path:
+        """Extract the workflow into `dest`/<name> and return that folder."""
+        import zipfile
+
+        target = Path(dest) / self.name
+        target.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(self.pack) as zf:
+            for info in zf.infolist():
+                if not info.filename.startswith(self.prefix) or info.filename == self.prefix:
+                    continue
+                relative = info.filename[len(self.prefix):]
+                path = target.joinpath(*relative.rstrip("/").split("/"))
+                if info.is_dir():
+                    path.mkdir(parents=True, exist_ok=True)
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(info) as src, open(path, "wb") as dst:
+                    dst.write(src.read())
+        return target
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.workflow_type,
+            "pack": str(self.pack),
+            "status": self.status,
+            "updated": self.updated,
+            "archived": self.archived
+        }
+
+
+def connect(index_path: Path = None):
+    """Open the archive index, creating or rebuilding the schema as needed."""
+    import sqlite3
+
+    index_path = index_path or get_index_path()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(index_path))
+    conn.row_factory = sqlite3.Row
+
+    version = None
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        version = int(row[0]) if row else None
+    except sqlite3.OperationalError:
+        pass
+
+    if version != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS archived; DROP TABLE IF EXISTS meta;")
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+        # New or outdated index: the packs are the source of truth
+        _reindex(conn)
+
+    return conn
+
+
+def _from_row(row) -> ArchivedWorkflow:
+    """Build an ArchivedWorkflow from an index row."""
+    return ArchivedWorkflow(
+        name=row["name"],
+        workflow_type=row["type"],
+        pack=get_archive_path() / row["pack"],
+        status=row["status"],
+        updated=row["updated"],
+        archived=row["archived"]
+    )
+
+
+def lookup(name: str, types: tuple = WORKFLOW_TYPES) -> Optional[ArchivedWorkflow]:
+    """Find an archived workflow by name, checking types in order."""
+    if not get_archive_path().exists():
+        return None  # Nothing archived yet
+
+    conn = connect()
+    try:
+        rows = {
+            row["type"]: row
+            for row in conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM archived "
+                f"WHERE name = ? AND type IN ({', '.join('?' for _ in types)})",
+                (name, *types),
+            )
+        }
+    finally:
+        conn.close()
+
+    for workflow_type in types:
+        if workflow_type in rows:
+            return _from_row(rows[workflow_type])
+    return None
+
+
+@contextmanager
+def materialize(archived: ArchivedWorkflow) -> Iterator:
+    """
+    Extract an archived workflow into a temporary folder for the duration of
+    the block, yielding it as a scanner WorkflowEntry (read-only use).
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="ai-archive-") as tmp:
+        path = archived.extract(Path(tmp) / archived.workflow_type)
+        yield load_entry(archived.workflow_type, path)
+
+
+def _write_pack(pack_path: Path, entries: list) -> None:
+    """Write the workflow folders of `entries` into a new pack, atomically."""
+    import zipfile
+    from transaction import sync_enabled
+
+    tmp_path = pack_path.with_name(f".{pack_path.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as zf:
+                for entry in entries:
+                    prefix = f"{entry.workflow_type}/{entry.name}"
+                    zf.writestr(prefix + "/", b"")
+                    for dirpath, dirnames, filenames in os.walk(entry.path):
+                        dirnames.sort()
+                        relative = os.path.relpath(dirpath, entry.path)
+                        base = prefix if relative == "." else f"{prefix}/{relative.replace(os.sep, '/')}"
+                        for dirname in dirnames:
+                            zf.write(os.path.join(dirpath, dirname), f"{base}/{dirname}/")
+                        for filename in sorted(filenames):
+                            zf.write(os.path.join(dirpath, filename), f"{base}/{filename}")
+            if sync_enabled():
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, pack_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def _upsert(conn, rows: list) -> None:
+    """Point the index at the given rows (newer packs replace older ones)."""
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO archived ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+            [tuple(row[col] for col in COLUMNS) for row in rows],
+        )
+
+
+def pack(types: list = None, statuses: list = None, older_than: int = None,
+         dry_run: bool = False) -> dict:
+    """
+    Archive finished workflows: by default completed features and closed
+    bugs (see cleanup.get_completion_status); `statuses` overrides which
+    statuses count as finished. The current context is never archived.
+    """
+    from cleanup import get_completion_status, move_to_trash, select_workflows, start_reaper
+
+    types = list(types or DEFAULT_TYPES)
+    current = read_global_state().get('current') or {}
+
+    selected = []
+    skipped_current = None
+    for entry, state in select_workflows(scan(tuple(types), artifacts=False), types,
+                                         statuses, older_than):
+        if not statuses and state.status != get_completion_status(entry.workflow_type):
+            continue
+        if entry.name == current.get('name') and entry.workflow_type == current.get('workflow_type'):
+            skipped_current = entry.name
+            continue
+        selected.append((entry, state))
+
+    result = {
+        "status": "dry_run" if dry_run else "success",
+        "filters": {"type": types, "status": statuses or None, "older_than": older_than},
+        "selected": [
+            {
+                "name": entry.name,
+                "type": entry.workflow_type,
+                "status": state.status,
+                "updated": state.updated
+            }
+            for entry, state in selected
+        ],
+        "skipped_current_context": skipped_current,
+        "dry_run": dry_run
+    }
+
+    if dry_run or not selected:
+        result["packs"] = []
+        return result
+
+    archive_path = get_archive_path()
+    archive_path.mkdir(parents=True, exist_ok=True)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    archived_on = time.strftime(cfg.defaults.date_format)
+
+    # Pack first, then index, then remove: a crash leaves at worst a live
+    # folder that is also archived (live folders take precedence)
+    rows = []
+    result["packs"] = []
+    for start in range(0, len(selected), PACK_MAX_WORKFLOWS):
+        chunk = selected[start:start + PACK_MAX_WORKFLOWS]
+        pack_path = archive_path / f"pack-{stamp}-{start // PACK_MAX_WORKFLOWS:03d}.zip"
+        _write_pack(pack_path, [entry for entry, _ in chunk])
+        result["packs"].append({
+            "path": str(pack_path),
+            "workflows": len(chunk),
+            "bytes": pack_path.stat().st_size
+        })
+        rows.extend(
+            {
+                "type": entry.workflow_type,
+                "name": entry.name,
+                "pack": pack_path.name,
+                "status": _as_text(state.status),
+                "created": _as_text(state.created),
+                "updated": _as_text(state.updated),
+                "archived": archived_on
+            }
+            for entry, state in chunk
+        )
+
+    conn = connect()
+    try:
+        _upsert(conn, rows)
+    finally:
+        conn.close()
+
+    move_to_trash([
+        (entry.path, Path(entry.workflow_type) / entry.name)
+        for entry, _ in selected
+    ])
+
+    result["reaper_started"] = start_reaper()
+    return result
+
+
+def _as_text(value):
+    """Normalize YAML scalars to the strings stored in the index."""
+    return None if value is None else str(value)
+
+
+def list_archived(types: list = None) -> list:
+    """Every archived workflow, by type and name."""
+    if not get_archive_path().exists():
+        return []
+
+    sql = f"SELECT {', '.join(COLUMNS)} FROM archived"
+    params = []
+    if types:
+        sql += f" WHERE type IN ({', '.join('?' for _ in types)})"
+        params.extend(types)
+    sql += " ORDER BY type, name"
+
+    conn = connect()
+    try:
+        return [_from_row(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def restore(name: str, types: tuple = WORKFLOW_TYPES) -> dict:
+    """Extract an archived workflow back into the live tree."""
+    archived = lookup(name, types)
+    if archived is None:
+        return {"status": "error", "error": f"Workflow '{name}' is not archived"}
+
+    target = cfg.get_workflow_path(name, archived.workflow_type)
+    if target.exists():
+        return {"status": "error", "error": f"Workflow path already exists: {target}"}
+
+    # Extract next to the target, then rename into place
+    staging = target.parent / f".{name}.restore-{os.getpid()}"
+    try:
+        os.rename(archived.extract(staging), target)
+    finally:
+        import shutil
+        shutil.rmtree(staging, ignore_errors=True)
+
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "DELETE FROM archived WHERE type = ? AND name = ?",
+                (archived.workflow_type, name),
+            )
+    finally:
+        conn.close()
+
+    return {"status": "success", "restored": archived.to_dict(), "path": str(target)}
+
+
+def _reindex(conn) -> int:
+    """
+    Rebuild the index from the pack files (newer packs win). Workflows that
+    exist in the live tree are left out.
+    """
+    import zipfile
+
+    rows = {}
+    for pack_path in sorted(get_archive_path().glob("pack-*.zip")):
+        archived_on = time.strftime(cfg.defaults.date_format, time.localtime(pack_path.stat().st_mtime))
+        with zipfile.ZipFile(pack_path) as zf:
+            for member in zf.namelist():
+                parts = member.split("/")
+                if len(parts) != 3 or parts[2] != "state.yml":
+                    continue
+                if cfg.get_workflow_path(parts[1], parts[0]).exists():
+                    continue  # Restored (or recreated) in the live tree
+                try:
+                    state = WorkflowState.decode(statefile.loads(zf.read(member).decode("utf-8")))
+                except (UnicodeDecodeError, statefile.StateFileError):
+                    state = WorkflowState()
+                rows[(parts[0], parts[1])] = {
+                    "type": parts[0],
+                    "name": parts[1],
+                    "pack": pack_path.name,
+                    "status": _as_text(state.status),
+                    "created": _as_text(state.created),
+                    "updated": _as_text(state.updated),
+                    "archived": archived_on
+                }
+
+    with conn:
+        conn.execute("DELETE FROM archived")
+    _upsert(conn, list(rows.values()))
+    return len(rows)
+
+
+def reindex() -> dict:
+    """Rebuild the archive index from the pack files."""
+    conn = connect()
+    try:
+        count = _reindex(conn)
+    finally:
+        conn.close()
+    return {"status": "success", "index": str(get_index_path()), "archived": count}
+
+
+@timing.instrument("archive")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Archive finished workflows into pack files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    pack_parser = subparsers.add_parser("pack", help="Archive finished workflows")
+    pack_parser.add_argument("--type", action="append",
+                             help="Workflow type(s) to archive (default: feature, bug)")
+    pack_parser.add_argument("--status", action="append",
+                             help="Statuses to archive (default: completed features, closed bugs)")
+    pack_parser.add_argument("--older-than", type=int, metavar="DAYS",
+                             help="Only workflows whose 'updated' date is at least DAYS days ago")
+    pack_parser.add_argument("--dry-run", action="store_true",
+                             help="Preview what would be archived")
+
+    list_parser = subparsers.add_parser("list", help="List archived workflows")
+    list_parser.add_argument("--type", action="append", help="Workflow type(s) to list")
+
+    show_parser = subparsers.add_parser("show", help="Show one archived workflow")
+    show_parser.add_argument("name", help="Workflow name")
+
+    restore_parser = subparsers.add_parser("restore", help="Move a workflow back into the live tree")
+    restore_parser.add_argument("name", help="Workflow name")
+
+    subparsers.add_parser("reindex", help="Rebuild the index from the pack files")
+
+    args = parser.parse_args()
+
+    from cleanup import _split
+    types = _split(getattr(args, "type", None))
+    unknown = [t for t in types if t not in WORKFLOW_TYPES]
+    if unknown:
+        parser.error(f"unknown workflow type(s): {', '.join(unknown)}")
+
+    if args.action == "pack":
+        result = pack(types, _split(args.status), args.older_than, args.dry_run)
+    elif args.action == "list":
+        archived = list_archived(types)
+        result = {
+            "status": "success",
+            "count": len(archived),
+            "workflows": [item.to_dict() for item in archived]
+        }
+    elif args.action == "show":
+        archived = lookup(args.name)
+        if archived is None:
+            result = {"status": "error", "error": f"Workflow '{args.name}' is not archived"}
+        else:
+            result = {"status": "success", "workflow": archived.to_dict(), "files": archived.members()}
+    elif args.action == "restore":
+        result = restore(args.name)
+    else:
+        result = reindex()
+
+    print(json.dumps(result, indent=2))
+    if result["status"] == "error":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmarks for the workflow scripts (run from .ai/scripts, e.g. `python -m bench.yaml_backends`)."""
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Contention Stress Harness
+Runs N concurrent worker processes against one shared synthetic workspace
+(see bench.workspace), the way several agent sessions share a repository,
+and checks the result against the operations log.
+
+Each worker applies a random mix of transitions through the scripts' own
+entry points (in-process main() calls, or a fresh `run.py` process per
+operation with --cli):
+
+  start-phase     update-plan-state <shared feature> start-phase <k>
+  set-current     set-current <shared workflow> --type <type>
+  init-workflow   init-workflow <new feature> (which also sets it current)
+
+Phase numbers are never shared between workers, and every phase starts out
+"pending". So a phase that a successful start-phase logged but that is not
+"in-progress" at the end is a lost update: another writer's read-modify-write
+overwrote it. Reader processes keep parsing global-state.yml and the shared
+plan-state.yml files while the workers run, and count torn or missing files.
+After the run every state file is parsed once more, the current context
+must be one that some operation wrote, and every created workflow must exist.
+
+The report has throughput, per-command latency percentiles and the
+consistency checks. --history appends a one-line summary to a JSONL file, so
+runs can be tracked over time. The exit status is 1 when any check fails.
+
+Usage:
+  python -m bench.contention                               # 8 workers x 100 operations (JSON output)
+  python -m bench.contention --workers 16 --ops 200 --readers 2
+  python -m bench.contention --cli --workers 4 --ops 25    # One process per operation
+  python -m bench.contention --history                     # Append to bench/baselines/contention.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+DEFAULT_WORKERS = 8
+DEFAULT_OPS = 100
+DEFAULT_READERS = 1
+DEFAULT_SHARED_FEATURES = 2
+DEFAULT_HISTORY = os.path.join(SCRIPTS_DIR, "bench", "baselines", "contention.jsonl")
+
+# Operation mix: (operation, weight)
+DEFAULT_MIX = (("start-phase", 70), ("set-current", 20), ("init-workflow", 10))
+
+LOG_DIRNAME = ".bench-log"
+START_DELAY = 0.5  # seconds between launching workers and the common start time
+MAX_EXAMPLES = 10
+
+WORKER_ENV = {
+    "AI_WORKFLOW_NO_DAEMON": "1",
+    "AI_WORKFLOW_NO_FSYNC": "1",
+    "AI_WORKFLOW_NO_TRACE": "1",
+}
+
+
+# Worker side: runs inside the workspace
+
+def _plan_operations(worker: int, workers: int, ops: int, seed: int, shared: list) -> list:
+    """The (operation, command, argv) list of one worker, drawn from its own RNG."""
+    rng = random.Random(seed * 1000003 + worker)
+    names = [name for name, _ in DEFAULT_MIX]
+    weights = [weight for _, weight in DEFAULT_MIX]
+    next_phase = {feature: worker + 1 for feature in shared}
+
+    operations = []
+    for seq in range(ops):
+        operation = rng.choices(names, weights)[0]
+        if operation == "start-phase":
+            feature = rng.choice(shared)
+            # Phases w+1, w+1+N, w+1+2N, ... belong to worker w alone
+            phase = next_phase[feature]
+            next_phase[feature] += workers
+            operations.append((operation, "update-plan-state", [feature, "start-phase", str(phase)]))
+        elif operation == "set-current":
+            operations.append((operation, "set-current", [rng.choice(shared), "--type", "feature"]))
+        else:
+            name = f"stress-w{worker}-{seq}"
+            operations.append((operation, "init-workflow", [name, "Contention stress workflow", "--type", "feature"]))
+    return operations
+
+
+def _run_in_process(modules: dict, command: str, argv: list) -> tuple:
+    """Run a script's main() with argv; returns (exit code, captured output)."""
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    import config
+    from run import COMMANDS, load_command
+
+    # Each operation reads the files fresh, like a separate process would
+    config._parse_cache.clear()
+    module = modules.get(command)
+    if module is None:
+        module = modules[command] = load_command(command)
+
+    output = io.StringIO()
+    sys.argv = [os.path.join(SCRIPTS_DIR, COMMANDS[command])] + argv
+    code = 0
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            module.main()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            print(f"{type(e).__name__}: {e}")
+            code = 1
+    return code, output.getvalue()
+
+
+def _run_cli(command: str, argv: list) -> tuple:
+    """Run a script in a fresh `run.py` process; returns (exit code, output)."""
+    import subprocess
+
+    completed = subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "run.py"), command, *argv],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    return completed.returncode, completed.stdout
+
+
+def run_worker(worker: int, workers: int, ops: int, seed: int, shared: list,
+               start_at: float, cli: bool) -> None:
+    """Apply this worker's operations and write them to its log."""
+    operations = _plan_operations(worker, workers, ops, seed, shared)
+    modules = {}
+    log_path = os.path.join(LOG_DIRNAME, f"worker-{worker}.jsonl")
+
+    time.sleep(max(0.0, start_at - time.time()))
+    with open(log_path, "w", encoding="utf-8") as log:
+        for seq, (operation, command, argv) in enumerate(operations):
+            started = time.perf_counter()
+            if cli:
+                code, output = _run_cli(command, argv)
+            else:
+                code, output = _run_in_process(modules, command, argv)
+            latency = (time.perf_counter() - started) * 1000
+            log.write(json.dumps({
+                "worker": worker,
+                "seq": seq,
+                "operation": operation,
+                "command": command,
+                "argv": argv,
+                "code": code,
+                "latency_ms": round(latency, 3),
+                "end": time.time(),
+                "error": output.strip()[-300:] if code else None,
+            }) + "\n")
+
+
+def run_reader(shared: list, start_at: float, stop_file: str) -> None:
+    """Parse the shared state files until the stop file appears; print counts."""
+    import statefile
+    from config import cfg
+
+    paths = [cfg.get_global_state_path()] + [
+        cfg.get_workflow_path(feature, "feature") / "implementation-plan" / "plan-state.yml"
+        for feature in shared
+    ]
+    reads = torn = missing = 0
+    examples = []
+
+    time.sleep(max(0.0, start_at - time.time()))
+    while not os.path.exists(stop_file):
+        for path in paths:
+            reads += 1
+            try:
+                data = statefile.load(path)
+                if not data:
+                    raise statefile.StateFileError("empty document")
+            except FileNotFoundError:
+                missing += 1
+            except Exception as e:
+                torn += 1
+                if len(examples) < MAX_EXAMPLES:
+                    examples.append(f"{path}: {type(e).__name__}: {e}")
+    print(json.dumps({"reads": reads, "torn": torn, "missing": missing, "examples": examples}))
+
+
+# Runner side
+
+def _prepare_workspace(root: str, workers: int, ops: int, shared_count: int) -> list:
+    """Generate the workspace and reset the shared plans to all-pending phases."""
+    from pathlib import Path
+
+    import statefile
+    from bench.workspace import generate, workflow_name
+    from bench.yaml_backends import make_plan_state
+
+    generate(root, workflows=max(10, shared_count * 2), phases=5, prd_kb=4, request_kb=2)
+
+    shared = [workflow_name("feature", index) for index in range(shared_count)]
+    plan = make_plan_state(workers * ops)
+    plan["status"] = "in-progress"
+    plan["current_phase"] = 0
+    for phase in plan["phases"]:
+        phase.update(status="pending", started=None, completed=None)
+    for feature in shared:
+        statefile.dump(Path(root, ".ai", "features", feature, "implementation-plan", "plan-state.yml"), plan)
+
+    os.makedirs(os.path.join(root, LOG_DIRNAME))
+    return shared
+
+
+def _latency(values: list) -> dict:
+    from timing import percentile
+
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def check_consistency(root: str, records: list, shared: list) -> dict:
+    """Compare the final workspace with the operations log."""
+    from pathlib import Path
+
+    import statefile
+
+    ai = Path(root, ".ai")
+    lost = []
+    parse_errors = []
+
+    def load(path):
+        try:
+            return statefile.load(path)
+        except Exception as e:
+            parse_errors.append(f"{path.relative_to(root)}: {type(e).__name__}: {e}")
+            return None
+
+    plans = {}
+    for feature in shared:
+        plans[feature] = load(ai / "features" / feature / "implementation-plan" / "plan-state.yml")
+
+    ok = [record for record in records if record["code"] == 0]
+    for record in ok:
+        if record["operation"] != "start-phase":
+            continue
+        feature, _, phase = record["argv"]
+        plan = plans.get(feature)
+        if plan is None:
+            continue
+        status = plan["phases"][int(phase) - 1].get("status")
+        if status != "in-progress":
+            lost.append({"worker": record["worker"], "seq": record["seq"], "feature": feature,
+                         "phase": int(phase), "final_status": status})
+
+    # Every created workflow must exist with a readable state.yml
+    missing_workflows = []
+    for record in ok:
+        if record["operation"] == "init-workflow":
+            state_path = ai / "features" / record["argv"][0] / "state.yml"
+            if not state_path.exists():
+                missing_workflows.append(record["argv"][0])
+            else:
+                load(state_path)
+
+    # The current context must be one that some operation wrote
+    written = {(record["argv"][0], "feature") for record in ok
+               if record["operation"] in ("set-current", "init-workflow")}
+    global_state = load(ai / "memory" / "global-state.yml") or {}
+    current = global_state.get("current") or {}
+    final_context = (current.get("name"), current.get("workflow_type"))
+    context_ok = not written or final_context in written
+
+    for path in ai.glob("*/*/state.yml"):
+        load(path)
+
+    return {
+        "lost_updates": len(lost),
+        "lost_update_examples": lost[:MAX_EXAMPLES],
+        "missing_workflows": missing_workflows[:MAX_EXAMPLES],
+        "final_parse_errors": parse_errors[:MAX_EXAMPLES],
+        "final_context": {"name": final_context[0], "workflow_type": final_context[1]},
+        "final_context_ok": context_ok,
+    }
+
+
+def run_stress(workers: int, ops: int, readers: int, shared_count: int, seed: int,
+               cli: bool, keep: bool) -> dict:
+    """Run one stress round in a fresh workspace and build the report."""
+    import shutil
+    import subprocess
+    import tempfile
+
+    root = tempfile.mkdtemp(prefix="ai-contention-")
+    try:
+        shared = _prepare_workspace(root, workers, ops, shared_count)
+        script = os.path.join(root, ".ai", "scripts", "bench", "contention.py")
+        env = dict(os.environ, **WORKER_ENV)
+        start_at = time.time() + START_DELAY + 0.05 * workers
+        stop_file = os.path.join(root, LOG_DIRNAME, "stop")
+        common = ["--seed", str(seed), "--start-at", repr(start_at), "--shared", *shared]
+
+        reader_procs = [
+            subprocess.Popen([sys.executable, script, "--reader", "--stop-file", stop_file, *common],
+                             cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            for _ in range(readers)
+        ]
+        worker_procs = [
+            subprocess.Popen([sys.executable, script, "--worker", str(worker), "--workers", str(workers),
+                              "--ops", str(ops), *(["--cli"] if cli else []), *common],
+                             cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            for worker in range(workers)
+        ]
+        worker_errors = [proc.communicate()[1].strip()[-500:] for proc in worker_procs]
+        wall = time.time() - start_at
+
+        open(stop_file, "w").close()
+        reads = {"reads": 0, "torn": 0, "missing": 0, "examples": []}
+        for proc in reader_procs:
+            out, _ = proc.communicate()
+            try:
+                counts = json.loads(out)
+            except ValueError:
+                continue
+            for key in ("reads", "torn", "missing"):
+                reads[key] += counts[key]
+            reads["examples"] += counts["examples"]
+
+        records = []
+        for worker in range(workers):
+            try:
+                with open(os.path.join(root, LOG_DIRNAME, f"worker-{worker}.jsonl"), encoding="utf-8") as f:
+                    records += [json.loads(line) for line in f if line.strip()]
+            except OSError:
+                pass
+
+        consistency = check_consistency(root, records, shared)
+        failed = [record for record in records if record["code"] != 0]
+        by_command = {}
+        for record in records:
+            by_command.setdefault(record["operation"], []).append(record["latency_ms"])
+
+        crashed = [error for error in worker_errors if error]
+        consistent = (
+            consistency["lost_updates"] == 0
+            and not consistency["missing_workflows"]
+            and not consistency["final_parse_errors"]
+            and consistency["final_context_ok"]
+            and reads["torn"] == 0
+            and reads["missing"] == 0
+        )
+        report = {
+            "status": "success" if consistent and not failed and not crashed else "inconsistent",
+            "workspace": root if keep else None,
+            "wall_s": round(wall, 3),
+            "operations": {"planned": workers * ops, "logged": len(records), "failed": len(failed)},
+            "throughput_ops_s": round(len(records) / wall, 1) if wall > 0 else None,
+            "latency": {
+                "all": _latency([record["latency_ms"] for record in records]) if records else None,
+                **{operation: _latency(values) for operation, values in sorted(by_command.items())},
+            },
+            "consistency": {
+                **consistency,
+                "reader_samples": reads["reads"],
+                "torn_reads": reads["torn"],
+                "missing_reads": reads["missing"],
+                "torn_read_examples": reads["examples"][:MAX_EXAMPLES],
+            },
+            "failed_examples": [
+                {key: record[key] for key in ("worker", "seq", "command", "argv", "error")}
+                for record in failed[:MAX_EXAMPLES]
+            ],
+            "worker_crashes": crashed[:MAX_EXAMPLES],
+        }
+        return report
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def append_history(path: str, report: dict, params: dict) -> None:
+    """Append a one-line summary of a run to a JSONL history file."""
+    from gitmeta import head_commit
+
+    latency = report["latency"]["all"] or {}
+    consistency = report["consistency"]
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": head_commit(SCRIPTS_DIR),
+        "params": params,
+        "status": report["status"],
+        "throughput_ops_s": report["throughput_ops_s"],
+        "p50_ms": latency.get("p50_ms"),
+        "p95_ms": latency.get("p95_ms"),
+        "p99_ms": latency.get("p99_ms"),
+        "failed": report["operations"]["failed"],
+        "lost_updates": consistency["lost_updates"],
+        "torn_reads": consistency["torn_reads"],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stress concurrent workflow state updates",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent writer processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS,
+                        help=f"Operations per worker (default: {DEFAULT_OPS})")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS,
+                        help=f"Concurrent reader processes (default: {DEFAULT_READERS})")
+    parser.add_argument("--features", type=int, default=DEFAULT_SHARED_FEATURES,
+                        help=f"Shared features the workers update (default: {DEFAULT_SHARED_FEATURES})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the operation mix")
+    parser.add_argument("--cli", action="store_true", help="Run every operation in a fresh run.py process")
+    parser.add_argument("--keep", action="store_true", help="Keep the workspace and operation logs")
+    parser.add_argument("--history", nargs="?", const=DEFAULT_HISTORY, metavar="PATH",
+                        help="Append a summary line to a JSONL history (default: bench/baselines/contention.jsonl)")
+    # Internal: worker and reader processes
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--reader", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--stop-file", help=argparse.SUPPRESS)
+    parser.add_argument("--shared", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.worker, args.workers, args.ops, args.seed, args.shared, args.start_at, args.cli)
+        return
+    if args.reader:
+        run_reader(args.shared, args.start_at, args.stop_file)
+        return
+
+    if args.workers < 1 or args.ops < 1 or args.features < 1 or args.readers < 0:
+        parser.error("--workers, --ops and --features must be positive; --readers non-negative")
+
+    params = {
+        "workers": args.workers,
+        "ops": args.ops,
+        "readers": args.readers,
+        "features": args.features,
+        "seed": args.seed,
+        "mode": "cli" if args.cli else "in-process",
+    }
+    report = run_stress(args.workers, args.ops, args.readers, args.features, args.seed, args.cli, args.keep)
+    report["params"] = params
+    if args.history:
+        append_history(args.history, report, params)
+        report["history"] = args.history
+
+    print(json.dumps(report, indent=2))
+    if report["status"] != "success":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
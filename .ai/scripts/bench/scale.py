@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Scale Benchmarks
+Times the workflow scripts on synthetic workspaces (see bench.workspace) of
+growing size, to show how they behave as .ai/features and .ai/bugs grow.
+
+Each size gets a fresh workspace and a fresh interpreter running inside it
+(with the daemon, fsync and the timings trace disabled). Every scenario runs
+`--repeat` times; the in-process parse cache is cleared before each run, so
+runs behave like separate invocations with warm on-disk caches. The first
+run is reported separately (first_ms) from the median of all runs.
+
+Scenarios:
+  validate_full          cleanup.validate_workflows(dry_run=True, full=True)
+  validate_incremental   cleanup.validate_workflows(dry_run=True) with a current manifest
+  cleanup_dry_run        cleanup.cleanup(dry_run=True)
+  cleanup_selective      cleanup.cleanup(dry_run=True) filtered by status and age
+  workflow_info          get-workflow-info gathering for the current feature
+  workflow_info_all      get-workflow-info --all records for every workflow
+  set_current            set-current for the current feature
+  create_pr_dry_run      create-pr --dry-run for the current feature
+
+Results can be saved as a JSON baseline; --compare fails (exit 1) when a
+scenario's median is slower than the baseline by more than --tolerance
+(and by more than NOISE_FLOOR_MS, so sub-millisecond jitter never fails).
+
+Usage:
+  python -m bench.scale                                  # Sizes 10, 100, 1000 (JSON output)
+  python -m bench.scale --sizes 10 1000 100000 --repeat 3
+  python -m bench.scale --save                           # Store results as the baseline
+  python -m bench.scale --compare --tolerance 0.25       # Fail on regressions against it
+  python -m bench.scale --scenarios validate_full set_current --keep
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_MS = 1.0
+DEFAULT_BASELINE = os.path.join(SCRIPTS_DIR, "bench", "baselines", "scale.json")
+
+SCENARIOS = (
+    "validate_full",
+    "validate_incremental",
+    "cleanup_dry_run",
+    "cleanup_selective",
+    "workflow_info",
+    "workflow_info_all",
+    "set_current",
+    "create_pr_dry_run",
+)
+
+WORKER_ENV = {
+    "AI_WORKFLOW_NO_DAEMON": "1",
+    "AI_WORKFLOW_NO_FSYNC": "1",
+    "AI_WORKFLOW_NO_TRACE": "1",
+}
+
+
+# Worker side: runs inside the generated workspace
+
+def _quiet(func):
+    """Run func() with stdout discarded."""
+    from contextlib import redirect_stdout
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        try:
+            func()
+        except SystemExit:
+            pass
+
+
+def _scenario_functions(current: str) -> dict:
+    """Zero-argument callables for every scenario."""
+    from run import load_command
+
+    cleanup = load_command("cleanup")
+    info = load_command("get-workflow-info")
+    set_current = load_command("set-current")
+    create_pr = load_command("create-pr")
+
+    def workflow_info():
+        context = info.gather_current_context()
+        state = info.gather_workflow_state(context["name"], context["workflow_type"])
+        info.gather_plan_state(context["name"])
+        info.gather_workflow_config()
+        return state
+
+    def create_pr_dry_run():
+        sys.argv = ["create-pr.py", "--dry-run", "--name", current]
+        _quiet(create_pr.main)
+
+    return {
+        "validate_full": lambda: cleanup.validate_workflows(dry_run=True, full=True),
+        "validate_incremental": lambda: cleanup.validate_workflows(dry_run=True),
+        "cleanup_dry_run": lambda: cleanup.cleanup(dry_run=True),
+        "cleanup_selective": lambda: cleanup.cleanup(
+            dry_run=True, statuses=["completed", "closed"], older_than=30
+        ),
+        "workflow_info": workflow_info,
+        "workflow_info_all": lambda: sum(1 for _ in info.iter_workflow_records()),
+        "set_current": lambda: _quiet(lambda: set_current.set_current(current, "feature")),
+        "create_pr_dry_run": create_pr_dry_run,
+    }
+
+
+def run_worker(scenarios: list, repeat: int, current: str) -> dict:
+    """Time each scenario in this process (cwd is the workspace root)."""
+    import statistics
+
+    import config
+
+    functions = _scenario_functions(current)
+    results = {}
+    for name in scenarios:
+        samples = []
+        for _ in range(repeat):
+            config._parse_cache.clear()
+            start = time.perf_counter()
+            functions[name]()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "first_ms": round(samples[0], 3),
+            "median_ms": round(statistics.median(samples), 3),
+            "min_ms": round(min(samples), 3),
+        }
+    return results
+
+
+# Runner side
+
+def run_size(size: int, scenarios: list, repeat: int, workspace_args: dict, keep: bool) -> dict:
+    """Generate a workspace of `size` workflows and time the scenarios in it."""
+    import shutil
+    import subprocess
+    import tempfile
+
+    from bench.workspace import generate
+
+    root = tempfile.mkdtemp(prefix=f"ai-bench-{size}-")
+    try:
+        workspace = generate(root, size, **workspace_args)
+        worker = os.path.join(root, ".ai", "scripts", "bench", "scale.py")
+        command = [
+            sys.executable, worker, "--worker",
+            "--repeat", str(repeat),
+            "--current", workspace["current"] or "",
+            "--scenarios", *scenarios,
+        ]
+        completed = subprocess.run(
+            command, cwd=root, env=dict(os.environ, **WORKER_ENV),
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return {"workspace": workspace, "error": completed.stderr.strip()[-2000:]}
+        return {"workspace": workspace, "scenarios": json.loads(completed.stdout)}
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """One row per scenario measured in both runs, flagging regressions."""
+    rows = []
+    for size, current in results["results"].items():
+        base = baseline.get("results", {}).get(size, {})
+        for name, timing in current.get("scenarios", {}).items():
+            before = base.get("scenarios", {}).get(name)
+            if before is None:
+                continue
+            old, new = before["median_ms"], timing["median_ms"]
+            rows.append({
+                "size": int(size),
+                "scenario": name,
+                "baseline_ms": old,
+                "median_ms": new,
+                "change_pct": round((new - old) / old * 100, 1) if old else None,
+                "regressed": new > old * (1 + tolerance) and new - old > NOISE_FLOOR_MS,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the workflow scripts on synthetic workspaces",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Workspace sizes in workflows (10 to 100000)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="Scenarios to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Runs per scenario (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--phases", type=int, default=20, help="Phases per plan")
+    parser.add_argument("--prd-kb", type=int, default=64, help="Size of each prd.md in KB")
+    parser.add_argument("--request-kb", type=int, default=16, help="Size of each request.md in KB")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspaces")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Save the results as a baseline (default: bench/baselines/scale.json)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Compare against a baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--current", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.scenarios, args.repeat, args.current)))
+        return
+
+    if any(size < 1 or size > 100000 for size in args.sizes):
+        parser.error("--sizes must be between 1 and 100000")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(json.dumps({"status": "error", "error": f"Could not read baseline: {e}"}, indent=2))
+            sys.exit(1)
+
+    workspace_args = {"phases": args.phases, "prd_kb": args.prd_kb, "request_kb": args.request_kb}
+    result = {
+        "status": "success",
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "repeat": args.repeat,
+        "workspace": workspace_args,
+        "results": {
+            str(size): run_size(size, args.scenarios, args.repeat, workspace_args, args.keep)
+            for size in args.sizes
+        },
+    }
+    if any("error" in entry for entry in result["results"].values()):
+        result["status"] = "error"
+
+    if baseline is not None:
+        rows = compare(result, baseline, args.tolerance)
+        result["comparison"] = {"baseline": args.compare, "tolerance": args.tolerance, "rows": rows}
+        if result["status"] == "success" and any(row["regressed"] for row in rows):
+            result["status"] = "regression"
+
+    if args.save and result["status"] == "success":
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        from transaction import atomic_write
+        atomic_write(args.save, json.dumps(result, indent=2) + "\n")
+        result["saved"] = args.save
+
+    print(json.dumps(result, indent=2))
+    if result["status"] != "success":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
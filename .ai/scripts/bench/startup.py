@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Startup Budget Harness
+Measures the cold start of every script entry point (run.COMMANDS) and
+shows where it goes. Each script runs a real invocation (PROBES, e.g.
+`get-workflow-info <current>`, `cleanup --dry-run`) in a fresh process
+with the daemon disabled, inside a workspace generated by bench.workspace
+(or an existing one, --workspace). So imports, config load and the state
+reads of a typical call are all measured. The update-plan-state probe writes
+the current workflow's status back unchanged, which also touches its
+state.yml and the event journal of a --workspace:
+
+  - wall clock: `--runs` samples per script (median, min, max)
+  - imports: `--import-runs` samples under `python -X importtime`. Each
+    module's self time is the median over the samples. Modules that a bare
+    interpreter (`python -c pass`) also imports count as interpreter startup;
+    the rest are split into workflow scripts, third-party (e.g. yaml) and
+    stdlib.
+
+Budgets default to run.COLD_START_BUDGETS_MS and can be overridden per
+command. Exits 1 when any median is over its budget. `run.py
+--check-budget` runs this harness.
+
+Usage:
+  python -m bench.startup                                # Every command (JSON output)
+  python -m bench.startup set-current get-workflow-info  # Selected commands
+  python -m bench.startup --runs 15 --import-runs 5
+  python -m bench.startup --workflows 5000               # Larger generated workspace
+  python -m bench.startup --workspace /tmp/ai-ws         # Existing workspace (not copied)
+  python -m bench.startup --budget set-current=80 --budgets budgets.json
+  python -m bench.startup --table startup.md             # Also write a Markdown table
+"""
+
+import argparse
+import compileall
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from run import COLD_START_BUDGETS_MS, COMMANDS
+
+DEFAULT_RUNS = 9
+DEFAULT_IMPORT_RUNS = 3
+DEFAULT_TOP = 8
+DEFAULT_WORKFLOWS = 200
+
+ENV = {"AI_WORKFLOW_NO_DAEMON": "1", "AI_WORKFLOW_NO_TRACE": "1"}
+
+# Arguments each command is timed with ({current}: the current workflow;
+# {status}: its status; {missing}: a name no workflow has). Commands that
+# only create are run into an early validation error, after config load and
+# state reads.
+PROBES = {
+    "init-workflow": ["{current}", "probe"],       # Already exists
+    "init-impl-plan": ["{current}"],               # Plan already exists
+    "update-plan-state": ["{current}", "update-feature-state", "{status}"],  # Same status
+    "get-workflow-info": ["{current}"],
+    "cleanup": ["--dry-run"],
+    "set-current": ["{missing}"],                  # Scans every type, not found
+    "create-pr": ["--dry-run"],
+    "index": ["query", "--no-refresh"],
+    "archive": ["list"],
+    "snapshot": ["list"],
+    "clarifications": ["index", "{current}"],
+    "timings": ["stats"],
+    "events": ["list", "--last", "20"],
+}
+MISSING_NAME = "no-such-workflow"
+
+
+def _command_line(command: str = None, root: str = None, current: tuple = (None, None)) -> list:
+    """argv of a command's probe run in `root` (a bare interpreter for None)."""
+    if command is None:
+        return [sys.executable, "-c", "pass"]
+    script = os.path.join(root, ".ai", "scripts", COMMANDS[command])
+    name, status = current
+    args = [arg.format(current=name or MISSING_NAME, status=status or "in-progress", missing=MISSING_NAME)
+            for arg in PROBES.get(command, ["--help"])]
+    return [sys.executable, script, *args]
+
+
+def sample_wall(argv: list, runs: int, cwd: str = None) -> list:
+    """Wall-clock samples (ms) of running argv in a fresh process."""
+    env = dict(os.environ, **ENV)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def parse_importtime(output: str) -> list:
+    """(module, depth, self_us, cumulative_us) rows of -X importtime output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        name = parts[2].rstrip()
+        indent = len(name) - len(name.lstrip(" "))
+        rows.append((name.strip(), max(0, (indent - 1) // 2), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def sample_imports(argv: list, runs: int, cwd: str = None) -> dict:
+    """{module: (median self ms, median cumulative ms, depth)} over `runs` importtime runs."""
+    env = dict(os.environ, **ENV)
+    samples = {}
+    for _ in range(runs):
+        completed = subprocess.run(
+            [argv[0], "-X", "importtime", *argv[1:]],
+            cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False
+        )
+        for module, depth, self_us, cumulative_us in parse_importtime(completed.stderr):
+            samples.setdefault(module, ([], [], depth))
+            samples[module][0].append(self_us / 1000)
+            samples[module][1].append(cumulative_us / 1000)
+    return {
+        module: (statistics.median(selfs), statistics.median(cumulatives), depth)
+        for module, (selfs, cumulatives, depth) in samples.items()
+    }
+
+
+def _workflow_modules() -> set:
+    """Top-level names of the modules in the scripts folder (and bench)."""
+    names = {"bench"}
+    for entry in os.listdir(SCRIPTS_DIR):
+        if entry.endswith(".py"):
+            names.add(entry[:-3])
+    return names
+
+
+def classify(module: str, workflow: set) -> str:
+    top = module.split(".", 1)[0]
+    if top in workflow:
+        return "workflow"
+    if top in sys.stdlib_module_names:
+        return "stdlib"
+    return "third_party"
+
+
+def measure(command: str, runs: int, import_runs: int, interpreter: dict,
+            budget: float, top: int, root: str, current: tuple) -> dict:
+    """Wall clock, import attribution and budget check of one entry point."""
+    argv = _command_line(command, root, current)
+    sample_wall(argv, 1, root)  # Warm the config and section caches
+    wall = sample_wall(argv, runs, root)
+    imports = sample_imports(argv, import_runs, root)
+    workflow = _workflow_modules()
+
+    groups = {"workflow": 0.0, "third_party": 0.0, "stdlib": 0.0}
+    script_modules = []
+    for module, (self_ms, cumulative_ms, depth) in imports.items():
+        if module in interpreter:
+            continue
+        groups[classify(module, workflow)] += self_ms
+        script_modules.append((module, self_ms, cumulative_ms, depth))
+
+    median = statistics.median(wall)
+    return {
+        "command": command,
+        "script": COMMANDS[command],
+        "args": argv[2:],
+        "median_ms": round(median, 1),
+        "min_ms": round(min(wall), 1),
+        "max_ms": round(max(wall), 1),
+        "budget_ms": budget,
+        "within_budget": budget is None or median <= budget,
+        "imports": {
+            "modules": len(script_modules),
+            "total_ms": round(sum(groups.values()), 1),
+            **{f"{group}_ms": round(ms, 1) for group, ms in groups.items()},
+        },
+        # Imports the script triggers directly, by cumulative time
+        "top_level": [
+            {"module": module, "cumulative_ms": round(cumulative_ms, 2)}
+            for module, _, cumulative_ms, depth in sorted(script_modules, key=lambda m: -m[2])
+            if depth == 0
+        ][:top],
+        # Individual modules, by self time
+        "top_modules": [
+            {"module": module, "self_ms": round(self_ms, 2), "group": classify(module, workflow)}
+            for module, self_ms, _, _ in sorted(script_modules, key=lambda m: -m[1])
+        ][:top],
+    }
+
+
+def load_budgets(path: str = None, overrides: list = None) -> dict:
+    """run.py's budgets, updated from a JSON file and NAME=MS overrides."""
+    budgets = dict(COLD_START_BUDGETS_MS)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            budgets.update({name: float(ms) for name, ms in json.load(f).items()})
+    for override in overrides or []:
+        name, _, ms = override.partition("=")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def render_table(result: dict) -> str:
+    """Markdown table of a run's results."""
+    lines = [
+        f"Interpreter startup: {result['interpreter']['median_ms']} ms "
+        f"(python {result['python']}, {result['runs']} runs, "
+        f"{result['workspace']['path'] or str(result['workspace']['workflows']) + ' generated workflows'})",
+        "",
+        "| Command | Median ms | Budget ms | Status | Imports ms | Workflow | Third-party | Stdlib | Slowest imports |",
+        "|---|---:|---:|---|---:|---:|---:|---:|---|",
+    ]
+    for row in result["commands"]:
+        imports = row["imports"]
+        slowest = ", ".join(f"{m['module']} {m['self_ms']}" for m in row["top_modules"][:3])
+        lines.append(
+            f"| {row['command']} | {row['median_ms']} | {row['budget_ms'] if row['budget_ms'] is not None else '-'} "
+            f"| {'ok' if row['within_budget'] else 'OVER'} | {imports['total_ms']} | {imports['workflow_ms']} "
+            f"| {imports['third_party_ms']} | {imports['stdlib_ms']} | {slowest} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _current_workflow(root: str) -> tuple:
+    """(name, status) of the current workflow of the workspace at `root` (None if unknown)."""
+    import statefile
+
+    try:
+        state = statefile.load(os.path.join(root, ".ai", "memory", "global-state.yml"))
+    except (OSError, statefile.StateFileError):
+        return None, None
+    current = state.get("current")
+    if not isinstance(current, dict) or not current.get("name"):
+        return None, None
+    name = current["name"]
+    try:
+        workflow = statefile.load(os.path.join(
+            root, ".ai", f"{current.get('workflow_type') or 'feature'}s", name, "state.yml"))
+    except (OSError, statefile.StateFileError):
+        return name, None
+    return name, workflow.get("status")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description="Measure script cold starts against budgets",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("commands", nargs="*", metavar="COMMAND",
+                        help="Commands to measure (default: all in run.py)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Wall-clock samples per command (default: {DEFAULT_RUNS})")
+    parser.add_argument("--import-runs", type=int, default=DEFAULT_IMPORT_RUNS,
+                        help=f"-X importtime samples per command (default: {DEFAULT_IMPORT_RUNS})")
+    parser.add_argument("--budget", action="append", metavar="COMMAND=MS",
+                        help="Override one command's budget (repeatable)")
+    parser.add_argument("--budgets", metavar="PATH", help="JSON file of {command: budget_ms}")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help=f"Modules listed per command (default: {DEFAULT_TOP})")
+    parser.add_argument("--table", metavar="PATH", help="Also write the results as a Markdown table")
+    parser.add_argument("--workflows", type=int, default=DEFAULT_WORKFLOWS,
+                        help=f"Size of the generated workspace (default: {DEFAULT_WORKFLOWS})")
+    parser.add_argument("--workspace", metavar="PATH",
+                        help="Run in this existing workspace (its .ai/scripts) instead of generating one")
+    args = parser.parse_args(argv)
+
+    unknown = [command for command in args.commands if command not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+    if args.runs < 1 or args.import_runs < 1:
+        parser.error("--runs and --import-runs must be at least 1")
+    if args.workspace and not os.path.isdir(os.path.join(args.workspace, ".ai", "scripts")):
+        parser.error(f"no .ai/scripts folder in {args.workspace}")
+    try:
+        budgets = load_budgets(args.budgets, args.budget)
+    except (OSError, ValueError) as e:
+        parser.error(f"invalid budgets: {e}")
+
+    if args.workspace:
+        root = os.path.abspath(args.workspace)
+        workspace = {"path": root, "workflows": None}
+        current = _current_workflow(root)
+    else:
+        from bench.workspace import generate
+
+        root = tempfile.mkdtemp(prefix="ai-startup-")
+        workspace = {"path": None, "workflows": args.workflows}
+        generate(root, args.workflows)
+        current = _current_workflow(root)
+        # Bytecode as in a project where the scripts have run before
+        compileall.compile_dir(os.path.join(root, ".ai", "scripts"), quiet=1)
+
+    try:
+        interpreter_wall = sample_wall(_command_line(), args.runs)
+        interpreter = sample_imports(_command_line(), args.import_runs)
+
+        rows = [
+            measure(command, args.runs, args.import_runs, interpreter, budgets.get(command), args.top,
+                    root, current)
+            for command in (args.commands or list(COMMANDS))
+        ]
+    finally:
+        if not args.workspace:
+            shutil.rmtree(root, ignore_errors=True)
+
+    result = {
+        "status": "success" if all(row["within_budget"] for row in rows) else "over_budget",
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_runs": args.import_runs,
+        "workspace": workspace,
+        "interpreter": {
+            "median_ms": round(statistics.median(interpreter_wall), 1),
+            "modules": len(interpreter),
+        },
+        "commands": rows,
+    }
+
+    if args.table:
+        with open(args.table, "w", encoding="utf-8") as f:
+            f.write(render_table(result))
+        result["table"] = args.table
+
+    print(json.dumps(result, indent=2))
+    if result["status"] != "success":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Synthetic Workspace Generator
+Builds a throwaway project whose .ai folder holds any number of features,
+bugs and ideas (60/30/10), shaped like the ones the workflow creates:
+state.yml with a spread of statuses and dates, plan-state.yml with many
+phases (half of the plans completed), and large prd.md, request.md (with
+clarification rounds) and plan.md files. The config and the current
+scripts folder are copied in, so commands run inside the workspace exactly
+as in a real project.
+
+The large markdown files have the same content in every workflow, so they
+are written once and hard-linked (copied where links aren't possible);
+100k workflows take a few hundred MB instead of tens of GB.
+
+Usage:
+  python -m bench.workspace /tmp/ai-ws --workflows 1000           # (JSON output)
+  python -m bench.workspace /tmp/ai-ws --workflows 100000 --phases 40 --prd-kb 256
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import statefile
+from bench.yaml_backends import make_plan_state
+
+DEFAULT_WORKFLOWS = 1000
+DEFAULT_PHASES = 20
+DEFAULT_PRD_KB = 64
+DEFAULT_REQUEST_KB = 16
+
+# Share of each workflow type
+TYPE_SPLIT = (("feature", 0.6), ("bug", 0.3), ("idea", 0.1))
+
+STATUSES = {
+    "feature": ["clarifying", "prd-draft", "prd-approved", "planning", "in-progress", "completed"],
+    "bug": ["reported", "triaged", "fixing", "resolved", "closed"],
+    "idea": ["exploring", "refined", "shelved", "converted"],
+}
+
+BASE_DATE = date(2026, 1, 1)
+
+WORDS = (
+    "content hub repository schema delivery key locale publish archive sync "
+    "command filter report item type version workflow user set status event "
+    "migration reference target source batch retry validate preview export"
+).split()
+
+
+def workflow_name(workflow_type: str, index: int) -> str:
+    """Deterministic workflow folder name, e.g. feature-000042-hub-sync."""
+    return f"{workflow_type}-{index:06d}-{WORDS[index % len(WORDS)]}-{WORDS[(index * 7) % len(WORDS)]}"
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _pad(lines: list, rng: random.Random, target_bytes: int, section) -> None:
+    """Append sections produced by section(n) until the text reaches target_bytes."""
+    size = sum(len(line) + 1 for line in lines)
+    n = 1
+    while size < target_bytes:
+        for line in section(n):
+            lines.append(line)
+            size += len(line) + 1
+        n += 1
+
+
+def make_prd(rng: random.Random, kb: int) -> str:
+    """prd.md with an Overview section followed by many requirement sections."""
+    lines = [
+        "# Product Requirements Document",
+        "",
+        "## Overview",
+        "",
+        _sentence(rng, 30),
+        "",
+    ]
+
+    def section(n):
+        return [
+            f"## Requirement {n}",
+            "",
+            f"### User Story {n}",
+            "",
+            _sentence(rng),
+            "",
+            "### Acceptance Criteria",
+            "",
+            *(f"- {_sentence(rng, 10)}" for _ in range(4)),
+            "",
+        ]
+
+    _pad(lines, rng, kb * 1024, section)
+    return "\n".join(lines) + "\n"
+
+
+def make_request(rng: random.Random, kb: int, rounds: int = 3) -> str:
+    """request.md with clarification rounds; the last question is unanswered."""
+    lines = [
+        "# Feature Request",
+        "",
+        "## Description",
+        _sentence(rng, 40),
+        "",
+        "## Created",
+        BASE_DATE.isoformat(),
+        "",
+        "## Clarifications",
+        "",
+    ]
+    number = 1
+    for round_number in range(1, rounds + 1):
+        lines += [f"### Round {round_number}", ""]
+        for _ in range(6):
+            lines += [f"#### Q{number}: {_sentence(rng, 12)}", "", f"User: {_sentence(rng, 8)}", ""]
+            number += 1
+    lines += [f"#### Q{number}: {_sentence(rng, 12)}", "", "User:", ""]
+
+    def section(n):
+        return [f"## Notes {n}", "", _sentence(rng, 40), ""]
+
+    _pad(lines, rng, kb * 1024, section)
+    return "\n".join(lines) + "\n"
+
+
+def make_plan(rng: random.Random, phases: int) -> str:
+    """implementation-plan/plan.md with one section per phase."""
+    lines = ["# Implementation Plan", "", "## Overview", "", _sentence(rng, 30), ""]
+    for n in range(1, phases + 1):
+        lines += [f"## Phase {n}: Implement component {n}", ""]
+        lines += [f"- [ ] {_sentence(rng, 8)}" for _ in range(5)]
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def make_state(workflow_type: str, name: str, index: int) -> str:
+    """state.yml with a status and dates that vary by index."""
+    statuses = STATUSES[workflow_type]
+    created = BASE_DATE - timedelta(days=index % 400)
+    updated = created + timedelta(days=index % 37)
+    return statefile.dumps({
+        "workflow_type": workflow_type,
+        "name": name,
+        "status": statuses[index % len(statuses)],
+        "created": created,
+        "updated": updated,
+    })
+
+
+def _link(shared: Path, target: Path) -> None:
+    try:
+        os.link(shared, target)
+    except OSError:
+        shutil.copyfile(shared, target)
+
+
+def generate(root: Path, workflows: int = DEFAULT_WORKFLOWS, phases: int = DEFAULT_PHASES,
+             prd_kb: int = DEFAULT_PRD_KB, request_kb: int = DEFAULT_REQUEST_KB,
+             seed: int = 0, copy_scripts: bool = True) -> dict:
+    """
+    Create a workspace under `root` (which must not contain a .ai folder).
+    The current context is the first feature, which has a plan in progress.
+    """
+    started = time.perf_counter()
+    root = Path(root)
+    ai = root / ".ai"
+    if ai.exists():
+        raise FileExistsError(f"{ai} already exists")
+
+    rng = random.Random(seed)
+    ai.mkdir(parents=True)
+
+    config_source = Path(SCRIPTS_DIR).parent / "config.yml"
+    if config_source.exists():
+        shutil.copyfile(config_source, ai / "config.yml")
+    if copy_scripts:
+        shutil.copytree(SCRIPTS_DIR, ai / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+
+    # Shared content, hard-linked into every workflow
+    shared_dir = root / ".bench-shared"
+    shared_dir.mkdir()
+    shared = {
+        "prd.md": make_prd(rng, prd_kb),
+        "request.md": make_request(rng, request_kb),
+        "plan.md": make_plan(rng, phases),
+        "context.md": "# Context\n\n" + _sentence(rng, 40) + "\n",
+        "report.md": "# Bug Report\n\n" + _sentence(rng, 60) + "\n",
+        "triage.md": "# Triage\n\n" + _sentence(rng, 40) + "\n",
+        "fix-plan.md": "# Fix Plan\n\n" + _sentence(rng, 40) + "\n",
+        "description.md": "# Idea\n\n" + _sentence(rng, 60) + "\n",
+    }
+    plans = {}
+    for status in ("completed", "in-progress"):
+        plan = make_plan_state(phases)
+        plan["status"] = status
+        if status == "completed":
+            for phase in plan["phases"]:
+                phase["status"] = "completed"
+        plans[status] = plan
+    for name, plan in plans.items():
+        shared[f"plan-state-{name}.yml"] = statefile.dumps(plan)
+    for name, content in shared.items():
+        (shared_dir / name).write_text(content, encoding="utf-8")
+
+    artifacts = {
+        "feature": ["request.md", "context.md", "prd.md"],
+        "bug": ["report.md", "context.md", "triage.md", "fix-plan.md"],
+        "idea": ["description.md", "context.md"],
+    }
+
+    counts = {}
+    remaining = workflows
+    current = None
+    for position, (workflow_type, share) in enumerate(TYPE_SPLIT):
+        count = remaining if position == len(TYPE_SPLIT) - 1 else round(workflows * share)
+        count = min(count, remaining)
+        remaining -= count
+        counts[workflow_type] = count
+
+        base = ai / f"{workflow_type}s"
+        base.mkdir(parents=True, exist_ok=True)
+        for index in range(count):
+            name = workflow_name(workflow_type, index)
+            path = base / name
+            path.mkdir()
+            (path / "state.yml").write_text(make_state(workflow_type, name, index), encoding="utf-8")
+            for artifact in artifacts[workflow_type]:
+                _link(shared_dir / artifact, path / artifact)
+
+            if workflow_type == "feature":
+                impl = path / "implementation-plan"
+                impl.mkdir()
+                plan_status = "in-progress" if index == 0 or index % 2 else "completed"
+                _link(shared_dir / f"plan-state-{plan_status}.yml", impl / "plan-state.yml")
+                _link(shared_dir / "plan.md", impl / "plan.md")
+                if current is None:
+                    current = name
+            elif workflow_type == "idea":
+                (path / "refinement").mkdir()
+
+    memory = ai / "memory"
+    memory.mkdir()
+    (memory / "global-state.yml").write_text(statefile.dumps({
+        "version": 1,
+        "current": {
+            "name": current,
+            "workflow_type": "feature" if current else None,
+            "set_date": BASE_DATE if current else None,
+            "set_method": "manual" if current else None,
+        },
+        "last_updated": BASE_DATE,
+    }), encoding="utf-8")
+
+    return {
+        "root": str(root),
+        "workflows": workflows,
+        "counts": counts,
+        "phases": phases,
+        "prd_bytes": len(shared["prd.md"].encode("utf-8")),
+        "request_bytes": len(shared["request.md"].encode("utf-8")),
+        "current": current,
+        "generate_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic workflow workspace",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("root", help="Project folder to create the .ai folder in")
+    parser.add_argument("--workflows", type=int, default=DEFAULT_WORKFLOWS,
+                        help=f"Features, bugs and ideas in total (default: {DEFAULT_WORKFLOWS})")
+    parser.add_argument("--phases", type=int, default=DEFAULT_PHASES,
+                        help=f"Phases per plan (default: {DEFAULT_PHASES})")
+    parser.add_argument("--prd-kb", type=int, default=DEFAULT_PRD_KB,
+                        help=f"Size of each prd.md in KB (default: {DEFAULT_PRD_KB})")
+    parser.add_argument("--request-kb", type=int, default=DEFAULT_REQUEST_KB,
+                        help=f"Size of each request.md in KB (default: {DEFAULT_REQUEST_KB})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated text")
+    parser.add_argument("--no-scripts", action="store_true",
+                        help="Don't copy the scripts folder into the workspace")
+    args = parser.parse_args()
+
+    try:
+        result = {"status": "success", **generate(
+            Path(args.root), args.workflows, args.phases, args.prd_kb, args.request_kb,
+            args.seed, copy_scripts=not args.no_scripts
+        )}
+    except FileExistsError as e:
+        result = {"status": "error", "error": str(e)}
+
+    print(json.dumps(result, indent=2))
+    if result["status"] == "error":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+YAML Backend Microbenchmark
+Times load and dump of synthetic plan-state.yml files with every available
+statefile backend (auto, libyaml, pyyaml, builtin), and checks that all
+backends parse each file to the same data. Also times statefile.patch_text
+for typical update-plan-state edits, with the lines each one changes.
+
+Usage:
+  python -m bench.yaml_backends                      # Default sizes (JSON output)
+  python -m bench.yaml_backends --phases 50 5000     # Custom phase counts
+  python -m bench.yaml_backends --repeat 7           # More samples (best is reported)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import statefile
+
+DEFAULT_PHASES = (10, 500, 5000)
+DEFAULT_REPEAT = 5
+
+
+def make_plan_state(phases: int) -> dict:
+    """Build a plan-state dict shaped like the ones init-impl-plan creates."""
+    return {
+        "status": "in-progress",
+        "current_phase": phases // 2,
+        "created": "2026-01-30",
+        "updated": "2026-02-14",
+        "phases": [
+            {
+                "name": f"Phase {i}: Implement component {i}",
+                "status": "completed" if i < phases // 2 else "pending",
+                "started": "2026-02-01" if i < phases // 2 else None,
+                "completed": "2026-02-03" if i < phases // 2 else None,
+            }
+            for i in range(1, phases + 1)
+        ],
+    }
+
+
+def _complete_middle_phase(state: dict) -> None:
+    """Mark the middle phase completed (values change length)."""
+    phase = state["phases"][len(state["phases"]) // 2]
+    phase["status"] = "completed"
+    phase["started"] = phase["completed"] = "2026-02-14"
+
+
+# Edits timed with statefile.patch_text (what update-plan-state writes)
+PATCH_SCENARIOS = {
+    "touch_updated": lambda state: state.update(updated="2026-02-15"),
+    "complete_middle_phase": _complete_middle_phase,
+}
+
+
+def best_of(func, repeat: int) -> float:
+    """Fastest of `repeat` runs of func(), in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(phase_counts: tuple, repeat: int) -> dict:
+    """Time every available backend on plan files of each size."""
+    backends = {name: statefile.get_backend(name) for name in statefile.available_backends()}
+    reference = statefile.get_backend("builtin")
+
+    results = []
+    for phases in phase_counts:
+        data = make_plan_state(phases)
+        text = reference.dumps(data)
+        row = {"phases": phases, "bytes": len(text.encode("utf-8")), "backends": {}, "patch": {}}
+
+        for scenario, edit in PATCH_SCENARIOS.items():
+            changed = make_plan_state(phases)
+            edit(changed)
+            patched = statefile.patch_text(text, changed)
+            row["patch"][scenario] = {
+                "patch_ms": round(best_of(lambda: statefile.patch_text(text, changed), repeat), 3),
+                "lines_changed": sum(a != b for a, b in zip(text.split("\n"), patched.split("\n"))),
+            }
+
+        for name, backend in backends.items():
+            parsed = backend.loads(text)
+            row["backends"][name] = {
+                "load_ms": round(best_of(lambda: backend.loads(text), repeat), 3),
+                "dump_ms": round(best_of(lambda: backend.dumps(data), repeat), 3),
+                "matches_builtin": parsed == data and backend.loads(backend.dumps(data)) == data,
+            }
+        results.append(row)
+
+    return {
+        "status": "success" if all(
+            b["matches_builtin"] for row in results for b in row["backends"].values()
+        ) else "mismatch",
+        "default_backend": statefile.get_backend().name,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark statefile YAML backends",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--phases", type=int, nargs="+", default=list(DEFAULT_PHASES),
+                        help="Phase counts of the generated plan files")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Runs per measurement (fastest is reported)")
+    args = parser.parse_args()
+
+    result = run_benchmark(tuple(args.phases), args.repeat)
+    print(json.dumps(result, indent=2))
+    if result["status"] != "success":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Clarification Index
+Indexes the `## Clarifications` section of a feature's request.md: for every
+`#### Qn:` block, its round, question text, byte offset and length, and
+whether it has been answered (a `User:` line with text). Single questions are
+then read by seeking straight to their block instead of re-reading the file.
+
+Indexes are cached in .ai/.cache/clarification-index.json, keyed by the
+file's mtime and size, so an unchanged request.md is never re-scanned.
+
+Usage:
+  python clarifications.py index my-feature     # Question count and index (JSON output)
+  python clarifications.py show my-feature 3    # Question 3 (counted across rounds)
+  python clarifications.py next my-feature      # First unanswered question
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("clarifications")
+
+try:
+    from config import cfg, get_cache_path
+    import timing
+except ImportError:
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
+
+
+CACHE_FILENAME = "clarification-index.json"
+CACHE_VERSION = 1
+CACHE_MAX_FILES = 128
+
+SECTION_HEADING = b"## Clarifications"
+ANSWER_PREFIX = b"User:"
+
+
+def _question_heading(line: bytes):
+    """(number, text) of a `#### Qn: text` line, or None."""
+    if not line.startswith(b"####"):
+        return None
+    rest = line[4:].lstrip(b" \t")
+    if rest == line[4:] or not rest.startswith(b"Q"):
+        return None  # `####` must be followed by whitespace, then Qn:
+    digits = rest[1:].split(b":", 1)
+    if len(digits) != 2 or not digits[0].isdigit():
+        return None
+    return int(digits[0]), digits[1].strip().decode("utf-8", "replace")
+
+
+def _heading_level(line: bytes) -> int:
+    """Markdown heading level of a line (0 if it isn't a heading)."""
+    level = len(line) - len(line.lstrip(b"#"))
+    if level and line[level:level + 1] in (b" ", b"\t", b"\r", b"\n", b""):
+        return level
+    return 0
+
+
+def build_index(content: bytes) -> dict:
+    """
+    Index the clarification questions in request.md content.
+    A question block runs from its heading to the next heading of level 4
+    or higher (or the end of the file).
+    """
+    questions = []
+    in_section = False
+    round_number = None
+    current = None
+    offset = 0
+
+    def close(end):
+        if current is not None:
+            current["length"] = end - current["offset"]
+            questions.append(current)
+
+    for line in content.splitlines(keepends=True):
+        stripped = line.rstrip(b"\r\n")
+        level = _heading_level(stripped)
+
+        if level:
+            if current is not None and level <= 4:
+                close(offset)
+                current = None
+            if level == 2:
+                in_section = stripped.rstrip() == SECTION_HEADING
+            elif in_section and level == 3 and stripped[4:].strip().lower().startswith(b"round"):
+                round_text = stripped[4:].strip()[5:].strip()
+                round_number = int(round_text) if round_text.isdigit() else None
+            elif in_section and level == 4:
+                heading = _question_heading(stripped)
+                if heading is not None:
+                    current = {
+                        "index": len(questions) + 1,
+                        "number": heading[0],
+                        "round": round_number,
+                        "question": heading[1],
+                        "offset": offset,
+                        "length": 0,
+                        "answered": False
+                    }
+        elif current is not None and not current["answered"]:
+            text = stripped.strip()
+            if text.startswith(ANSWER_PREFIX) and text[len(ANSWER_PREFIX):].strip():
+                current["answered"] = True
+
+        offset += len(line)
+
+    close(offset)
+
+    return {
+        "count": len(questions),
+        "answered": sum(q["answered"] for q in questions),
+        "questions": questions
+    }
+
+
+def _read_cache() -> dict:
+    """Cached indexes by file path (empty if missing or outdated)."""
+    try:
+        cache = json.loads(get_cache_path(CACHE_FILENAME).read_text())
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def _write_cache(files: dict) -> None:
+    """Write the index cache, keeping the most recently added files (best effort)."""
+    from transaction import atomic_write
+
+    if len(files) > CACHE_MAX_FILES:
+        files = dict(list(files.items())[-CACHE_MAX_FILES:])
+    try:
+        atomic_write(
+            get_cache_path(CACHE_FILENAME),
+            json.dumps({"version": CACHE_VERSION, "files": files}, separators=(",", ":")),
+            sync=False
+        )
+    except OSError:
+        pass
+
+
+def load_index(path: Path, cached: bool = True) -> dict:
+    """
+    Clarification index of a request.md (count 0 if it doesn't exist).
+    With cached=False the persistent cache is neither read nor written.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return build_index(b"")
+
+    if not cached:
+        with open(path, "rb") as f:
+            return build_index(f.read())
+
+    key = os.path.abspath(path)
+    signature = [st.st_mtime_ns, st.st_size]
+    files = _read_cache()
+    entry = files.get(key)
+    if entry is not None and entry.get("signature") == signature:
+        return entry["index"]
+
+    with open(path, "rb") as f:
+        index = build_index(f.read())
+    files.pop(key, None)
+    files[key] = {"signature": signature, "index": index}
+    _write_cache(files)
+    return index
+
+
+def read_question(path: Path, question: dict) -> str:
+    """Text of one question block, read by seeking to its offset."""
+    with open(path, "rb") as f:
+        f.seek(question["offset"])
+        return f.read(question["length"]).decode("utf-8", "replace").rstrip()
+
+
+def next_unanswered(index: dict):
+    """First unanswered question of an index (None if all are answered)."""
+    for question in index["questions"]:
+        if not question["answered"]:
+            return question
+    return None
+
+
+def get_request_path(name: str) -> Path:
+    """Path to a feature's request.md."""
+    return cfg.get_workflow_path(name, "feature") / "request.md"
+
+
+@timing.instrument("clarifications")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index and read clarification questions in request.md",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Show the clarification index")
+    index_parser.add_argument("name", help="Feature name")
+
+    show_parser = subparsers.add_parser("show", help="Show one question")
+    show_parser.add_argument("name", help="Feature name")
+    show_parser.add_argument("n", type=int, help="Question number, counted across rounds (1-based)")
+
+    next_parser = subparsers.add_parser("next", help="Show the first unanswered question")
+    next_parser.add_argument("name", help="Feature name")
+
+    args = parser.parse_args()
+
+    path = get_request_path(args.name)
+    if not path.exists():
+        print(json.dumps({
+            "status": "error",
+            "error": f"request.md not found for feature '{args.name}' ({path})"
+        }, indent=2))
+        sys.exit(1)
+
+    index = load_index(path)
+
+    if args.action == "index":
+        result = {"status": "success", "path": str(path), **index}
+    else:
+        if args.action == "show":
+            question = None
+            if 1 <= args.n <= index["count"]:
+                question = index["questions"][args.n - 1]
+            if question is None:
+                print(json.dumps({
+                    "status": "error",
+                    "error": f"Question {args.n} not found ({index['count']} questions)"
+                }, indent=2))
+                sys.exit(1)
+        else:
+            question = next_unanswered(index)
+
+        result = {
+            "status": "success",
+            "path": str(path),
+            "count": index["count"],
+            "answered": index["answered"],
+            "question": question
+        }
+        if question is not None:
+            result["text"] = read_question(path, question)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,164 +1,114 @@
 #!/usr/bin/env python3
 """Cleanup AI workflow by removing all features, bugs, ideas and resetting global state.
 
-Supports two modes:
+Supports three modes:
 1. Full cleanup (default): Remove all workflows and reset global state
-2. Validate mode (--validate): Sync completion states across workflows
+2. Selective cleanup (--status/--older-than/--type): Remove matching workflows;
+   global state is reset only if it points to one of them
+3. Validate mode (--validate): Sync completion states across workflows
+
+Removed folders are renamed into .ai/.trash, so cleanup returns at once; a
+background reaper (low CPU and I/O priority) deletes them afterwards.
+
+Usage:
+  python cleanup.py                                  # Remove everything (JSON output)
+  python cleanup.py --status completed,closed        # Only finished workflows
+  python cleanup.py --older-than 30 --type feature   # Features not updated for 30 days
+  python cleanup.py --reap                           # Empty .ai/.trash now (foreground)
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-import shutil
+import os
 import sys
-from datetime import date
+import time
+from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("cleanup")
 
 try:
-    from config import cfg
+    from config import cfg, cached_parse, get_cache_path, write_global_state
+    from model import PlanState, WorkflowState, plan_state_path
+    from scanner import WORKFLOW_TYPES, scan
+    from transaction import Transaction
+    import journal
+    import statefile
+    import timing
 except ImportError:
     print("✗ Error: Could not import config module", file=sys.stderr)
     sys.exit(1)
 
 
 def read_yaml_file(path: Path) -> dict:
-    """Read a YAML file and return its contents as a dict."""
+    """Read a YAML file and return its contents as a dict ({} if unreadable)."""
     if not path.exists():
         return {}
-    
-    content = path.read_text()
-    
-    # Try using yaml library if available
-    if yaml:
-        try:
-            return yaml.safe_load(content) or {}
-        except:
-            pass
-    
-    # Fallback: simple line-by-line parsing
-    result = {}
-    current_section = None
-    
-    for line in content.split('\n'):
-        stripped = line.strip()
-        if not stripped or stripped.startswith('#'):
-            continue
-        
-        # Check for section (indented key-value pairs)
-        if line.startswith('  ') and ':' in stripped and current_section:
-            key, _, value = stripped.partition(':')
-            value = value.strip()
-            if value in ('null', ''):
-                value = None
-            if current_section not in result:
-                result[current_section] = {}
-            result[current_section][key.strip()] = value
-        elif ':' in stripped:
-            key, _, value = stripped.partition(':')
-            key = key.strip()
-            value = value.strip()
-            if value in ('null', ''):
-                current_section = key
-                result[key] = {}
-            else:
-                result[key] = value
-                current_section = None
-    
-    return result
-
 
-def write_yaml_simple(path: Path, data: dict) -> None:
-    """Write a simple YAML file (supports nested dicts one level deep)."""
-    lines = []
-    for key, value in data.items():
-        if isinstance(value, dict):
-            lines.append(f"{key}:")
-            for k, v in value.items():
-                if v is None:
-                    lines.append(f"  {k}: null")
-                else:
-                    lines.append(f"  {k}: {v}")
-        else:
-            if value is None:
-                lines.append(f"{key}: null")
-            else:
-                lines.append(f"{key}: {value}")
-    
-    path.write_text('\n'.join(lines) + '\n')
+    try:
+        return cached_parse(path, statefile.load)
+    except (OSError, statefile.StateFileError) as e:
+        print(f"⚠ Warning: Could not read {path}: {e}", file=sys.stderr)
+        return {}
 
 
-def count_items_in_directory(path: Path) -> dict:
-    """Count features, bugs, or ideas in a directory."""
-    if not path.exists():
+def count_items(snapshot, workflow_type: str) -> dict:
+    """Count features, bugs, or ideas in a workspace snapshot."""
+    if not snapshot.exists(workflow_type):
         return {"exists": False, "count": 0, "items": []}
 
-    items = [d.name for d in path.iterdir() if d.is_dir() and d.name != ".gitkeep"]
+    items = [entry.name for entry in snapshot.of_type(workflow_type)]
     return {
         "exists": True,
         "count": len(items),
-        "items": sorted(items)
+        "items": items
     }
 
 
-def reset_global_state() -> None:
+def reset_global_state(txn=None) -> None:
     """Reset global-state.yml to initial empty state."""
-    memory_path = cfg.get_memory_path()
-    memory_path.mkdir(parents=True, exist_ok=True)
-
-    today = date.today().strftime(cfg.defaults.date_format)
-    state_path = cfg.get_global_state_path()
-
-    content = f"""version: 1
-current:
-  name: null
-  workflow_type: null
-  set_date: null
-  set_method: null
-last_updated: {today}
-"""
-    state_path.write_text(content)
+    write_global_state(None, None, txn=txn)
 
 
 def get_plan_state_status(workflow_path: Path) -> Optional[str]:
-    """Get the status from plan-state.yml if it exists."""
-    plan_state_path = workflow_path / "implementation-plan" / "plan-state.yml"
-    if not plan_state_path.exists():
-        # For bugs, check fix-plan directory
-        plan_state_path = workflow_path / "fix-plan" / "plan-state.yml"
-        if not plan_state_path.exists():
-            return None
-    
-    state = read_yaml_file(plan_state_path)
-    return state.get('status')
+    """Get the status from plan-state.yml (implementation-plan or fix-plan) if it exists."""
+    plan = read_yaml_file(plan_state_path(workflow_path))
+    if not plan:
+        return None
+    return PlanState.decode(plan).status
 
 
-def get_workflow_state(workflow_path: Path) -> dict:
-    """Get the state.yml contents for a workflow."""
-    state_path = workflow_path / "state.yml"
-    if not state_path.exists():
-        return {}
-    return read_yaml_file(state_path)
+def get_workflow_state(workflow_path: Path) -> WorkflowState:
+    """Get the decoded state.yml of a workflow (defaults if missing)."""
+    return WorkflowState.decode(read_yaml_file(workflow_path / "state.yml"))
 
 
-def update_workflow_state_status(workflow_path: Path, new_status: str) -> bool:
-    """Update the status in a workflow's state.yml."""
+def update_workflow_state_status(workflow_path: Path, new_status: str, txn=None) -> bool:
+    """Update the status in a workflow's state.yml (staged in `txn` if given)."""
     state_path = workflow_path / "state.yml"
     if not state_path.exists():
         return False
     
     today = date.today().strftime(cfg.defaults.date_format)
     state = read_yaml_file(state_path)
+    if not state:
+        return False
+    before = WorkflowState.decode(state)
     state['status'] = new_status
     state['updated'] = today
     
-    write_yaml_simple(state_path, state)
+    if txn is not None:
+        txn.patch(state_path, state)
+    else:
+        statefile.patch(state_path, state)
+    journal.record_state(workflow_path.name, before.workflow_type, before,
+                         before._replace(status=new_status), txn)
     return True
 
 
@@ -172,17 +122,138 @@ def get_completion_status(workflow_type: str) -> str:
         return "completed"
 
 
-def validate_workflows(dry_run: bool = False) -> dict:
+# Validation manifest: per-workflow state file fingerprints plus the statuses
+# read last time, so unchanged workflows are not re-parsed.
+VALIDATE_MANIFEST = "validate-manifest.json"
+VALIDATE_MANIFEST_VERSION = 1
+
+
+def _file_fingerprint(path: Path) -> Optional[list]:
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def workflow_fingerprint(workflow_path: Path) -> list:
+    """Fingerprint of every file validate_workflows reads for a workflow."""
+    return [
+        _file_fingerprint(workflow_path / "state.yml"),
+        _file_fingerprint(workflow_path / "implementation-plan" / "plan-state.yml"),
+        _file_fingerprint(workflow_path / "fix-plan" / "plan-state.yml"),
+    ]
+
+
+def read_validate_manifest() -> dict:
+    """Read the validation manifest (empty if missing or outdated)."""
+    path = get_cache_path(VALIDATE_MANIFEST)
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != VALIDATE_MANIFEST_VERSION:
+        return {}
+    return manifest.get("workflows", {})
+
+
+def write_validate_manifest(workflows: dict) -> None:
+    """Atomically write the validation manifest (best effort)."""
+    path = get_cache_path(VALIDATE_MANIFEST)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps({
+            "version": VALIDATE_MANIFEST_VERSION,
+            "workflows": workflows
+        }, separators=(",", ":")))
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def inspect_workflow(workflow_path: Path, workflow_type: str, manifest: dict) -> dict:
+    """
+    Return the manifest entry (fingerprint, plan_status, state_status) for a
+    workflow, re-parsing its state files only when their fingerprint differs
+    from the previous manifest entry.
+    """
+    fingerprint = workflow_fingerprint(workflow_path)
+
+    entry = manifest.get(f"{workflow_type}/{workflow_path.name}")
+    if entry is None or entry.get("fingerprint") != fingerprint:
+        entry = {
+            "fingerprint": fingerprint,
+            "plan_status": get_plan_state_status(workflow_path),
+            "state_status": get_workflow_state(workflow_path).status
+        }
+    return entry
+
+
+def validate_workflow(workflow_path: Path, workflow_type: str, manifest: dict,
+                      dry_run: bool, txn=None) -> tuple:
+    """
+    Validate one workflow, syncing its state.yml when its plan is completed
+    (the write is staged in `txn` when given).
+    Returns (category, item, manifest entry); category is "no_plan",
+    "updated", "already_synced" or None (plan not completed). The entry is
+    None when state.yml was rewritten and must be re-read next time.
+    """
+    entry = inspect_workflow(workflow_path, workflow_type, manifest)
+    plan_status = entry["plan_status"]
+    current_status = entry["state_status"]
+    target_status = get_completion_status(workflow_type)
+
+    item = {
+        "name": workflow_path.name,
+        "type": workflow_type,
+        "plan_status": plan_status,
+        "state_status": current_status
+    }
+
+    if plan_status is None:
+        return "no_plan", item, entry
+    if plan_status != "completed":
+        return None, item, entry
+    if current_status == target_status:
+        return "already_synced", item, entry
+
+    item["new_status"] = target_status
+    if not dry_run:
+        update_workflow_state_status(workflow_path, target_status, txn)
+        entry = None
+    return "updated", item, entry
+
+
+def default_jobs() -> int:
+    """Default validation thread count (same as ThreadPoolExecutor's)."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def validate_workflows(dry_run: bool = False, full: bool = False, jobs: int = None) -> dict:
     """Validate and sync completion states across all workflows.
     
     Checks:
     1. If plan-state.yml status is 'completed', ensure state.yml reflects completion
     2. If global-state points to a completed workflow, reset it
+
+    Workflows whose state files are unchanged since the last run are taken
+    from the validation manifest; pass full=True to re-read everything.
+    Per-workflow reads run on a pool of `jobs` threads (file latency, not
+    CPU, dominates); results are merged in features-then-bugs, name order so
+    the output is stable. All state.yml updates and the global state reset
+    are committed as one transaction.
     """
+    manifest = {} if full else read_validate_manifest()
+    seen = {}
+    txn = Transaction()
+    jobs = jobs or default_jobs()
+
     features_path = cfg.get_features_path()
     bugs_path = cfg.get_bugs_path()
     global_state_path = cfg.get_global_state_path()
-    today = date.today().strftime(cfg.defaults.date_format)
     
     result = {
         "status": "dry_run" if dry_run else "success",
@@ -204,68 +275,32 @@ def validate_workflows(dry_run: bool = False) -> dict:
         if isinstance(current, dict):
             current_context_name = current.get('name')
             current_context_type = current.get('workflow_type')
-    
-    # Process features
-    if features_path.exists():
-        for feature_dir in features_path.iterdir():
-            if not feature_dir.is_dir() or feature_dir.name == ".gitkeep":
-                continue
-            
-            workflow_name = feature_dir.name
-            plan_status = get_plan_state_status(feature_dir)
-            state = get_workflow_state(feature_dir)
-            current_status = state.get('status')
-            target_status = get_completion_status("feature")
-            
-            item = {
-                "name": workflow_name,
-                "type": "feature",
-                "plan_status": plan_status,
-                "state_status": current_status
-            }
-            
-            if plan_status is None:
-                result["no_plan"].append(item)
-            elif plan_status == "completed":
-                result["validated"].append(item)
-                if current_status != target_status:
-                    item["new_status"] = target_status
-                    if not dry_run:
-                        update_workflow_state_status(feature_dir, target_status)
-                    result["updated"].append(item)
-                else:
-                    result["already_synced"].append(item)
-    
-    # Process bugs
-    if bugs_path.exists():
-        for bug_dir in bugs_path.iterdir():
-            if not bug_dir.is_dir() or bug_dir.name == ".gitkeep":
-                continue
-            
-            workflow_name = bug_dir.name
-            plan_status = get_plan_state_status(bug_dir)
-            state = get_workflow_state(bug_dir)
-            current_status = state.get('status')
-            target_status = get_completion_status("bug")
-            
-            item = {
-                "name": workflow_name,
-                "type": "bug",
-                "plan_status": plan_status,
-                "state_status": current_status
-            }
-            
-            if plan_status is None:
-                result["no_plan"].append(item)
-            elif plan_status == "completed":
-                result["validated"].append(item)
-                if current_status != target_status:
-                    item["new_status"] = target_status
-                    if not dry_run:
-                        update_workflow_state_status(bug_dir, target_status)
-                    result["updated"].append(item)
-                else:
-                    result["already_synced"].append(item)
+
+    # Collect features and bugs in a deterministic order
+    workflows = [
+        (entry.path, entry.workflow_type)
+        for entry in scan(("feature", "bug"), artifacts=False)
+    ]
+
+    def run(workflow):
+        return validate_workflow(workflow[0], workflow[1], manifest, dry_run, txn)
+
+    if jobs > 1 and len(workflows) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(run, workflows))
+    else:
+        outcomes = [run(workflow) for workflow in workflows]
+
+    # Merge in input order (pool.map preserves it)
+    for (workflow_dir, workflow_type), (category, item, entry) in zip(workflows, outcomes):
+        if entry is not None:
+            seen[f"{workflow_type}/{workflow_dir.name}"] = entry
+        if category == "no_plan":
+            result["no_plan"].append(item)
+        elif category is not None:
+            result["validated"].append(item)
+            result[category].append(item)
     
     # Check if global state points to a completed workflow
     if current_context_name and current_context_type:
@@ -278,7 +313,11 @@ def validate_workflows(dry_run: bool = False) -> dict:
             workflow_path = None
         
         if workflow_path and workflow_path.exists():
-            plan_status = get_plan_state_status(workflow_path)
+            entry = seen.get(f"{current_context_type}/{current_context_name}")
+            if entry is not None:
+                plan_status = entry["plan_status"]
+            else:
+                plan_status = get_plan_state_status(workflow_path)
             if plan_status == "completed":
                 result["global_state_reset"] = True
                 result["global_state_was"] = {
@@ -286,13 +325,180 @@ def validate_workflows(dry_run: bool = False) -> dict:
                     "workflow_type": current_context_type
                 }
                 if not dry_run:
-                    reset_global_state()
-    
+                    reset_global_state(txn)
+
+    txn.commit()
+
+    if seen != manifest:
+        write_validate_manifest(seen)
+
+    return result
+
+
+# Removed workflows are renamed into .ai/.trash/<batch>/<type>/<name> (same
+# filesystem as the workflow folders, so the rename is atomic) and deleted by
+# a background reaper.
+TRASH_DIRNAME = ".trash"
+
+
+def get_trash_path() -> Path:
+    """Get path to the .ai/.trash folder."""
+    return cfg.get_features_path().parent / TRASH_DIRNAME
+
+
+def parse_date(value) -> Optional[date]:
+    """Parse a state file date (None if missing or not a date)."""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value), cfg.defaults.date_format).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _split(values: list) -> list:
+    """Flatten repeatable, comma-separated filter values."""
+    result = []
+    for value in values or []:
+        result.extend(v.strip() for v in value.split(",") if v.strip())
+    return result
+
+
+def select_workflows(snapshot, types: list = None, statuses: list = None,
+                     older_than: int = None) -> list:
+    """
+    Workflows matching every given filter, as (entry, state) pairs.
+    Age is counted from `updated`; workflows without a valid date never
+    match an age filter.
+    """
+    today = date.today()
+    selected = []
+    for entry in snapshot:
+        if types and entry.workflow_type not in types:
+            continue
+        state = get_workflow_state(entry.path)
+        if statuses and state.status not in statuses:
+            continue
+        if older_than is not None:
+            updated = parse_date(state.updated)
+            if updated is None or (today - updated).days < older_than:
+                continue
+        selected.append((entry, state))
+    return selected
+
+
+def move_to_trash(paths: list) -> Path:
+    """
+    Rename (path, trash name) pairs into a new trash batch folder.
+    Paths that cannot be renamed there (other filesystem) are deleted
+    in place instead.
+    """
+    import errno
+    import shutil
+
+    batch = get_trash_path() / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    for path, name in paths:
+        target = batch / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(path, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.rmtree(path)
+    return batch
+
+
+def start_reaper(jobs: int = None) -> bool:
+    """Start a detached reaper process that empties .ai/.trash."""
+    import shutil
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__), "--reap"]
+    if jobs:
+        command += ["--jobs", str(jobs)]
+    ionice = shutil.which("ionice")
+    if ionice:
+        # Idle I/O class: only use the disk when nothing else does
+        command = [ionice, "-c", "3"] + command
+
+    try:
+        with timing.span("subprocess"):
+            subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+    except OSError:
+        return False
+    return True
+
+
+def reap(jobs: int = None, low_priority: bool = False) -> dict:
+    """
+    Delete everything in .ai/.trash, one workflow folder per task on a pool
+    of `jobs` threads. With low_priority, the process first drops to the
+    lowest CPU priority (for the dedicated reaper process only).
+    """
+    import shutil
+
+    trash = get_trash_path()
+    result = {"status": "success", "trash": str(trash), "removed": 0}
+    if not trash.exists():
+        return result
+
+    if low_priority and hasattr(os, "nice"):
+        try:
+            os.nice(19)
+        except OSError:
+            pass
+
+    # batch/<type>/<name>, or batch/<type tree>/<name> after a full cleanup
+    batches = [batch for batch in trash.iterdir() if batch.is_dir()]
+    targets = [
+        workflow
+        for batch in batches
+        for group in batch.iterdir() if group.is_dir()
+        for workflow in group.iterdir()
+    ]
+
+    def remove(path):
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    jobs = jobs or default_jobs()
+    if jobs > 1 and len(targets) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(remove, targets))
+    else:
+        for target in targets:
+            remove(target)
+
+    for batch in batches:
+        shutil.rmtree(batch, ignore_errors=True)
+
+    result["removed"] = len(targets)
     return result
 
 
-def cleanup(dry_run: bool = False) -> dict:
-    """Remove all workflow folders and reset global state."""
+def cleanup(dry_run: bool = False, types: list = None, statuses: list = None,
+            older_than: int = None, background: bool = True, jobs: int = None,
+            take_snapshot: bool = True) -> dict:
+    """
+    Remove workflow folders and reset global state. With filters, only
+    matching workflows are removed. Everything removed is snapshotted first
+    (see snapshot.py) unless take_snapshot=False. Folders are moved to
+    .ai/.trash and deleted there by a background reaper (background=False:
+    before returning).
+    """
 
     # Gather current state using new getter methods
     features_path = cfg.get_features_path()
@@ -300,26 +506,21 @@ def cleanup(dry_run: bool = False) -> dict:
     ideas_path = cfg.get_ideas_path()
     global_state_path = cfg.get_global_state_path()
 
-    features = count_items_in_directory(features_path)
-    bugs = count_items_in_directory(bugs_path)
-    ideas = count_items_in_directory(ideas_path)
+    snapshot = scan(artifacts=False)
+    features = count_items(snapshot, "feature")
+    bugs = count_items(snapshot, "bug")
+    ideas = count_items(snapshot, "idea")
 
     has_current_context = False
     current_context_name = None
     current_context_type = None
 
     if global_state_path.exists():
-        content = global_state_path.read_text()
-        for line in content.split('\n'):
-            if line.startswith('name:'):
-                val = line.split(':', 1)[1].strip()
-                if val and val not in ['', 'null']:
-                    current_context_name = val
-                    has_current_context = True
-            elif line.startswith('workflow_type:'):
-                val = line.split(':', 1)[1].strip()
-                if val and val not in ['', 'null']:
-                    current_context_type = val
+        current = read_yaml_file(global_state_path).get('current')
+        if isinstance(current, dict) and current.get('name'):
+            has_current_context = True
+            current_context_name = current['name']
+            current_context_type = current.get('workflow_type')
 
     result = {
         "features": features,
@@ -333,29 +534,82 @@ def cleanup(dry_run: bool = False) -> dict:
         "dry_run": dry_run
     }
 
+    selective = bool(types or statuses or older_than is not None)
+    # A full cleanup always resets global-state.yml (also clearing a
+    # malformed or partial one); a selective one only if it removes the
+    # current context
+    reset_context = True
+    if selective:
+        selected = select_workflows(snapshot, types, statuses, older_than)
+        result["filters"] = {
+            "type": types or None,
+            "status": statuses or None,
+            "older_than": older_than
+        }
+        result["selected"] = [
+            {
+                "name": entry.name,
+                "type": entry.workflow_type,
+                "status": state.status,
+                "updated": state.updated
+            }
+            for entry, state in selected
+        ]
+        reset_context = any(
+            entry.name == current_context_name and entry.workflow_type == current_context_type
+            for entry, _ in selected
+        )
+    result["global_state_reset"] = reset_context
+
     if dry_run:
         result["status"] = "dry_run"
         return result
 
     # Perform cleanup
     try:
-        if features_path.exists():
-            shutil.rmtree(features_path)
-            features_path.mkdir(parents=True, exist_ok=True)
-            (features_path / ".gitkeep").touch()
-
-        if bugs_path.exists():
-            shutil.rmtree(bugs_path)
-            bugs_path.mkdir(parents=True, exist_ok=True)
-
-        if ideas_path.exists():
-            shutil.rmtree(ideas_path)
-            ideas_path.mkdir(parents=True, exist_ok=True)
-
-        reset_global_state()
+        if selective:
+            moves = [
+                (entry.path, Path(entry.workflow_type) / entry.name)
+                for entry, _ in selected
+            ]
+        else:
+            moves = [
+                (path, Path(path.name))
+                for path in (features_path, bugs_path, ideas_path)
+                if path.exists()
+            ]
+
+        if take_snapshot and moves:
+            from snapshot import create as create_snapshot
+            snapshot_paths = [path for path, _ in moves]
+            if reset_context:
+                snapshot_paths.append(global_state_path)
+            result["snapshot"] = create_snapshot(snapshot_paths, reason="cleanup")["id"]
+
+        if moves:
+            result["trash"] = str(move_to_trash(moves))
+
+        if not selective:
+            # Recreate (empty) only the folders that existed
+            for path, _ in moves:
+                path.mkdir(parents=True, exist_ok=True)
+            if features_path.exists():
+                (features_path / ".gitkeep").touch()
+
+        if reset_context:
+            reset_global_state()
+
+        if moves:
+            if background:
+                result["reaper_started"] = start_reaper(jobs)
+            else:
+                result["reaped"] = reap(jobs)["removed"]
 
         result["status"] = "success"
-        result["message"] = "All workflows and global state have been cleaned up"
+        if selective:
+            result["message"] = f"{len(selected)} workflow(s) removed"
+        else:
+            result["message"] = "All workflows and global state have been cleaned up"
 
     except Exception as e:
         result["status"] = "error"
@@ -364,6 +618,7 @@ def cleanup(dry_run: bool = False) -> dict:
     return result
 
 
+@timing.instrument("cleanup")
 def main():
     parser = argparse.ArgumentParser(
         description="Cleanup AI workflow directories and reset global state"
@@ -378,16 +633,81 @@ def main():
         action="store_true",
         help="Validate and sync completion states instead of full cleanup"
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="With --validate: re-read every workflow instead of only changed ones"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Worker threads for --validate and the reaper (default: CPU count + 4, max 32)"
+    )
+    parser.add_argument(
+        "--type",
+        action="append",
+        help="Only remove workflows of these types (feature, bug, idea; repeatable or comma-separated)"
+    )
+    parser.add_argument(
+        "--status",
+        action="append",
+        help="Only remove workflows with these statuses (e.g. completed,closed)"
+    )
+    parser.add_argument(
+        "--older-than",
+        type=int,
+        metavar="DAYS",
+        help="Only remove workflows whose 'updated' date is at least DAYS days ago"
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Delete removed folders before returning instead of in the background"
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Don't snapshot removed workflows (see snapshot.py)"
+    )
+    parser.add_argument(
+        "--reap",
+        action="store_true",
+        help="Delete everything in .ai/.trash (what the background reaper runs)"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Add a timings block to the JSON output (see timing.py)"
+    )
 
     args = parser.parse_args()
-    
-    if args.validate:
-        result = validate_workflows(dry_run=args.dry_run)
+    if args.timings:
+        timing.enable()
+
+    types = _split(args.type)
+    unknown = [t for t in types if t not in WORKFLOW_TYPES]
+    if unknown:
+        parser.error(f"unknown workflow type(s): {', '.join(unknown)}")
+    if args.older_than is not None and args.older_than < 0:
+        parser.error("--older-than must be non-negative")
+
+    if args.reap:
+        result = reap(jobs=args.jobs, low_priority=True)
+    elif args.validate:
+        result = validate_workflows(dry_run=args.dry_run, full=args.full, jobs=args.jobs)
     else:
-        result = cleanup(dry_run=args.dry_run)
+        result = cleanup(
+            dry_run=args.dry_run,
+            types=types,
+            statuses=_split(args.status),
+            older_than=args.older_than,
+            background=not args.wait,
+            jobs=args.jobs,
+            take_snapshot=not args.no_snapshot
+        )
 
     # Output JSON for AI parsing
-    print(json.dumps(result, indent=2))
+    print(json.dumps(timing.attach(result), indent=2))
 
     if result.get("status") == "error":
         sys.exit(1)
@@ -7,12 +7,33 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
-# Optional YAML support - falls back to defaults if not available
-try:
-    import yaml
-    HAS_YAML = True
-except ImportError:
-    HAS_YAML = False
+import statefile
+from timing import span
+
+# Optional YAML support - falls back to defaults if not available.
+# PyYAML is imported lazily (see _yaml) so commands that never parse YAML
+# don't pay for it; HAS_YAML is resolved on first access via __getattr__.
+_yaml_module = None
+
+
+def _yaml():
+    """Import PyYAML on first use; returns None when it isn't installed."""
+    global _yaml_module
+    if _yaml_module is None:
+        try:
+            import yaml
+            _yaml_module = yaml
+        except ImportError:
+            _yaml_module = False
+    return _yaml_module or None
+
+
+def _has_yaml() -> bool:
+    """Check whether PyYAML is installed without importing it."""
+    if _yaml_module is not None:
+        return bool(_yaml_module)
+    from importlib.machinery import PathFinder
+    return PathFinder.find_spec("yaml") is not None
 
 
 @dataclass
@@ -34,6 +55,10 @@ class DefaultsConfig:
     workflow_type: str = "feature"
 
 
+# paths attribute of each built-in workflow type
+DEFAULT_BASE_PATHS = {"feature": "features", "bug": "bugs", "idea": "ideas"}
+
+
 @dataclass
 class WorkflowTypeConfig:
     base_path: str
@@ -85,23 +110,52 @@ class Config:
 
     @classmethod
     def load(cls, config_path: Optional[Path] = None) -> "Config":
-        """Load config from YAML file or return defaults."""
-
+        """
+        Load config from YAML file or return defaults.
+        The discovered config path (per working directory) and the built
+        Config are cached in .ai/.cache/config.pickle, keyed by the file's
+        path, mtime and size, so repeat loads skip discovery and YAML parsing.
+        """
+        cache = _read_config_cache()
+        cwd = os.getcwd()
+
+        signature = None
         if config_path is None:
-            config_path = cls._find_config()
-
-        if config_path is None or not config_path.exists():
+            memoized = cache["roots"].get(cwd)
+            if memoized is not None:
+                config_path = Path(memoized)
+                signature = _stat_signature(config_path)
+            if signature is None:
+                config_path = cls._find_config()
+        if config_path is not None and signature is None:
+            signature = _stat_signature(config_path)
+
+        if signature is None:
             return cls()
 
-        if not HAS_YAML:
-            print("⚠ PyYAML not installed. Using default config.", file=sys.stderr)
-            print("  Install with: pip install pyyaml", file=sys.stderr)
-            return cls()
+        key = os.path.abspath(config_path)
+        cached = cache["configs"].get(key)
+        if cached is not None and cached[0] == signature and isinstance(cached[1], cls):
+            config = cached[1]
+        else:
+            yaml = _yaml()
+            if yaml is None:
+                print("⚠ PyYAML not installed. Using default config.", file=sys.stderr)
+                print("  Install with: pip install pyyaml", file=sys.stderr)
+                return cls()
+
+            with open(config_path) as f:
+                data = yaml.safe_load(f) or {}
+
+            config = cls._from_dict(data)
+            cache["configs"][key] = (signature, config)
+            cached = None
 
-        with open(config_path) as f:
-            data = yaml.safe_load(f) or {}
+        if cached is None or cache["roots"].get(cwd) != key:
+            _remember_root(cache, cwd, key)
+            _write_config_cache(cache)
 
-        return cls._from_dict(data)
+        return config
 
     @classmethod
     def _find_config(cls) -> Optional[Path]:
@@ -136,7 +190,7 @@ class Config:
         workflow_types = {}
         for type_name, type_data in workflow_types_data.items():
             workflow_types[type_name] = WorkflowTypeConfig(
-                base_path=type_data.get("base_path", "features"),
+                base_path=type_data.get("base_path", DEFAULT_BASE_PATHS.get(type_name, "features")),
                 states=type_data.get("states", []),
                 initial_state=type_data.get("initial_state", "clarifying"),
                 artifacts=type_data.get("artifacts", []),
@@ -203,11 +257,22 @@ class Config:
         """Get workflow type config, fallback to feature if not found."""
         return self.workflow_types.get(type_name, self._default_feature_workflow())
 
+    def get_workflow_base_path(self, workflow_type: str = "feature") -> Path:
+        """
+        Get path to the folder holding all workflows of a type.
+        Types missing from workflow_types (no config.yml, or no PyYAML) use
+        their own paths entry, not the feature fallback of get_workflow_type().
+        """
+        wf_config = self.workflow_types.get(workflow_type)
+        if wf_config is not None:
+            base_path = wf_config.base_path
+        else:
+            base_path = DEFAULT_BASE_PATHS.get(workflow_type, "features")
+        return Path(getattr(self.paths, base_path))
+
     def get_workflow_path(self, name: str, workflow_type: str = "feature") -> Path:
         """Get absolute path to a workflow item based on type."""
-        wf_config = self.get_workflow_type(workflow_type)
-        base_path = getattr(self.paths, wf_config.base_path)
-        return Path(base_path) / name
+        return self.get_workflow_base_path(workflow_type) / name
 
     def _default_feature_workflow(self):
         """Default feature workflow for backward compatibility."""
@@ -245,8 +310,129 @@ class Config:
         return index_path.exists()
 
 
-# Global config instance - loaded on import
-cfg = Config.load()
+# Workflow caches live in .ai/.cache next to this scripts folder, so they can be
+# found without walking up from the working directory.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+# Compiled config cache
+_CONFIG_CACHE_VERSION = 1
+_CONFIG_CACHE_PATH = os.path.join(CACHE_DIR, "config.pickle")
+# Working directories remembered (least recently used are dropped first)
+_CONFIG_CACHE_MAX_ROOTS = 64
+
+
+def _stat_signature(path: Path) -> Optional[tuple]:
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_cache_path(name: str) -> Path:
+    """Get path to a file in the .ai/.cache folder."""
+    return Path(CACHE_DIR) / name
+
+
+def _read_config_cache() -> dict:
+    """Read the compiled config cache; returns an empty cache on any problem."""
+    empty = {"version": _CONFIG_CACHE_VERSION, "roots": {}, "configs": {}}
+    try:
+        import pickle
+        with open(_CONFIG_CACHE_PATH, "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return empty
+
+    if not isinstance(cache, dict) or cache.get("version") != _CONFIG_CACHE_VERSION:
+        return empty
+    return cache
+
+
+def _remember_root(cache: dict, cwd: str, key: str) -> None:
+    """
+    Map a working directory to its config file, keeping at most
+    _CONFIG_CACHE_MAX_ROOTS directories and only the configs they use.
+    """
+    roots = cache["roots"]
+    roots.pop(cwd, None)
+    roots[cwd] = key  # Most recently resolved last
+    while len(roots) > _CONFIG_CACHE_MAX_ROOTS:
+        del roots[next(iter(roots))]
+    used = set(roots.values())
+    for path in [path for path in cache["configs"] if path not in used]:
+        del cache["configs"][path]
+
+
+def _write_config_cache(cache: dict) -> None:
+    """Atomically write the compiled config cache (best effort)."""
+    # Classes pickled from `python config.py` would belong to __main__
+    if __name__ != "config":
+        return
+
+    import pickle
+
+    tmp_path = f"{_CONFIG_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(_CONFIG_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _CONFIG_CACHE_PATH)
+    except OSError:
+        # Read-only checkout or similar - just parse YAML next time
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+# Global config instance - loaded on first access of `config.cfg`
+# (including `from config import cfg`), not as a side effect of import.
+def get_config() -> Config:
+    """Return the global config, loading it on first use."""
+    global cfg
+    if "cfg" not in globals():
+        with span("config.load"):
+            cfg = Config.load()
+    return cfg
+
+
+def __getattr__(name: str):
+    """Lazily resolve `cfg` and `HAS_YAML` module attributes."""
+    if name == "cfg":
+        return get_config()
+    if name == "HAS_YAML":
+        return _has_yaml()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Parsed-file cache shared by the workflow scripts. In a one-shot process it
+# only saves repeat reads; inside the workflow daemon (daemon.py) it lives for
+# the daemon's lifetime, with entries invalidated when a file changes on disk.
+_parse_cache: dict = {}
+
+
+def cached_parse(path: Path, parser):
+    """
+    Return parser(path), memoized on the file's inode, mtime and size (the
+    inode catches a same-size rename-based rewrite within the filesystem's
+    mtime granularity). The result is deep-copied so callers may mutate it
+    freely.
+    """
+    import copy
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return parser(path)
+
+    key = (os.fspath(path), parser)
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _parse_cache.get(key)
+    if cached is None or cached[0] != signature:
+        cached = (signature, parser(path))
+        _parse_cache[key] = cached
+
+    return copy.deepcopy(cached[1])
 
 
 # Global state management functions
@@ -254,7 +440,7 @@ cfg = Config.load()
 def _default_global_state() -> dict:
     """Default global state structure."""
     from datetime import date
-    today = date.today().strftime(cfg.defaults.date_format)
+    today = date.today().strftime(get_config().defaults.date_format)
     return {
         'version': 1,
         'current': {
@@ -267,77 +453,59 @@ def _default_global_state() -> dict:
     }
 
 
-def _parse_global_state_no_yaml(state_path: Path) -> dict:
-    """Parse global-state.yml without PyYAML (fallback)."""
-    state = _default_global_state()
-    content = state_path.read_text()
-
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('name:'):
-            val = line.split(':', 1)[1].strip()
-            state['current']['name'] = None if val == 'null' else val
-        elif line.startswith('workflow_type:'):
-            val = line.split(':', 1)[1].strip()
-            state['current']['workflow_type'] = None if val == 'null' else val
-        elif line.startswith('set_date:'):
-            val = line.split(':', 1)[1].strip()
-            state['current']['set_date'] = None if val == 'null' else val
-        elif line.startswith('set_method:'):
-            val = line.split(':', 1)[1].strip()
-            state['current']['set_method'] = None if val == 'null' else val
-        elif line.startswith('last_updated:'):
-            state['last_updated'] = line.split(':', 1)[1].strip()
-
-    return state
-
-
 def read_global_state() -> dict:
     """
     Read global state from memory/global-state.yml.
     Returns default structure if file doesn't exist or is corrupted.
     """
-    state_path = cfg.get_global_state_path()
+    state_path = get_config().get_global_state_path()
 
     if not state_path.exists():
         return _default_global_state()
 
     try:
-        if HAS_YAML:
-            with open(state_path) as f:
-                data = yaml.safe_load(f) or {}
-            return data
-        else:
-            # Parse without YAML library
-            return _parse_global_state_no_yaml(state_path)
+        return cached_parse(state_path, statefile.load)
     except Exception as e:
         print(f"⚠ Warning: Could not read global state: {e}", file=sys.stderr)
         return _default_global_state()
 
 
 def write_global_state(name: Optional[str], workflow_type: Optional[str],
-                       set_method: str = "auto") -> None:
+                       set_method: str = "auto", txn=None) -> None:
     """
     Write global state to memory/global-state.yml.
-    Creates memory folder if it doesn't exist.
+    Creates memory folder if it doesn't exist. With a transaction.Transaction
+    the write is staged in it instead of committed on its own.
     """
     from datetime import date
 
+    cfg = get_config()
     memory_path = cfg.get_memory_path()
     memory_path.mkdir(parents=True, exist_ok=True)
 
     today = date.today().strftime(cfg.defaults.date_format)
     state_path = cfg.get_global_state_path()
 
-    content = f"""version: 1
-current:
-  name: {name or 'null'}
-  workflow_type: {workflow_type or 'null'}
-  set_date: {today if name else 'null'}
-  set_method: {set_method if name else 'null'}
-last_updated: {today}
-"""
-    state_path.write_text(content)
+    state = {
+        'version': 1,
+        'current': {
+            'name': name or None,
+            'workflow_type': workflow_type or None,
+            'set_date': today if name else None,
+            'set_method': set_method if name else None
+        },
+        'last_updated': today
+    }
+    old = read_global_state().get('current') or {}
+    if txn is not None:
+        txn.patch(state_path, state)
+    else:
+        statefile.patch(state_path, state)
+
+    if (old.get('name'), old.get('workflow_type')) != (name or None, workflow_type or None):
+        import journal
+        journal.record('context', name or None, workflow_type or None,
+                       old.get('name'), name or None, txn=txn)
 
 
 def get_current_context() -> CurrentContext:
@@ -363,6 +531,7 @@ def reload_config(config_path: Optional[Path] = None) -> Config:
 
 if __name__ == "__main__":
     # Print current config when run directly
+    cfg = get_config()
     print(f"Config loaded:")
     print(f"  version: {cfg.version}")
     print(f"  paths.features: {cfg.paths.features}")
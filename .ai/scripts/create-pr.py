@@ -12,36 +12,34 @@ Usage:
 
 import argparse
 import json
-import re
-import subprocess
 import sys
-import io
 from pathlib import Path
 
 # Configure UTF-8 encoding for Windows console
 if sys.platform == "win32":
+    import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("create-pr")
+
 try:
     from config import cfg, get_current_context
+    from scanner import locate
+    import timing
 except ImportError:
     print("Error: Could not import config module", file=sys.stderr)
     sys.exit(1)
 
 
 def get_current_branch() -> str:
-    """Get the current git branch name."""
-    try:
-        result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return ""
+    """Get the current git branch name (read from .git, without spawning git)."""
+    from gitmeta import current_branch
+
+    return current_branch()
 
 
 def extract_ticket_id(text: str) -> tuple[str | None, str]:
@@ -54,6 +52,8 @@ def extract_ticket_id(text: str) -> tuple[str | None, str]:
     - feature/JIRA-123-description
     - TICKET-123-some-feature-name
     """
+    import re
+
     # Common ticket patterns: PROJECT-123, JIRA-456, etc.
     patterns = [
         r'([A-Z]{2,10}-\d+)',  # Standard: JIRA-123, ABC-1234
@@ -134,34 +134,38 @@ def read_prd_summary(workflow_path: Path) -> str | None:
     prd_path = workflow_path / "prd.md"
     if not prd_path.exists():
         return None
-    
+
+    import re
+    from sections import find_section, read_lines
+
+    overview = re.compile(r'^##\s*(Overview|Summary|Description)', re.IGNORECASE)
+
     try:
-        content = prd_path.read_text(encoding='utf-8')
-        
-        # Try to extract Overview or Summary section
-        # Look for ## Overview, ## Summary, or first paragraph after title
-        lines = content.split('\n')
-        in_overview = False
-        overview_lines = []
-        
-        for line in lines:
-            if re.match(r'^##\s*(Overview|Summary|Description)', line, re.IGNORECASE):
-                in_overview = True
-                continue
-            elif in_overview:
-                if line.startswith('##'):
-                    break  # Next section
+        # Seek to the Overview, Summary or Description section; further
+        # overview headings continue it, any other ## heading ends it
+        section = find_section(
+            prd_path, "prd-summary",
+            is_start=overview.match,
+            is_end=lambda title: title.startswith('##') and not overview.match(title)
+        )
+        if section is not None:
+            overview_lines = []
+            for line in read_lines(prd_path, section.start, section.end):
+                if overview.match(line):
+                    continue
                 if line.strip():
                     overview_lines.append(line)
-        
-        if overview_lines:
-            return '\n'.join(overview_lines[:10])  # Limit to first 10 lines
-        
+                    if len(overview_lines) == 10:  # Limit to first 10 lines
+                        break
+
+            if overview_lines:
+                return '\n'.join(overview_lines)
+
         # Fallback: return first meaningful paragraph
-        for line in lines:
+        for line in read_lines(prd_path):
             if line.strip() and not line.startswith('#'):
                 return line.strip()
-        
+
         return None
     except Exception:
         return None
@@ -172,23 +176,25 @@ def read_plan_overview(workflow_path: Path) -> str | None:
     plan_path = workflow_path / "implementation-plan" / "plan.md"
     if not plan_path.exists():
         return None
-    
+
+    from sections import read_lines
+
     try:
-        content = plan_path.read_text(encoding='utf-8')
-        
-        # Extract first section or overview
-        lines = content.split('\n')
+        # Extract first section or overview; reading stops at the second
+        # section or after 10 lines
         overview_lines = []
-        
-        for line in lines:
+
+        for line in read_lines(plan_path):
             if line.startswith('## ') and overview_lines:
                 break  # Stop at second section
             if line.strip() and not line.startswith('# '):
                 overview_lines.append(line)
-        
+                if len(overview_lines) == 10:
+                    break
+
         if overview_lines:
-            return '\n'.join(overview_lines[:10])
-        
+            return '\n'.join(overview_lines)
+
         return None
     except Exception:
         return None
@@ -262,6 +268,7 @@ def build_az_command(title: str, body: str, base_branch: str) -> list[str]:
     ]
 
 
+@timing.instrument("create-pr")
 def main():
     parser = argparse.ArgumentParser(
         description="Create pull request based on workflow configuration",
@@ -293,19 +300,30 @@ def main():
         action="store_true",
         help="Output PR details as JSON without creating PR"
     )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Add a timings block to the JSON output (see timing.py)"
+    )
     
     args = parser.parse_args()
+    if args.timings:
+        timing.enable()
     
     # Resolve workflow context
+    archived = None
     if args.name:
         workflow_name = args.name
         # Determine workflow type by checking which path exists
-        if (Path(cfg.paths.features) / workflow_name).exists():
-            workflow_type = "feature"
-        elif (Path(cfg.paths.bugs) / workflow_name).exists():
-            workflow_type = "bug"
-        elif (Path(cfg.paths.ideas) / workflow_name).exists():
-            workflow_type = "idea"
+        entry = locate(workflow_name, ("feature", "bug", "idea"))
+        if entry is None:
+            # Finished workflows may have been moved into .ai/archive
+            from archive import lookup
+            archived = lookup(workflow_name, ("feature", "bug", "idea"))
+        if entry is not None:
+            workflow_type = entry.workflow_type
+        elif archived is not None:
+            workflow_type = archived.workflow_type
         else:
             print(json.dumps({
                 "error": f"Workflow '{workflow_name}' not found in features, bugs, or ideas",
@@ -323,10 +341,11 @@ def main():
             sys.exit(1)
         workflow_name = context.name
         workflow_type = context.workflow_type or "feature"
+        entry = locate(workflow_name, (workflow_type,))
     
     # Get workflow path
     workflow_path = cfg.get_workflow_path(workflow_name, workflow_type)
-    if not workflow_path.exists():
+    if entry is None and archived is None:
         print(json.dumps({
             "error": f"Workflow path does not exist: {workflow_path}",
             "status": "error"
@@ -355,6 +374,10 @@ def main():
     # Generate body
     if args.body:
         body = args.body
+    elif archived is not None:
+        from archive import materialize
+        with materialize(archived) as archived_entry:
+            body = generate_body(archived_entry.path, workflow_name, workflow_type)
     else:
         body = generate_body(workflow_path, workflow_name, workflow_type)
     
@@ -370,7 +393,8 @@ def main():
         "workflow": {
             "name": workflow_name,
             "type": workflow_type,
-            "path": str(workflow_path)
+            "path": str(workflow_path),
+            "archive": str(archived.pack) if archived is not None else None
         },
         "pr": {
             "title": title,
@@ -392,19 +416,22 @@ def main():
     }
     
     if args.dry_run:
-        print(json.dumps(result, indent=2))
+        print(json.dumps(timing.attach(result), indent=2))
         return
     
     # Execute command
+    import subprocess
+
     print(f"Creating PR: {title}", file=sys.stderr)
     try:
-        subprocess.run(command, check=True)
+        with timing.span("subprocess"):
+            subprocess.run(command, check=True)
         result["status"] = "created"
-        print(json.dumps(result, indent=2))
+        print(json.dumps(timing.attach(result), indent=2))
     except subprocess.CalledProcessError as e:
         result["status"] = "error"
         result["error"] = str(e)
-        print(json.dumps(result, indent=2))
+        print(json.dumps(timing.attach(result), indent=2))
         sys.exit(1)
 
 
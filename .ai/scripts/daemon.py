@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Workflow Daemon
+Opt-in long-lived process that serves the .ai/scripts commands over a Unix socket.
+
+Every slash command normally starts a fresh interpreter, loads the config and
+re-parses the state files. While the daemon runs it keeps `cfg`, the parsed
+state files and plan files in memory (entries are invalidated when a file's
+mtime changes), and the entry-point scripts forward their argv to it instead
+of doing the work themselves. When no daemon is listening, the scripts run
+in-process exactly as before.
+
+Usage:
+  python daemon.py start      # Start the daemon in the background
+  python daemon.py serve      # Run the daemon in the foreground
+  python daemon.py status     # Show whether a daemon is running (JSON output)
+  python daemon.py stop       # Stop the running daemon
+
+Set AI_WORKFLOW_NO_DAEMON=1 to force in-process execution.
+"""
+
+# Annotations stay unevaluated (dict | None on Python < 3.10) without
+# importing typing on the forwarding fast path
+from __future__ import annotations
+
+import os
+import sys
+
+from run import COMMANDS
+
+# Client-side paths are computed from this file's location so forwarding never
+# needs config discovery: .ai/scripts/daemon.py -> .ai/.cache/daemon.sock
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), ".cache")
+SOCKET_PATH = os.path.join(CACHE_DIR, "daemon.sock")
+
+# The client path only imports json/socket once a daemon socket exists, so
+# forwarding costs a single stat when no daemon is running.
+
+# Environment variables forwarded with each request
+ENV_PREFIX = "AI_WORKFLOW_"
+
+DEFAULT_IDLE_TIMEOUT = 1800  # seconds
+CONNECT_TIMEOUT = 1.0  # seconds
+
+
+def _daemon_available() -> bool:
+    """Check whether forwarding is enabled and a daemon socket exists."""
+    if os.environ.get("AI_WORKFLOW_NO_DAEMON"):
+        return False
+    return os.path.exists(SOCKET_PATH)
+
+
+def _send_request(request: dict, timeout: float = None) -> dict:
+    """Send one JSON request to the daemon and return its JSON response."""
+    import json
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(SOCKET_PATH)
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    return json.loads(b"".join(chunks).decode("utf-8") or "{}")
+
+
+def forward(command: str) -> None:
+    """
+    Run `command` in the daemon with the current argv, then exit with its code.
+    Returns normally when the caller should run in-process instead: no daemon,
+    daemon disabled, or the daemon declined the request.
+    """
+    if not _daemon_available():
+        return
+
+    request = {
+        "command": command,
+        "argv": sys.argv[1:],
+        "cwd": os.getcwd(),
+        "env": {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)},
+    }
+
+    try:
+        response = _send_request(request)
+    except (OSError, ValueError):
+        # Stale socket or daemon died mid-request - run in-process
+        return
+
+    if not response.get("handled"):
+        return
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    sys.exit(response.get("code", 0))
+
+
+def _servable(command: str, argv: list) -> bool:
+    """Whether the daemon may run this invocation on the client's behalf."""
+    if command not in COMMANDS:
+        return False
+    # Creating a PR runs gh/az, which may prompt on the user's terminal
+    if command == "create-pr" and "--dry-run" not in argv:
+        return False
+    # stdin isn't forwarded; batch input must be read by the client process
+    if "--stdin" in argv:
+        return False
+    # The reaper lowers its own process priority
+    if command == "cleanup" and "--reap" in argv:
+        return False
+    # Streamed output must reach the client as it is produced, not buffered
+    if command == "get-workflow-info" and ("--all" in argv or "--watch" in argv):
+        return False
+    return True
+
+
+def _exit_code(code) -> int:
+    """Translate a SystemExit code the way the interpreter would."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+class WorkflowDaemon:
+    """In-memory host for the workflow entry points."""
+
+    def __init__(self):
+        import config
+        import timing
+
+        # Each forwarded request is timed on its own; nothing to adopt
+        timing.mark_daemon()
+        self.config = config
+        self.cwd = os.getcwd()
+        self.modules = {}  # command -> (script mtime, module)
+        # Resolved once: the daemon only serves its own working directory.
+        # A config.yml created later above the cwd needs a daemon restart.
+        self.config_path = config.Config._find_config()
+        self.config_signature = self._config_signature()
+        self.served = 0
+
+    def _config_signature(self):
+        """Stat signature of the active config.yml (None if there is none)."""
+        if self.config_path is None:
+            return None
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh_config(self) -> None:
+        """Reload cfg when config.yml changed and rebind it in loaded scripts."""
+        signature = self._config_signature()
+        if signature == self.config_signature:
+            return
+
+        self.config_signature = signature
+        self.config.reload_config(self.config_path)
+        for _, module in self.modules.values():
+            if hasattr(module, "cfg"):
+                module.cfg = self.config.cfg
+
+    def _load(self, command: str):
+        """Import (or re-import after an edit) the script for `command`."""
+        from run import load_command
+
+        script_path = os.path.join(SCRIPTS_DIR, COMMANDS[command])
+        mtime = os.stat(script_path).st_mtime_ns
+
+        cached = self.modules.get(command)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        module = load_command(command)
+        self.modules[command] = (mtime, module)
+        return module
+
+    def handle(self, request: dict) -> dict:
+        """Run one forwarded invocation and capture its output."""
+        import io
+        import traceback
+        from contextlib import redirect_stderr, redirect_stdout
+
+        command = request.get("command")
+        argv = list(request.get("argv", []))
+
+        # Config paths are relative to the working directory, so only serve
+        # clients running from the same directory as the daemon
+        if request.get("cwd") != self.cwd or not _servable(command, argv):
+            return {"handled": False}
+
+        self._refresh_config()
+        module = self._load(command)
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        code = 0
+
+        saved_argv = sys.argv
+        saved_env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+        sys.argv = [os.path.join(SCRIPTS_DIR, COMMANDS[command])] + argv
+        for key in saved_env:
+            del os.environ[key]
+        os.environ.update(request.get("env", {}))
+
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    module.main()
+                except SystemExit as e:
+                    code = _exit_code(e.code)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            sys.argv = saved_argv
+            for key in [k for k in os.environ if k.startswith(ENV_PREFIX)]:
+                del os.environ[key]
+            os.environ.update(saved_env)
+
+        self.served += 1
+        return {
+            "handled": True,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "code": code,
+        }
+
+
+def _read_request(conn) -> dict:
+    """Read one newline-terminated JSON request from a client connection."""
+    import json
+
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return json.loads(b"".join(chunks).decode("utf-8") or "{}")
+
+
+def ping() -> dict | None:
+    """Return the running daemon's status, or None if none is listening."""
+    if not os.path.exists(SOCKET_PATH):
+        return None
+    try:
+        return _send_request({"command": "__ping__"}, timeout=CONNECT_TIMEOUT)
+    except (OSError, ValueError):
+        return None
+
+
+def serve(idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+    """Serve requests until stopped or idle for `idle_timeout` seconds."""
+    import json
+    import socket
+
+    if ping() is not None:
+        print(f"✗ Daemon already running on {SOCKET_PATH}", file=sys.stderr)
+        sys.exit(1)
+
+    # Make sibling modules (config, ...) importable regardless of how we started
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)  # left behind by a crashed daemon
+
+    daemon = WorkflowDaemon()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen(16)
+    server.settimeout(idle_timeout if idle_timeout > 0 else None)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break  # idle - exit so stale daemons don't linger
+
+            with conn:
+                conn.settimeout(30)
+                try:
+                    request = _read_request(conn)
+                except (OSError, ValueError):
+                    continue
+
+                command = request.get("command")
+                if command == "__ping__":
+                    response = {"pid": os.getpid(), "cwd": daemon.cwd, "served": daemon.served}
+                elif command == "__shutdown__":
+                    response = {"stopped": True}
+                else:
+                    response = daemon.handle(request)
+
+                try:
+                    conn.sendall(json.dumps(response).encode("utf-8"))
+                except OSError:
+                    pass
+
+                if command == "__shutdown__":
+                    break
+    finally:
+        server.close()
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+
+
+def start(idle_timeout: float) -> dict:
+    """Start a background daemon and wait until it answers."""
+    import subprocess
+    import time
+
+    status = ping()
+    if status is not None:
+        return {"status": "already_running", **status}
+
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve", "--idle-timeout", str(idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status = ping()
+        if status is not None:
+            return {"status": "started", **status}
+        time.sleep(0.05)
+
+    return {"status": "error", "error": "Daemon did not start within 5 seconds"}
+
+
+def stop() -> dict:
+    """Ask the running daemon to shut down."""
+    if ping() is None:
+        return {"status": "not_running"}
+    try:
+        _send_request({"command": "__shutdown__"}, timeout=CONNECT_TIMEOUT)
+    except (OSError, ValueError) as e:
+        return {"status": "error", "error": str(e)}
+    return {"status": "stopped"}
+
+
+def main():
+    import argparse
+    import json
+    import socket
+
+    parser = argparse.ArgumentParser(
+        description="Run the workflow scripts from a long-lived daemon",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        "action",
+        choices=["start", "serve", "status", "stop"],
+        help="Daemon action"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Exit after this many idle seconds, 0 to never exit (default: {DEFAULT_IDLE_TIMEOUT})"
+    )
+
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print(json.dumps({"status": "error", "error": "Unix sockets are not supported on this platform"}))
+        sys.exit(1)
+
+    if args.action == "serve":
+        serve(args.idle_timeout)
+        return
+
+    if args.action == "start":
+        result = start(args.idle_timeout)
+    elif args.action == "stop":
+        result = stop()
+    else:
+        status = ping()
+        result = {"status": "running", **status} if status else {"status": "not_running"}
+    result["socket"] = SOCKET_PATH
+
+    print(json.dumps(result, indent=2))
+
+    if result.get("status") == "error":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,154 +1,52 @@
 #!/usr/bin/env python3
-"""Gather comprehensive workflow state information for /help command."""
+"""
+Gather comprehensive workflow state information for /help command.
+
+Usage:
+  python get-workflow-info.py                      # Current context (JSON output)
+  python get-workflow-info.py my-feature           # Named feature or bug
+  python get-workflow-info.py --all                # Every workflow, one JSON line each
+  python get-workflow-info.py --all --offset 100 --limit 50
+  python get-workflow-info.py --watch              # One JSON line per state change (see watch.py)
+  python get-workflow-info.py my-feature --watch --poll --interval 2
+"""
 
 import argparse
 import json
 import sys
-from datetime import date
-from pathlib import Path
+from itertools import islice
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("get-workflow-info")
+
+import statefile
+import timing
 
 try:
-    from config import cfg, read_global_state, HAS_YAML
-    if HAS_YAML:
-        import yaml
+    from config import cfg, read_global_state, cached_parse
+    from model import PlanState, WorkflowState
+    from scanner import iter_workflows, load_entry, locate
 except ImportError:
-    # Fallback if config module not available
-    HAS_YAML = False
-    class FallbackConfig:
-        class paths:
-            features = ".ai/features"
-            bugs = ".ai/bugs"
-            memory = ".ai/memory"
-        class defaults:
-            date_format = "%Y-%m-%d"
-        def get_workflow_path(self, name, workflow_type):
-            base = self.paths.features if workflow_type == "feature" else self.paths.bugs
-            return Path(base) / name
-        def get_global_state_path(self):
-            return Path(self.paths.memory) / "global-state.yml"
-        def get_workflow_type(self, type_name):
-            if type_name == "feature":
-                return type('obj', (object,), {
-                    'states': ['clarifying', 'prd-draft', 'prd-approved', 'planning', 'in-progress', 'completed']
-                })()
-            else:
-                return type('obj', (object,), {
-                    'states': ['reported', 'triaged', 'fixing', 'resolved', 'closed']
-                })()
-    cfg = FallbackConfig()
-
-    def read_global_state():
-        """Fallback global state reader."""
-        state_path = cfg.get_global_state_path()
-        if not state_path.exists():
-            return {'version': 1, 'current': {'name': None, 'workflow_type': None, 'set_date': None, 'set_method': None}}
-
-        state = {'current': {}}
-        content = state_path.read_text()
-        for line in content.split('\n'):
-            line = line.strip()
-            if line.startswith('name:'):
-                val = line.split(':', 1)[1].strip()
-                state['current']['name'] = None if val == 'null' else val
-            elif line.startswith('workflow_type:'):
-                val = line.split(':', 1)[1].strip()
-                state['current']['workflow_type'] = None if val == 'null' else val
-            elif line.startswith('set_date:'):
-                val = line.split(':', 1)[1].strip()
-                state['current']['set_date'] = None if val == 'null' else val
-            elif line.startswith('set_method:'):
-                val = line.split(':', 1)[1].strip()
-                state['current']['set_method'] = None if val == 'null' else val
-        return state
-
-
-def convert_dates_to_strings(obj):
-    """Recursively convert date objects to strings for JSON serialization."""
-    if isinstance(obj, date):
-        return obj.strftime("%Y-%m-%d")
-    elif isinstance(obj, dict):
-        return {k: convert_dates_to_strings(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_dates_to_strings(item) for item in obj]
-    else:
-        return obj
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
 
 
-def read_yaml_file(file_path):
-    """Read YAML file with fallback parsing."""
+def read_yaml_file(file_path, cached=True):
+    """Read a state YAML file (None if missing or unparseable)."""
     if not file_path.exists():
         return None
 
     try:
-        if HAS_YAML:
-            with open(file_path) as f:
-                data = yaml.safe_load(f) or {}
-            # Convert any date objects to strings for JSON serialization
-            return convert_dates_to_strings(data)
-        else:
-            # Fallback parsing for state.yml
-            return parse_state_file_no_yaml(file_path)
+        if not cached:
+            return statefile.load(file_path)
+        return cached_parse(file_path, statefile.load)
     except Exception as e:
         print(f"Warning: Could not parse {file_path}: {e}", file=sys.stderr)
         return None
 
 
-def parse_state_file_no_yaml(file_path):
-    """Parse state YAML files without PyYAML library."""
-    state = {}
-    content = file_path.read_text()
-
-    for line in content.split('\n'):
-        line = line.strip()
-        if ':' in line and not line.startswith('-'):
-            key, val = line.split(':', 1)
-            state[key.strip()] = val.strip()
-
-    return state
-
-
-def parse_plan_state_no_yaml(file_path):
-    """Parse plan-state.yml without PyYAML."""
-    state = {
-        'status': 'pending',
-        'current_phase': 0,
-        'created': None,
-        'updated': None,
-        'phases': []
-    }
-
-    content = file_path.read_text()
-    lines = content.split('\n')
-
-    in_phases = False
-    current_phase = None
-
-    for line in lines:
-        stripped = line.strip()
-
-        if stripped.startswith('status:'):
-            state['status'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('current_phase:'):
-            state['current_phase'] = int(stripped.split(':', 1)[1].strip())
-        elif stripped.startswith('created:'):
-            state['created'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('updated:'):
-            state['updated'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('phases:'):
-            in_phases = True
-        elif in_phases and stripped.startswith('- name:'):
-            if current_phase:
-                state['phases'].append(current_phase)
-            current_phase = {'name': stripped.split(':', 1)[1].strip(), 'status': 'pending'}
-        elif in_phases and stripped.startswith('status:') and current_phase:
-            current_phase['status'] = stripped.split(':', 1)[1].strip()
-
-    if current_phase:
-        state['phases'].append(current_phase)
-
-    return state
-
-
 def gather_current_context():
     """Read global state to get current workflow context."""
     global_state = read_global_state()
@@ -165,60 +63,60 @@ def gather_current_context():
     }
 
 
-def count_clarifications_in_file(file_path):
+def count_clarifications_in_file(file_path, cached=True):
     """Count clarifications in request.md's ## Clarifications section."""
-    if not file_path.exists():
-        return 0
+    from clarifications import load_index
 
     try:
-        content = file_path.read_text()
-        # Check if ## Clarifications section exists
-        if '## Clarifications' not in content:
-            return 0
-
-        # Count #### Q patterns (each question)
-        import re
-        questions = re.findall(r'####\s+Q\d+:', content)
-        return len(questions)
+        return load_index(file_path, cached)['count']
     except Exception:
         return 0
 
 
-def check_artifacts(workflow_path, workflow_type):
-    """Check which artifact files exist for a workflow."""
+def check_artifacts(entry, cached=True):
+    """Check which artifact files exist for a scanned workflow."""
     artifacts = {}
 
     # Common artifacts
-    artifacts['context_md'] = (workflow_path / 'context.md').exists()
+    artifacts['context_md'] = entry.has('context.md')
 
     # Count clarifications in request.md
-    request_file = workflow_path / 'request.md'
-    artifacts['clarifications_count'] = count_clarifications_in_file(request_file)
+    if entry.has('request.md'):
+        artifacts['clarifications_count'] = count_clarifications_in_file(entry.path / 'request.md', cached)
+    else:
+        artifacts['clarifications_count'] = 0
 
     # Workflow-specific artifacts
-    if workflow_type == 'feature':
-        artifacts['prd_md'] = (workflow_path / 'prd.md').exists()
-        artifacts['implementation_plan'] = (workflow_path / 'implementation-plan').exists()
+    if entry.workflow_type == 'feature':
+        artifacts['prd_md'] = entry.has('prd.md')
+        artifacts['implementation_plan'] = entry.has('implementation-plan')
         artifacts['triage_md'] = False
         artifacts['fix_plan_md'] = False
-    else:  # bug
+    elif entry.workflow_type == 'bug':
+        artifacts['prd_md'] = False
+        artifacts['implementation_plan'] = False
+        artifacts['triage_md'] = entry.has('triage.md')
+        artifacts['fix_plan_md'] = entry.has('fix-plan.md')
+    else:  # idea
         artifacts['prd_md'] = False
         artifacts['implementation_plan'] = False
-        artifacts['triage_md'] = (workflow_path / 'triage.md').exists()
-        artifacts['fix_plan_md'] = (workflow_path / 'fix-plan.md').exists()
+        artifacts['triage_md'] = False
+        artifacts['fix_plan_md'] = False
 
     return artifacts
 
 
-def gather_workflow_state(name, workflow_type):
+def gather_workflow_state(name, workflow_type, entry=None, cached=True):
     """Read workflow state.yml file."""
-    workflow_path = cfg.get_workflow_path(name, workflow_type)
+    if entry is None:
+        entry = locate(name, (workflow_type,), cfg)
 
-    if not workflow_path.exists():
+    if entry is None:
         return {'exists': False}
 
-    state_file = workflow_path / 'state.yml'
-    state_data = read_yaml_file(state_file)
+    state_data = None
+    if entry.has('state.yml'):
+        state_data = read_yaml_file(entry.path / 'state.yml', cached)
 
     if state_data is None:
         return {
@@ -226,41 +124,38 @@ def gather_workflow_state(name, workflow_type):
             'error': 'Missing or corrupted state.yml'
         }
 
-    artifacts = check_artifacts(workflow_path, workflow_type)
+    state = WorkflowState.decode(state_data)
+    artifacts = check_artifacts(entry, cached)
 
     return {
         'exists': True,
-        'status': state_data.get('status', 'unknown'),
-        'created': state_data.get('created'),
-        'updated': state_data.get('updated'),
+        'status': state.status,
+        'created': state.created,
+        'updated': state.updated,
         'artifacts': artifacts
     }
 
 
-def gather_plan_state(name):
+def gather_plan_state(name, workflow_path=None, cached=True):
     """Read implementation plan state (features only)."""
-    workflow_path = cfg.get_workflow_path(name, 'feature')
+    if workflow_path is None:
+        workflow_path = cfg.get_workflow_path(name, 'feature')
     plan_state_file = workflow_path / 'implementation-plan' / 'plan-state.yml'
 
     if not plan_state_file.exists():
         return {'exists': False}
 
-    if HAS_YAML:
-        with open(plan_state_file) as f:
-            plan_data = yaml.safe_load(f) or {}
-        # Convert any date objects to strings for JSON serialization
-        plan_data = convert_dates_to_strings(plan_data)
+    if cached:
+        plan = PlanState.decode(cached_parse(plan_state_file, statefile.load))
     else:
-        plan_data = parse_plan_state_no_yaml(plan_state_file)
-
-    phases = plan_data.get('phases', [])
+        plan = PlanState.decode(statefile.load(plan_state_file))
 
     return {
         'exists': True,
-        'status': plan_data.get('status', 'pending'),
-        'current_phase': plan_data.get('current_phase', 0),
-        'total_phases': len(phases),
-        'phases': phases
+        'status': plan.status,
+        'current_phase': plan.current_phase,
+        'total_phases': len(plan.phases),
+        'phases': [phase.encode() for phase in plan.phases]
     }
 
 
@@ -275,16 +170,156 @@ def gather_workflow_config():
     }
 
 
+def iter_workflow_records(offset=0, limit=None):
+    """
+    Yield one record per feature, bug and idea, in scan order, reading each
+    workflow only when its record is requested. Nothing is kept between
+    records (the parse cache is bypassed), so memory stays flat on any tree
+    size. Skipped workflows (offset) are never opened.
+    """
+    stop = None if limit is None else offset + limit
+    listed = iter_workflows(cfg=cfg, artifacts=False)
+
+    for listed_entry in islice(listed, offset, stop):
+        entry = load_entry(listed_entry.workflow_type, listed_entry.path)
+        if entry is None:
+            continue  # Removed since it was listed
+
+        workflow_state = gather_workflow_state(entry.name, entry.workflow_type, entry, cached=False)
+
+        plan_state = {'exists': False}
+        if entry.workflow_type == 'feature' and workflow_state.get('exists'):
+            try:
+                plan_state = gather_plan_state(entry.name, entry.path, cached=False)
+            except (OSError, statefile.StateFileError) as e:
+                plan_state = {'exists': False, 'error': f"Could not parse plan-state.yml: {e}"}
+
+        yield {
+            'name': entry.name,
+            'workflow_type': entry.workflow_type,
+            'workflow_state': workflow_state,
+            'plan_state': plan_state
+        }
+
+
+def write_line(record):
+    """Print a record as one compact JSON line, flushed at once."""
+    sys.stdout.write(json.dumps(record, separators=(',', ':')) + '\n')
+    sys.stdout.flush()
+
+
+def drop_output():
+    """Consumer stopped reading (e.g. piped into head); drop pending output."""
+    import os
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(0)
+
+
+def stream_all(offset=0, limit=None):
+    """Print every workflow record as one compact JSON line, as it is read."""
+    try:
+        for record in iter_workflow_records(offset, limit):
+            write_line(record)
+    except BrokenPipeError:
+        drop_output()
+
+
+def watch_changes(workflow_name=None, poll=False, interval=None):
+    """Print one JSON line per workflow state change until interrupted."""
+    import watch
+
+    timing.skip_trace()
+    try:
+        watch.watch(write_line, workflow_name, poll, interval or watch.DEFAULT_INTERVAL)
+    except BrokenPipeError:
+        drop_output()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+def archived_info(workflow_name, current_context):
+    """
+    Print the info of an archived workflow (read through its pack file).
+    Returns False if the workflow isn't archived either.
+    """
+    from archive import lookup, materialize
+
+    archived = lookup(workflow_name, ('feature', 'bug'))
+    if archived is None:
+        return False
+
+    with materialize(archived) as entry:
+        workflow_state = gather_workflow_state(workflow_name, archived.workflow_type, entry, cached=False)
+        plan_state = {'exists': False}
+        if archived.workflow_type == 'feature' and workflow_state.get('exists'):
+            plan_state = gather_plan_state(workflow_name, entry.path, cached=False)
+    workflow_state['archived'] = {'pack': str(archived.pack), 'date': archived.archived}
+
+    result = {
+        'status': 'success',
+        'current_context': current_context,
+        'workflow_state': workflow_state,
+        'plan_state': plan_state,
+        'workflow_config': gather_workflow_config()
+    }
+    print(json.dumps(timing.attach(result), indent=2))
+    return True
+
+
+@timing.instrument("get-workflow-info")
 def main():
-    parser = argparse.ArgumentParser(description="Gather workflow state information")
+    parser = argparse.ArgumentParser(
+        description="Gather workflow state information",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
     parser.add_argument("workflow_name", nargs='?', help="Workflow name (optional, uses current context if omitted)")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Stream every feature, bug and idea as newline-delimited JSON"
+    )
+    parser.add_argument("--offset", type=int, default=0, help="With --all: skip this many workflows")
+    parser.add_argument("--limit", type=int, help="With --all: stop after this many workflows")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Print one JSON line per state change (only the named workflow's, if given) until interrupted"
+    )
+    parser.add_argument("--poll", action="store_true", help="With --watch: poll instead of using inotify")
+    parser.add_argument("--interval", type=float, help="With --watch: seconds between polls (default: 1)")
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Add a timings block to the JSON output (see timing.py; not with --all)"
+    )
     args = parser.parse_args()
+    if args.timings:
+        timing.enable()
+
+    if args.all:
+        if args.workflow_name is not None or args.watch:
+            parser.error("--all cannot be combined with a workflow name or --watch")
+        if args.offset < 0 or (args.limit is not None and args.limit < 0):
+            parser.error("--offset and --limit must be non-negative")
+        stream_all(args.offset, args.limit)
+        sys.exit(0)
+    if args.offset or args.limit is not None:
+        parser.error("--offset and --limit require --all")
+    if args.watch:
+        if args.interval is not None and args.interval <= 0:
+            parser.error("--interval must be positive")
+        watch_changes(args.workflow_name, args.poll, args.interval)
+        sys.exit(0)
+    if args.poll or args.interval is not None:
+        parser.error("--poll and --interval require --watch")
 
     # Gather current context
     current_context = gather_current_context()
 
     # Determine workflow name
     workflow_name = args.workflow_name
+    entry = None
     if workflow_name is None:
         if not current_context['exists']:
             # No current context and no name provided
@@ -295,20 +330,19 @@ def main():
                 'plan_state': {'exists': False},
                 'workflow_config': gather_workflow_config()
             }
-            print(json.dumps(result, indent=2))
+            print(json.dumps(timing.attach(result), indent=2))
             sys.exit(0)
 
         workflow_name = current_context['name']
         workflow_type = current_context['workflow_type']
     else:
         # Explicit name provided - detect type
-        feature_path = cfg.get_workflow_path(workflow_name, 'feature')
-        bug_path = cfg.get_workflow_path(workflow_name, 'bug')
+        entry = locate(workflow_name, ('feature', 'bug'), cfg)
 
-        if feature_path.exists():
-            workflow_type = 'feature'
-        elif bug_path.exists():
-            workflow_type = 'bug'
+        if entry is not None:
+            workflow_type = entry.workflow_type
+        elif archived_info(workflow_name, current_context):
+            sys.exit(0)
         else:
             # Workflow not found
             result = {
@@ -319,11 +353,11 @@ def main():
                 'plan_state': {'exists': False},
                 'workflow_config': gather_workflow_config()
             }
-            print(json.dumps(result, indent=2))
+            print(json.dumps(timing.attach(result), indent=2))
             sys.exit(1)
 
     # Gather workflow state
-    workflow_state = gather_workflow_state(workflow_name, workflow_type)
+    workflow_state = gather_workflow_state(workflow_name, workflow_type, entry)
 
     # Gather plan state (features only)
     plan_state = {'exists': False}
@@ -342,7 +376,7 @@ def main():
         'workflow_config': workflow_config
     }
 
-    print(json.dumps(result, indent=2))
+    print(json.dumps(timing.attach(result), indent=2))
     sys.exit(0)
 
 
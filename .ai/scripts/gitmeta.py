@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Git Metadata Reader
+Current branch, HEAD commit and ref listings read straight from the .git
+folder (HEAD, loose refs, packed-refs, worktree `gitdir:` indirection), so
+scripts get branch information without spawning git.
+
+Layouts this reader doesn't handle (GIT_DIR/GIT_COMMON_DIR overrides, the
+reftable ref format, unreadable or unexpected HEAD contents) fall back to the
+git CLI.
+
+Usage:
+  from gitmeta import current_branch, head_commit, list_refs
+
+  branch = current_branch()            # "" when HEAD is detached or outside a repo
+  commit = head_commit()               # HEAD commit id, None if unborn or outside a repo
+  branches = list_refs("refs/heads/")  # {"refs/heads/main": "<commit id>", ...}
+"""
+
+import os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+SYMREF_PREFIX = "ref: "
+MAX_SYMREF_DEPTH = 5
+
+# packed-refs parsed per process, keyed by (path, mtime_ns, size)
+_packed_refs_cache = {}
+
+
+class _Unsupported(Exception):
+    """Repository layout this reader doesn't handle; use the git CLI instead."""
+
+
+class GitDirs(NamedTuple):
+    """A repository's git folder (per worktree) and its common folder."""
+    git_dir: Path
+    common_dir: Path
+
+
+def _is_object_id(value: str) -> bool:
+    """True for a full SHA-1 or SHA-256 object id."""
+    return len(value) in (40, 64) and all(c in "0123456789abcdef" for c in value)
+
+
+def _read_first_line(path: Path) -> Optional[str]:
+    """First line of a small file, stripped (None if it doesn't exist)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.readline().strip()
+    except FileNotFoundError:
+        return None
+    except (OSError, UnicodeDecodeError):
+        raise _Unsupported(f"Could not read {path}")
+
+
+def find_git_dirs(start: Optional[Path] = None) -> Optional[GitDirs]:
+    """
+    Find the git folders for `start` (default: the working directory),
+    walking up like git does. None outside a repository.
+    """
+    if os.environ.get("GIT_DIR") or os.environ.get("GIT_COMMON_DIR"):
+        raise _Unsupported("GIT_DIR is set")
+
+    path = Path(start or os.getcwd()).resolve()
+    for directory in (path, *path.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            git_dir = dot_git
+        elif dot_git.is_file():
+            # Worktrees and submodules: ".git" is a file pointing at the git folder
+            line = _read_first_line(dot_git) or ""
+            if not line.startswith("gitdir:"):
+                raise _Unsupported(f"Unexpected contents in {dot_git}")
+            git_dir = (directory / line[len("gitdir:"):].strip()).resolve()
+        else:
+            continue
+
+        commondir = _read_first_line(git_dir / "commondir")
+        common_dir = (git_dir / commondir).resolve() if commondir else git_dir
+        if (common_dir / "reftable").is_dir():
+            raise _Unsupported("reftable ref storage")
+        return GitDirs(git_dir, common_dir)
+    return None
+
+
+def _packed_refs(common_dir: Path) -> dict:
+    """{refname: object id} from packed-refs (cached while the file is unchanged)."""
+    path = common_dir / "packed-refs"
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    except OSError:
+        raise _Unsupported(f"Could not read {path}")
+
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    refs = _packed_refs_cache.get(key)
+    if refs is None:
+        refs = {}
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                # "# pack-refs with: ..." header and "^<id>" peeled tag lines
+                if line.startswith(("#", "^")):
+                    continue
+                parts = line.split()
+                if len(parts) == 2 and _is_object_id(parts[0]):
+                    refs[parts[1]] = parts[0]
+        _packed_refs_cache.clear()
+        _packed_refs_cache[key] = refs
+    return refs
+
+
+def _read_ref(dirs: GitDirs, name: str) -> Optional[str]:
+    """Raw value of a loose or packed ref ("ref: ..." or an object id)."""
+    # HEAD and per-worktree refs live in the worktree's git folder
+    for base in (dirs.git_dir, dirs.common_dir):
+        value = _read_first_line(base / name)
+        if value is not None:
+            return value
+    return _packed_refs(dirs.common_dir).get(name)
+
+
+def _resolve(dirs: GitDirs, name: str) -> tuple:
+    """(refname, object id) after following symbolic refs; id is None if unborn."""
+    for _ in range(MAX_SYMREF_DEPTH):
+        value = _read_ref(dirs, name)
+        if value is None:
+            return name, None
+        if value.startswith(SYMREF_PREFIX):
+            name = value[len(SYMREF_PREFIX):].strip()
+            continue
+        if not _is_object_id(value):
+            raise _Unsupported(f"Unexpected value for {name}")
+        return name, value
+    raise _Unsupported(f"Symbolic ref loop at {name}")
+
+
+def _git(*args: str) -> Optional[str]:
+    """Output of a git command, stripped (None if it fails)."""
+    import subprocess
+    from timing import span
+
+    try:
+        with span("subprocess"):
+            result = subprocess.run(
+                ["git", *args],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def current_branch(start: Optional[Path] = None) -> str:
+    """
+    Name of the checked-out branch, as `git branch --show-current` prints it:
+    "" when HEAD is detached or outside a repository.
+    """
+    try:
+        dirs = find_git_dirs(start)
+        if dirs is None:
+            return ""
+        head = _read_ref(dirs, "HEAD")
+        if head is None:
+            raise _Unsupported("No HEAD")
+    except _Unsupported:
+        return _git("branch", "--show-current") or ""
+
+    if head.startswith(SYMREF_PREFIX):
+        ref = head[len(SYMREF_PREFIX):].strip()
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ""
+    return ""
+
+
+def head_commit(start: Optional[Path] = None) -> Optional[str]:
+    """Object id HEAD points to (None on an unborn branch or outside a repository)."""
+    try:
+        dirs = find_git_dirs(start)
+        if dirs is None:
+            return None
+        return _resolve(dirs, "HEAD")[1]
+    except _Unsupported:
+        return _git("rev-parse", "--verify", "--quiet", "HEAD") or None
+
+
+def list_refs(prefix: str = "refs/", start: Optional[Path] = None) -> dict:
+    """{refname: object id} of every ref under `prefix` (e.g. "refs/heads/"), sorted."""
+    try:
+        dirs = find_git_dirs(start)
+        if dirs is None:
+            return {}
+        refs = {name: value for name, value in _packed_refs(dirs.common_dir).items()
+                if name.startswith(prefix)}
+
+        # Loose refs override packed ones
+        refs_root = dirs.common_dir / "refs"
+        for dirpath, _, filenames in os.walk(refs_root):
+            for filename in filenames:
+                if filename.endswith(".lock"):
+                    continue
+                name = "refs/" + Path(dirpath, filename).relative_to(refs_root).as_posix()
+                if not name.startswith(prefix):
+                    continue
+                value = _resolve(dirs, name)[1]
+                if value is not None:
+                    refs[name] = value
+                else:
+                    refs.pop(name, None)
+    except _Unsupported:
+        output = _git("for-each-ref", "--format=%(objectname) %(refname)", prefix.rstrip("/"))
+        refs = dict(reversed(line.split(" ", 1)) for line in (output or "").splitlines())
+
+    return dict(sorted(refs.items()))
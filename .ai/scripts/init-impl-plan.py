@@ -2,23 +2,24 @@
 """Initialize implementation plan folder structure."""
 
 import argparse
-import shutil
 import sys
 from datetime import date
-from pathlib import Path
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("init-impl-plan")
 
 try:
     from config import cfg
+    from model import PlanState, WorkflowState
+    from transaction import Transaction
+    import journal
+    import statefile
+    import timing
 except ImportError:
-    # Fallback if config module not available
-    class FallbackConfig:
-        class paths:
-            features = ".ai/features"
-        class defaults:
-            date_format = "%Y-%m-%d"
-        def get_feature_path(self, name):
-            return Path(self.paths.features) / name
-    cfg = FallbackConfig()
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
 
 
 def init_impl_plan(feature_name: str) -> None:
@@ -57,19 +58,24 @@ def init_impl_plan(feature_name: str) -> None:
             else:
                 print(f"⚠ Warning: Empty implementation-plan folder found at {impl_path}")
                 print(f"  Removing and re-initializing...\n")
+            if existing_files:
+                from snapshot import create as create_snapshot
+                snapshot_id = create_snapshot([impl_path], reason=f"init-impl-plan {feature_name}")["id"]
+                print(f"  Snapshot of the removed files: {snapshot_id}")
+                print(f"  Undo with: python .ai/scripts/snapshot.py restore {snapshot_id}\n")
+            import shutil
             shutil.rmtree(impl_path)
 
     # Create directory
     impl_path.mkdir(parents=True)
 
+    # plan-state.yml, plan.md and the state.yml update land in one transaction
+    txn = Transaction()
+
     # plan-state.yml
-    state_content = f"""status: pending
-current_phase: 0
-created: {today}
-updated: {today}
-phases: []
-"""
-    (impl_path / "plan-state.yml").write_text(state_content)
+    plan_state = PlanState(created=today, updated=today)
+    txn.write(impl_path / "plan-state.yml", statefile.dumps(plan_state.encode()))
+    journal.record_plan(feature_name, 'feature', None, plan_state, txn)
 
     # plan.md (empty template)
     plan_content = f"""# Implementation Plan: {feature_name}
@@ -89,23 +95,20 @@ phases: []
 
 <!-- Run /define-implementation-plan to populate this file -->
 """
-    (impl_path / "plan.md").write_text(plan_content)
+    txn.write(impl_path / "plan.md", plan_content)
 
     # Update feature state.yml
     state_file = feature_path / "state.yml"
     if state_file.exists():
-        content = state_file.read_text()
-        # Update status and date
-        lines = content.split('\n')
-        new_lines = []
-        for line in lines:
-            if line.startswith('status:'):
-                new_lines.append('status: planning')
-            elif line.startswith('updated:'):
-                new_lines.append(f'updated: {today}')
-            else:
-                new_lines.append(line)
-        state_file.write_text('\n'.join(new_lines))
+        # Update status and date in place
+        state = statefile.load(state_file)
+        before = WorkflowState.decode(state)
+        state['status'] = 'planning'
+        state['updated'] = today
+        txn.patch(state_file, state)
+        journal.record_state(feature_name, 'feature', before, before._replace(status='planning'), txn)
+
+    txn.commit()
 
     # Output
     print(f"""✓ Implementation plan initialized: {feature_name}
@@ -123,6 +126,7 @@ Next step:
 """)
 
 
+@timing.instrument("init-impl-plan")
 def main():
     parser = argparse.ArgumentParser(description="Initialize implementation plan structure")
     parser.add_argument("feature", help="Feature name (must already exist)")
@@ -2,87 +2,43 @@
 """Initialize a new workflow item (feature, bug, etc.)."""
 
 import argparse
-import re
 import sys
 from datetime import date
 from pathlib import Path
-import io
 
 # Configure UTF-8 encoding for Windows console
 if sys.platform == "win32":
+    import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("init-workflow")
+
 try:
     from config import cfg, write_global_state
+    from model import WorkflowState
+    from transaction import Transaction
+    import journal
+    import statefile
+    import timing
 except ImportError:
-    # Fallback if config module not available
-    from datetime import date
-
-    class FallbackConfig:
-        class paths:
-            features = ".ai/features"
-            bugs = ".ai/bugs"
-            ideas = ".ai/ideas"
-        class defaults:
-            date_format = "%Y-%m-%d"
-        class WorkflowType:
-            def __init__(self):
-                self.base_path = "features"
-                self.initial_state = "clarifying"
-                self.artifacts = ["state.yml", "request.md", "context.md"]
-        def get_workflow_type(self, type_name):
-            wf = self.WorkflowType()
-            if type_name == "bug":
-                wf.base_path = "bugs"
-                wf.initial_state = "reported"
-                wf.artifacts = ["state.yml", "report.md", "context.md", "triage.md", "fix-plan.md"]
-            elif type_name == "idea":
-                wf.base_path = "ideas"
-                wf.initial_state = "exploring"
-                wf.artifacts = ["state.yml", "description.md", "context.md", "refinement/"]
-            return wf
-        def get_workflow_path(self, name, workflow_type):
-            if workflow_type == "bug":
-                base = self.paths.bugs
-            elif workflow_type == "idea":
-                base = self.paths.ideas
-            else:
-                base = self.paths.features
-            return Path(base) / name
-
-        @staticmethod
-        def write_global_state(name, workflow_type, set_method="auto"):
-            """Fallback global state writer."""
-            memory_path = Path(".ai/memory")
-            memory_path.mkdir(parents=True, exist_ok=True)
-
-            today = date.today().strftime("%Y-%m-%d")
-            state_path = memory_path / "global-state.yml"
-
-            content = f"""version: 1
-current:
-  name: {name or 'null'}
-  workflow_type: {workflow_type or 'null'}
-  set_date: {today if name else 'null'}
-  set_method: {set_method if name else 'null'}
-last_updated: {today}
-"""
-            state_path.write_text(content)
-
-    cfg = FallbackConfig()
-    write_global_state = FallbackConfig.write_global_state
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
 
 
 def to_kebab_case(name: str) -> str:
     """Convert string to kebab-case."""
+    import re
     name = re.sub(r'[^a-zA-Z0-9\s-]', '', name)
     name = re.sub(r'[\s_]+', '-', name)
     name = re.sub(r'-+', '-', name)
     return name.lower().strip('-')
 
 
-def create_report_md(path: Path, name: str, description: str, today: str):
+def create_report_md(txn, path: Path, name: str, description: str, today: str):
     """Create bug report template."""
     content = f"""# Bug Report: {name}
 
@@ -104,10 +60,10 @@ def create_report_md(path: Path, name: str, description: str, today: str):
 ## Reported
 {today}
 """
-    (path / "report.md").write_text(content)
+    txn.write(path / "report.md", content)
 
 
-def create_request_md(path: Path, name: str, description: str, today: str):
+def create_request_md(txn, path: Path, name: str, description: str, today: str):
     """Create feature request template."""
     content = f"""# Feature Request: {name}
 
@@ -117,10 +73,10 @@ def create_request_md(path: Path, name: str, description: str, today: str):
 ## Created
 {today}
 """
-    (path / "request.md").write_text(content)
+    txn.write(path / "request.md", content)
 
 
-def create_description_md(path: Path, name: str, description: str, today: str):
+def create_description_md(txn, path: Path, name: str, description: str, today: str):
     """Create idea description template."""
     content = f"""# Idea: {name}
 
@@ -130,10 +86,10 @@ def create_description_md(path: Path, name: str, description: str, today: str):
 ## Created
 {today}
 """
-    (path / "description.md").write_text(content)
+    txn.write(path / "description.md", content)
 
 
-def create_context_md(path: Path):
+def create_context_md(txn, path: Path):
     """Create context template."""
     content = """# Context
 
@@ -149,10 +105,10 @@ def create_context_md(path: Path):
 ## Notes
 <!-- Any other relevant context -->
 """
-    (path / "context.md").write_text(content)
+    txn.write(path / "context.md", content)
 
 
-def create_triage_md(path: Path, name: str):
+def create_triage_md(txn, path: Path, name: str):
     """Create bug triage template."""
     content = f"""# Triage: {name}
 
@@ -174,10 +130,10 @@ def create_triage_md(path: Path, name: str):
 ## Triaged
 <!-- Date will be added during triage -->
 """
-    (path / "triage.md").write_text(content)
+    txn.write(path / "triage.md", content)
 
 
-def create_fix_plan_md(path: Path, name: str):
+def create_fix_plan_md(txn, path: Path, name: str):
     """Create bug fix plan template."""
     content = f"""# Fix Plan: {name}
 
@@ -194,7 +150,7 @@ def create_fix_plan_md(path: Path, name: str):
 ## Created
 <!-- Date will be added during fix planning -->
 """
-    (path / "fix-plan.md").write_text(content)
+    txn.write(path / "fix-plan.md", content)
 
 
 def create_workflow(name: str, description: str, workflow_type: str = "feature") -> None:
@@ -213,50 +169,53 @@ def create_workflow(name: str, description: str, workflow_type: str = "feature")
     # Create directories
     workflow_path.mkdir(parents=True)
 
-    # Create state.yml
-    state_content = f"""workflow_type: {workflow_type}
-name: {name}
-status: {workflow_config.initial_state}
-created: {today}
-updated: {today}
-"""
-    (workflow_path / "state.yml").write_text(state_content)
-
-    # Create artifacts based on workflow type
-    for artifact in workflow_config.artifacts:
-        if artifact.endswith('/'):
-            # Directory
-            (workflow_path / artifact.rstrip('/')).mkdir(exist_ok=True)
-        elif artifact == "report.md":
-            # Bug report
-            create_report_md(workflow_path, name, description, today)
-        elif artifact == "request.md":
-            # Feature request
-            create_request_md(workflow_path, name, description, today)
-        elif artifact == "description.md":
-            # Idea description
-            create_description_md(workflow_path, name, description, today)
-        elif artifact == "context.md":
-            # Context template
-            create_context_md(workflow_path)
-        elif artifact == "triage.md":
-            # Bug triage template
-            create_triage_md(workflow_path, name)
-        elif artifact == "fix-plan.md":
-            # Bug fix plan template
-            create_fix_plan_md(workflow_path, name)
+    # state.yml, the artifacts and global-state.yml land in one transaction
+    global_state_error = None
+    with Transaction() as txn:
+        # Create state.yml
+        state = WorkflowState(workflow_type, name, workflow_config.initial_state, today, today)
+        txn.write(workflow_path / "state.yml", statefile.dumps(state.encode()))
+        journal.record("created", name, workflow_type, new=state.status, txn=txn)
+
+        # Create artifacts based on workflow type
+        for artifact in workflow_config.artifacts:
+            if artifact.endswith('/'):
+                # Directory
+                (workflow_path / artifact.rstrip('/')).mkdir(exist_ok=True)
+            elif artifact == "report.md":
+                # Bug report
+                create_report_md(txn, workflow_path, name, description, today)
+            elif artifact == "request.md":
+                # Feature request
+                create_request_md(txn, workflow_path, name, description, today)
+            elif artifact == "description.md":
+                # Idea description
+                create_description_md(txn, workflow_path, name, description, today)
+            elif artifact == "context.md":
+                # Context template
+                create_context_md(txn, workflow_path)
+            elif artifact == "triage.md":
+                # Bug triage template
+                create_triage_md(txn, workflow_path, name)
+            elif artifact == "fix-plan.md":
+                # Bug fix plan template
+                create_fix_plan_md(txn, workflow_path, name)
+
+        # Auto-update global state
+        try:
+            write_global_state(name, workflow_type, set_method="auto", txn=txn)
+        except Exception as e:
+            global_state_error = e
 
     # Print confirmation
     print(f"✓ {workflow_type.capitalize()} initialized: {name}")
     print(f"\nCreated: {workflow_path}/")
     print(f"Status: {workflow_config.initial_state}")
 
-    # Auto-update global state
-    try:
-        write_global_state(name, workflow_type, set_method="auto")
+    if global_state_error is None:
         print(f"\n✓ Set as current {workflow_type}")
-    except Exception as e:
-        print(f"\n⚠ Warning: Could not update global state: {e}", file=sys.stderr)
+    else:
+        print(f"\n⚠ Warning: Could not update global state: {global_state_error}", file=sys.stderr)
 
     # Next steps based on type
     if workflow_type == "bug":
@@ -273,6 +232,7 @@ updated: {today}
         print(f"  2. /clarify {name} — start requirements clarification")
 
 
+@timing.instrument("init-workflow")
 def main():
     parser = argparse.ArgumentParser(description="Initialize a new workflow item")
     parser.add_argument("name", help="Item name (will be converted to kebab-case)")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Event Journal
+Append-only record of workflow state transitions in .ai/memory/events.jsonl,
+one compact JSON object per line, oldest first:
+
+  {"ts": "2026-03-01T10:15:02", "workflow": "my-feature", "type": "feature",
+   "event": "phase", "old": "in-progress", "new": "completed", "phase": 2,
+   "actor": "update-plan-state"}
+
+Events:
+  created       a workflow was created (new: its initial status)
+  status        state.yml status changed
+  plan_status   plan-state.yml status changed (old is null for a new plan)
+  phase         a phase's status changed (phase: its 1-based number)
+  context       the current context changed (workflow/type: the new one,
+                old/new: the workflow names)
+
+The actor is $AI_WORKFLOW_ACTOR when set (agents and editors can name
+themselves), otherwise the command that made the change.
+
+Records staged in a transaction.Transaction are appended once its files are
+in place, all records of a commit in a single write. When events.jsonl grows
+past SEGMENT_MAX_BYTES it is moved to a numbered segment
+(events.000001.jsonl, ...) and a new file is started; segments are never
+changed afterwards, so consumers can tail the live file and replay the
+segments incrementally. Appends and rotation hold an exclusive lock on
+events.lock (flock; msvcrt on Windows), so concurrent writers rotate once
+and never append to a file being moved aside.
+
+Usage:
+  python journal.py list                              # Every event, oldest first (JSON output)
+  python journal.py list --workflow my-feature --last 20
+  python journal.py segments                          # Journal files, oldest first
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import timing
+from transaction import FileLock
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("events")
+
+JOURNAL_FILENAME = "events.jsonl"
+LOCK_FILENAME = "events.lock"
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+ACTOR_ENV = "AI_WORKFLOW_ACTOR"
+
+# Records waiting for their transaction to commit (staged from any thread)
+_batches = weakref.WeakKeyDictionary()  # Transaction -> [record]
+_batches_lock = threading.Lock()
+
+
+def get_journal_path() -> Path:
+    """Path of the live journal file (in the memory folder)."""
+    from config import get_config
+    return get_config().get_memory_path() / JOURNAL_FILENAME
+
+
+def _segment_number(path: Path) -> int:
+    """Number of a rotated segment (events.000001.jsonl), 0 for other files."""
+    parts = path.name.split(".")
+    return int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else 0
+
+
+def segments(journal_path: Path = None) -> list:
+    """Rotated segments in order, then the live file (existing files only)."""
+    journal_path = journal_path or get_journal_path()
+    stem = journal_path.name[:-len(".jsonl")]
+    rotated = sorted(
+        (path for path in journal_path.parent.glob(f"{stem}.*.jsonl") if _segment_number(path)),
+        key=_segment_number
+    )
+    if journal_path.exists():
+        rotated.append(journal_path)
+    return rotated
+
+
+def _rotate(journal_path: Path) -> None:
+    """
+    Move the live file to the next segment (called with the lock held). The
+    file is linked, then unlinked, so a rotation that races an unlocked
+    writer fails on the link instead of overwriting a segment.
+    """
+    numbers = [_segment_number(path) for path in segments(journal_path)]
+    segment = journal_path.with_name(
+        f"{journal_path.name[:-len('.jsonl')]}.{max(numbers, default=0) + 1:06d}.jsonl"
+    )
+    try:
+        os.link(journal_path, segment)
+    except FileExistsError:
+        return  # Another process rotated first
+    os.unlink(journal_path)
+
+
+def append(records: list, journal_path: Path = None) -> None:
+    """Append records with one O_APPEND write, rotating the file when large (best effort)."""
+    if not records:
+        return
+    journal_path = journal_path or get_journal_path()
+    data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode("utf-8")
+    try:
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(journal_path.with_name(LOCK_FILENAME)):
+            # Opened under the lock, so the size check sees any rotation
+            # another writer just made
+            fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size > SEGMENT_MAX_BYTES:
+                    try:
+                        _rotate(journal_path)
+                    except OSError:
+                        pass  # No hard links here: keep appending to the live file
+                    else:
+                        os.close(fd)
+                        fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+    except OSError as e:
+        print(f"⚠ Warning: Could not append to {journal_path}: {e}", file=sys.stderr)
+
+
+def _actor() -> str:
+    actor = os.environ.get(ACTOR_ENV)
+    if actor:
+        return actor
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+
+def record(event: str, workflow, workflow_type, old=None, new=None, phase: int = None,
+           txn=None) -> None:
+    """
+    Journal one transition. With a transaction the record is appended after
+    the transaction commits (and dropped if it rolls back); otherwise now.
+    """
+    entry = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "workflow": workflow,
+        "type": workflow_type,
+        "event": event,
+        "old": old,
+        "new": new,
+    }
+    if phase is not None:
+        entry["phase"] = phase
+    entry["actor"] = _actor()
+
+    if txn is None:
+        append([entry])
+        return
+    with _batches_lock:
+        batch = _batches.get(txn)
+        if batch is None:
+            batch = _batches[txn] = []
+            txn.after_commit(lambda: append(_pop_batch(txn)), lambda: _pop_batch(txn))
+        batch.append(entry)
+
+
+def _pop_batch(txn) -> list:
+    with _batches_lock:
+        return _batches.pop(txn, [])
+
+
+def record_state(workflow: str, workflow_type: str, before, after, txn=None) -> None:
+    """Journal the status change between two model.WorkflowState records."""
+    if before.status != after.status:
+        record("status", workflow, workflow_type, before.status, after.status, txn=txn)
+
+
+def record_plan(workflow: str, workflow_type: str, before, after, txn=None) -> None:
+    """Journal the plan status and phase changes between two model.PlanState records (before may be None)."""
+    old_status = before.status if before is not None else None
+    if after.status != old_status:
+        record("plan_status", workflow, workflow_type, old_status, after.status, txn=txn)
+    old_phases = before.phases if before is not None else ()
+    for number, phase in enumerate(after.phases, 1):
+        old = old_phases[number - 1].status if number <= len(old_phases) else None
+        if phase.status != old:
+            record("phase", workflow, workflow_type, old, phase.status, phase=number, txn=txn)
+
+
+def iter_events(journal_path: Path = None):
+    """Every journal record, oldest first (unparseable lines are skipped)."""
+    for path in segments(journal_path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Torn or foreign line
+        except FileNotFoundError:
+            continue  # Rotated while listing
+
+
+@timing.instrument("events")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Read the workflow event journal",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List journal events, oldest first")
+    list_parser.add_argument("--workflow", help="Only events of this workflow")
+    list_parser.add_argument("--type", help="Only events of this workflow type")
+    list_parser.add_argument("--event", action="append", help="Only these events (repeatable)")
+    list_parser.add_argument("--last", type=int, help="Only the last N matching events")
+
+    subparsers.add_parser("segments", help="List the journal files, oldest first")
+
+    args = parser.parse_args()
+
+    if args.action == "segments":
+        files = segments()
+        result = {
+            "status": "success",
+            "journal": str(get_journal_path()),
+            "segments": [{"path": str(path), "bytes": path.stat().st_size} for path in files]
+        }
+    else:
+        if args.last is not None and args.last < 0:
+            parser.error("--last must be non-negative")
+        events = [
+            event for event in iter_events()
+            if (args.workflow is None or event.get("workflow") == args.workflow)
+            and (args.type is None or event.get("type") == args.type)
+            and (not args.event or event.get("event") in args.event)
+        ]
+        if args.last is not None:
+            events = events[len(events) - args.last:] if args.last else []
+        result = {"status": "success", "count": len(events), "events": events}
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Typed records for workflow state files.
+
+state.yml and plan-state.yml are decoded into small immutable records
+(named tuples: no per-instance dict) instead of being passed around as raw
+dicts. Defaults for missing fields live here, once:
+
+  - WorkflowState.status    Status.UNKNOWN
+  - PlanState.status        Status.PENDING
+  - PlanState.current_phase 0
+
+Statuses are Status members (a str enum, so they compare equal to and
+serialize as plain strings); values not in the enum are interned, so many
+records share one string per distinct status. Keys a record doesn't model
+are kept in `extra`. Decoded records remember which keys the file had, in
+file order (`layout`, shared between records with the same keys), and
+encode() writes those keys in that order, plus modelled keys that were
+absent but now differ from their default. So a decoded record encodes back
+to the dict it came from. Records built in code (layout None) encode every
+modelled key, then the extra ones.
+
+Records are changed with _replace(), e.g.
+  state._replace(status=Status.COMPLETED, updated=today).encode()
+"""
+
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import statefile
+
+
+class Status(str, Enum):
+    """Statuses used by the workflow types, plans and phases."""
+    # Plans and phases
+    PENDING = "pending"
+    IN_PROGRESS = "in-progress"
+    COMPLETED = "completed"
+    # Features
+    CLARIFYING = "clarifying"
+    CLARIFIED = "clarified"
+    PRD_DRAFT = "prd-draft"
+    PRD_APPROVED = "prd-approved"
+    PLANNING = "planning"
+    IN_REVIEW = "in-review"
+    # Bugs
+    REPORTED = "reported"
+    TRIAGED = "triaged"
+    FIXING = "fixing"
+    RESOLVED = "resolved"
+    CLOSED = "closed"
+    # Ideas
+    EXPLORING = "exploring"
+    REFINED = "refined"
+    SHELVED = "shelved"
+    CONVERTED = "converted"
+    # Missing from state.yml
+    UNKNOWN = "unknown"
+
+    # Format as the plain value (f-strings, str(), the index)
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+_STATUSES = {member.value: member for member in Status}
+
+# Modelled keys, in the order encode() writes them
+_PHASE_KEYS = ("name", "status", "started", "completed")
+_PLAN_KEYS = ("status", "current_phase", "created", "updated", "phases")
+_STATE_KEYS = ("workflow_type", "name", "status", "created", "updated")
+
+
+def status(value, default: Optional[Status] = None):
+    """
+    Normalize a status value read from a state file: known values become
+    Status members, other strings are interned, other scalars (YAML ints)
+    become strings. None gives `default`.
+    """
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        value = str(value)
+    return _STATUSES.get(value) or sys.intern(value)
+
+
+_layouts = {}  # One shared tuple per distinct key layout
+
+
+def _extra(data: dict, known: tuple) -> tuple:
+    """(key, value) pairs of the keys a record doesn't model, in file order."""
+    return tuple((sys.intern(key) if isinstance(key, str) else key, value)
+                 for key, value in data.items() if key not in known)
+
+
+def _layout(data: dict) -> tuple:
+    """The keys of a decoded mapping, in file order."""
+    layout = tuple(sys.intern(key) if isinstance(key, str) else key for key in data)
+    return _layouts.setdefault(layout, layout)
+
+
+def _encode(record, known: tuple, **values) -> dict:
+    def value(key):
+        value = values[key] if key in values else getattr(record, key)
+        # Plain str for the YAML backends
+        return value.value if isinstance(value, Status) else value
+
+    data = {}
+    if record.layout is None:
+        for key in known:
+            data[key] = value(key)
+    else:
+        extra = dict(record.extra)
+        for key in record.layout:
+            if key in known:
+                data[key] = value(key)
+            elif key in extra:
+                data[key] = extra[key]
+        defaults = type(record)._field_defaults
+        for key in known:
+            if key not in data and getattr(record, key) != defaults.get(key):
+                data[key] = value(key)
+    for key, extra_value in record.extra:
+        data.setdefault(key, extra_value)
+    return data
+
+
+class Phase(NamedTuple):
+    """One entry of plan-state.yml's phases list."""
+    name: Optional[str] = None
+    status: Optional[str] = Status.PENDING
+    started: Optional[str] = None
+    completed: Optional[str] = None
+    extra: tuple = ()
+    layout: Optional[tuple] = None
+
+    @classmethod
+    def decode(cls, data) -> "Phase":
+        if not isinstance(data, dict):
+            return cls(layout=())
+        return cls(
+            data.get("name"),
+            status(data.get("status"), Status.PENDING),
+            data.get("started"),
+            data.get("completed"),
+            _extra(data, _PHASE_KEYS),
+            _layout(data),
+        )
+
+    def encode(self) -> dict:
+        return _encode(self, _PHASE_KEYS)
+
+
+class PlanState(NamedTuple):
+    """Contents of plan-state.yml."""
+    status: Optional[str] = Status.PENDING
+    current_phase: Optional[int] = 0
+    created: Optional[str] = None
+    updated: Optional[str] = None
+    phases: tuple = ()
+    extra: tuple = ()
+    layout: Optional[tuple] = None
+
+    @classmethod
+    def decode(cls, data: dict) -> "PlanState":
+        phases = data.get("phases")
+        return cls(
+            status(data.get("status"), Status.PENDING),
+            data.get("current_phase", 0),
+            data.get("created"),
+            data.get("updated"),
+            tuple(Phase.decode(phase) for phase in phases) if isinstance(phases, list) else (),
+            _extra(data, _PLAN_KEYS),
+            _layout(data),
+        )
+
+    def encode(self) -> dict:
+        return _encode(self, _PLAN_KEYS, phases=[phase.encode() for phase in self.phases])
+
+
+class WorkflowState(NamedTuple):
+    """Contents of a workflow's state.yml."""
+    workflow_type: Optional[str] = None
+    name: Optional[str] = None
+    status: Optional[str] = Status.UNKNOWN
+    created: Optional[str] = None
+    updated: Optional[str] = None
+    extra: tuple = ()
+    layout: Optional[tuple] = None
+
+    @classmethod
+    def decode(cls, data: dict) -> "WorkflowState":
+        workflow_type = data.get("workflow_type")
+        return cls(
+            sys.intern(workflow_type) if isinstance(workflow_type, str) else workflow_type,
+            data.get("name"),
+            status(data.get("status"), Status.UNKNOWN),
+            data.get("created"),
+            data.get("updated"),
+            _extra(data, _STATE_KEYS),
+            _layout(data),
+        )
+
+    def encode(self) -> dict:
+        return _encode(self, _STATE_KEYS)
+
+
+class Workflow(NamedTuple):
+    """A workflow folder with its decoded state and plan (None when missing)."""
+    workflow_type: str
+    name: str
+    path: Path
+    state: Optional[WorkflowState] = None
+    plan: Optional[PlanState] = None
+
+    @classmethod
+    def load(cls, workflow_type: str, name: str, path: Path) -> "Workflow":
+        """Read a workflow's state files (unreadable files count as missing)."""
+        path = Path(path)
+        return cls(workflow_type, name, path,
+                   read_state(path / "state.yml"), read_plan(plan_state_path(path)))
+
+
+def plan_state_path(workflow_path: Path) -> Path:
+    """plan-state.yml of a workflow (implementation-plan, or fix-plan for bugs)."""
+    workflow_path = Path(workflow_path)
+    for folder in ("implementation-plan", "fix-plan"):
+        path = workflow_path / folder / "plan-state.yml"
+        if path.exists():
+            return path
+    return workflow_path / "implementation-plan" / "plan-state.yml"
+
+
+def read_state(path: Path, parser=statefile.load) -> Optional[WorkflowState]:
+    """Decode a state.yml (None if missing or unreadable)."""
+    try:
+        return WorkflowState.decode(parser(path))
+    except (OSError, statefile.StateFileError):
+        return None
+
+
+def read_plan(path: Path, parser=statefile.load) -> Optional[PlanState]:
+    """Decode a plan-state.yml (None if missing or unreadable)."""
+    try:
+        return PlanState.decode(parser(path))
+    except (OSError, statefile.StateFileError):
+        return None
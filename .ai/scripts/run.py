@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Workflow Command Dispatcher
+Single entry point for every workflow command. Only the module for the
+requested subcommand is imported, so each command pays just for its own
+dependencies.
+
+Usage:
+  python run.py <command> [args...]     # Run a workflow command
+  python run.py --list                  # List available commands (JSON output)
+  python run.py --check-budget          # Cold start against budgets (bench.startup, JSON output)
+  python run.py --check-budget --runs 9 # ...with bench.startup's options
+
+Examples:
+  python run.py set-current my-feature
+  python run.py update-plan-state my-feature start-phase 2
+  python run.py cleanup --validate --dry-run
+"""
+
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand -> implementing script (each script exposes main())
+COMMANDS = {
+    "init-workflow": "init-workflow.py",
+    "init-impl-plan": "init-impl-plan.py",
+    "update-plan-state": "update-plan-state.py",
+    "get-workflow-info": "get-workflow-info.py",
+    "cleanup": "cleanup.py",
+    "set-current": "set-current.py",
+    "create-pr": "create-pr.py",
+    "index": "workflow_index.py",
+    "archive": "archive.py",
+    "snapshot": "snapshot.py",
+    "clarifications": "clarifications.py",
+    "timings": "timing.py",
+    "events": "journal.py",
+}
+
+# Cold-start budget per subcommand in milliseconds: interpreter start,
+# imports, config load (warm config cache) and the state reads (and, for
+# update-plan-state, the write) of a typical call, measured by bench.startup
+# as the median wall time of the command's probe (bench.startup.PROBES) in a
+# fresh process with the daemon disabled, in a generated 200-workflow
+# workspace. Each budget is the command's measured median (the median of
+# three `--runs 9` passes, interpreter start about 15 ms) plus 50% headroom,
+# rounded up to 10 ms. Re-measure when a command's imports change.
+COLD_START_BUDGETS_MS = {
+    "init-workflow": 140,      # Measured 90 ms
+    "init-impl-plan": 130,     # 82 ms
+    "update-plan-state": 130,  # 84 ms
+    "get-workflow-info": 130,  # 81 ms
+    "cleanup": 130,            # 81 ms
+    "set-current": 130,        # 85 ms
+    "create-pr": 130,          # 83 ms
+    "index": 130,              # 86 ms
+    "archive": 140,            # 88 ms
+    "snapshot": 110,           # 69 ms
+    "clarifications": 110,     # 69 ms
+    "timings": 60,             # 38 ms
+    "events": 110,             # 72 ms
+}
+
+
+def load_command(command: str):
+    """Import the script implementing `command` and return its module."""
+    # importlib.machinery is loaded at interpreter start; importlib.util
+    # would pull in contextlib and collections for no benefit here
+    import types
+    from importlib.machinery import SourceFileLoader
+
+    script_path = os.path.join(SCRIPTS_DIR, COMMANDS[command])
+    loader = SourceFileLoader("_ai_" + command.replace("-", "_"), script_path)
+    module = types.ModuleType(loader.name)
+    module.__file__ = script_path
+    module.__loader__ = loader
+    sys.modules[loader.name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _usage() -> str:
+    """Usage text including the available commands."""
+    return __doc__.strip() + "\n\nCommands:\n" + "\n".join(f"  {name}" for name in COMMANDS)
+
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_usage())
+        sys.exit(0 if argv else 2)
+
+    if argv[0] == "--list":
+        import json
+        print(json.dumps({"commands": sorted(COMMANDS)}, indent=2))
+        return
+
+    if argv[0] == "--check-budget":
+        from bench.startup import main as check_budget
+        check_budget(argv[1:])
+        return
+
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f"✗ Unknown command: {command}", file=sys.stderr)
+        print(f"  Available: {', '.join(COMMANDS)}", file=sys.stderr)
+        sys.exit(2)
+
+    # Present the subcommand's own argv so its argparse sees the usual layout
+    sys.argv = [os.path.join(SCRIPTS_DIR, COMMANDS[command])] + argv[1:]
+
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward(command)
+
+    load_command(command).main()
+
+
+if __name__ == "__main__":
+    main()
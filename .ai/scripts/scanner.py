@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Single-pass workspace scanner for features, bugs and ideas.
+
+Walks the workflow folders with os.scandir: directory checks use the entry
+type reported by the OS (no extra stat per entry) and each workflow folder is
+listed once, giving the set of artifacts it contains. Scripts use this
+instead of probing paths one exists() call at a time.
+"""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from timing import span
+
+WORKFLOW_TYPES = ("feature", "bug", "idea")
+
+
+@dataclass(frozen=True)
+class WorkflowEntry:
+    """A workflow folder and the names of the files/folders directly in it."""
+    name: str
+    workflow_type: str
+    path: Path
+    artifacts: frozenset = frozenset()
+
+    def has(self, artifact: str) -> bool:
+        """Check whether a file or folder exists directly in the workflow."""
+        return artifact in self.artifacts
+
+
+@dataclass
+class WorkspaceSnapshot:
+    """Every workflow found by one scan, grouped by type and sorted by name."""
+    workflows: dict = field(default_factory=dict)  # type -> [WorkflowEntry]
+    base_paths: dict = field(default_factory=dict)  # type -> Path (existing only)
+
+    def exists(self, workflow_type: str) -> bool:
+        """Check whether the base folder for a workflow type exists."""
+        return workflow_type in self.base_paths
+
+    def of_type(self, workflow_type: str) -> list:
+        """Workflows of one type, sorted by name."""
+        return self.workflows.get(workflow_type, [])
+
+    def find(self, name: str, types: tuple = WORKFLOW_TYPES) -> Optional[WorkflowEntry]:
+        """First workflow called `name`, checking types in the given order."""
+        for workflow_type in types:
+            for entry in self.of_type(workflow_type):
+                if entry.name == name:
+                    return entry
+        return None
+
+    def __iter__(self) -> Iterator[WorkflowEntry]:
+        for workflow_type in self.workflows:
+            yield from self.workflows[workflow_type]
+
+
+def _config(cfg=None):
+    """Return the given config, or the global one."""
+    if cfg is None:
+        from config import cfg
+    return cfg
+
+
+def load_entry(workflow_type: str, path: Path, artifacts: bool = True) -> Optional[WorkflowEntry]:
+    """Read one workflow folder; None if it doesn't exist or isn't a folder."""
+    if not artifacts:
+        return WorkflowEntry(path.name, workflow_type, path) if path.is_dir() else None
+
+    try:
+        with span("fs.scan"), os.scandir(path) as children:
+            names = frozenset(child.name for child in children)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return WorkflowEntry(path.name, workflow_type, path, names)
+
+
+def locate(name: str, types: tuple = WORKFLOW_TYPES, cfg=None) -> Optional[WorkflowEntry]:
+    """Find a workflow by name, checking types in order (one scandir per type tried)."""
+    cfg = _config(cfg)
+    for workflow_type in types:
+        entry = load_entry(workflow_type, cfg.get_workflow_path(name, workflow_type))
+        if entry is not None:
+            return entry
+    return None
+
+
+def iter_workflows(types: tuple = WORKFLOW_TYPES, cfg=None, artifacts: bool = True,
+                   base_paths: dict = None) -> Iterator[WorkflowEntry]:
+    """
+    Yield workflows type by type, sorted by name within each type.
+    Hidden entries (.gitkeep, .trash, ...) are skipped. With artifacts=False
+    the workflow folders themselves are not listed. Types whose base folder
+    exists are recorded in `base_paths` when a dict is passed.
+    """
+    cfg = _config(cfg)
+    for workflow_type in types:
+        base_path = cfg.get_workflow_base_path(workflow_type)
+        try:
+            with span("fs.scan"), os.scandir(base_path) as entries:
+                names = sorted(
+                    entry.name for entry in entries
+                    if not entry.name.startswith(".") and entry.is_dir()
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        if base_paths is not None:
+            base_paths[workflow_type] = base_path
+
+        for name in names:
+            path = base_path / name
+            if not artifacts:
+                yield WorkflowEntry(name, workflow_type, path)
+                continue
+            entry = load_entry(workflow_type, path)
+            if entry is not None:
+                yield entry
+
+
+def scan(types: tuple = WORKFLOW_TYPES, cfg=None, artifacts: bool = True) -> WorkspaceSnapshot:
+    """Scan the workspace once and return a snapshot of every workflow."""
+    snapshot = WorkspaceSnapshot()
+    for entry in iter_workflows(types, cfg, artifacts, snapshot.base_paths):
+        snapshot.workflows.setdefault(entry.workflow_type, []).append(entry)
+    return snapshot
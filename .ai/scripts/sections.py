@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Markdown Section Index
+Byte ranges of markdown sections (prd.md, plan.md), so a section is read
+with one seek and a bounded read instead of splitting the whole file into
+lines.
+
+A lookup scans heading lines (lines starting with '#') through a memory map,
+jumping from heading to heading, and stops as soon as the section and its
+end are found; the rest of the file is never read. Found ranges are cached
+in .ai/.cache/section-index.json per file and lookup name, keyed by the
+file's mtime and size, so the next run (e.g. the real create-pr run after a
+--dry-run) seeks straight to the section.
+
+Usage:
+  from sections import find_section, read_lines
+
+  section = find_section(path, "summary",
+                         is_start=lambda title: title.startswith("## Overview"),
+                         is_end=lambda title: title.startswith("##"))
+  if section:
+      for line in read_lines(path, section.start, section.end):
+          ...
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterator, NamedTuple, Optional
+
+CACHE_FILENAME = "section-index.json"
+CACHE_VERSION = 1
+CACHE_MAX_FILES = 64
+
+
+class Section(NamedTuple):
+    """Byte range of a section: heading line, body start and body end."""
+    offset: int
+    start: int
+    end: int
+    title: str
+
+
+def _decode(line: bytes) -> str:
+    """A line as str, without its line ending (as read_text().split('\\n') gives)."""
+    return line.decode("utf-8").rstrip("\n").rstrip("\r")
+
+
+def read_lines(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """Lines of a file from byte `start` up to byte `end`, read one at a time."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            if end is not None and position >= end:
+                return
+            position += len(line)
+            yield _decode(line)
+
+
+def _headings(data) -> Iterator[tuple]:
+    """(offset, end, title) of each heading line, in file order."""
+    size = len(data)
+    offset = 0 if data[:1] == b"#" else data.find(b"\n#") + 1
+    if offset == 0 and data[:1] != b"#":
+        return
+    while True:
+        end = data.find(b"\n", offset) + 1 or size
+        yield offset, end, _decode(data[offset:end])
+        # Jump to the next line starting with '#'
+        offset = data.find(b"\n#", end - 1) + 1
+        if offset == 0:
+            return
+
+
+def _scan(path: Path, size: int, is_start, is_end) -> Optional[Section]:
+    """Find a section by scanning heading lines through a memory map."""
+    if size == 0:
+        return None
+
+    import mmap
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        headings = _headings(data)
+        for offset, end, title in headings:
+            if is_start(title):
+                break
+        else:
+            return None
+
+        for next_offset, _, next_title in headings:
+            if is_end(next_title):
+                return Section(offset, end, next_offset, title)
+        return Section(offset, end, size, title)
+
+
+def _cache_path() -> Path:
+    from config import get_cache_path
+    return get_cache_path(CACHE_FILENAME)
+
+
+def _read_cache() -> dict:
+    """Cached sections by file path (empty if missing or outdated)."""
+    try:
+        cache = json.loads(_cache_path().read_text())
+    except (OSError, ValueError, ImportError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def _write_cache(files: dict) -> None:
+    """Write the section cache, keeping the most recently added files (best effort)."""
+    if len(files) > CACHE_MAX_FILES:
+        files = dict(list(files.items())[-CACHE_MAX_FILES:])
+    try:
+        from transaction import atomic_write
+        atomic_write(
+            _cache_path(),
+            json.dumps({"version": CACHE_VERSION, "files": files}, separators=(",", ":")),
+            sync=False
+        )
+    except (OSError, ImportError):
+        pass
+
+
+def find_section(path: Path, name: str, is_start: Callable[[str], bool],
+                 is_end: Callable[[str], bool]) -> Optional[Section]:
+    """
+    The first section whose heading line matches `is_start`, ending before
+    the next heading line matching `is_end` (or at the end of the file).
+    `name` identifies this start/end pair in the cache: use one name per
+    distinct pair of predicates.
+    """
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    signature = [st.st_mtime_ns, st.st_size]
+
+    files = _read_cache()
+    entry = files.get(key)
+    if entry is None or entry.get("signature") != signature:
+        entry = {"signature": signature, "sections": {}}
+    elif name in entry["sections"]:
+        cached = entry["sections"][name]
+        return Section(*cached) if cached is not None else None
+
+    section = _scan(path, st.st_size, is_start, is_end)
+
+    entry["sections"][name] = list(section) if section is not None else None
+    files.pop(key, None)
+    files[key] = entry
+    _write_cache(files)
+    return section
@@ -5,8 +5,15 @@ import argparse
 import sys
 from pathlib import Path
 
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("set-current")
+
 try:
     from config import cfg, write_global_state
+    from scanner import locate
+    import timing
 except ImportError:
     print("✗ Error: Could not import config module", file=sys.stderr)
     sys.exit(1)
@@ -16,9 +23,9 @@ try:
     from init_workflow import to_kebab_case
 except ImportError:
     # Fallback implementation
-    import re
     def to_kebab_case(name: str) -> str:
         """Convert string to kebab-case."""
+        import re
         name = re.sub(r'[^a-zA-Z0-9\s-]', '', name)
         name = re.sub(r'[\s_]+', '-', name)
         name = re.sub(r'-+', '-', name)
@@ -33,33 +40,32 @@ def set_current(name: str, workflow_type: str = None) -> None:
 
     # Auto-detect workflow type if not provided
     if workflow_type is None:
-        feature_path = cfg.get_workflow_path(name, "feature")
-        bug_path = cfg.get_workflow_path(name, "bug")
+        entry = locate(name, ("feature", "bug"))
 
-        if feature_path.exists():
-            workflow_type = "feature"
-        elif bug_path.exists():
-            workflow_type = "bug"
+        if entry is not None:
+            workflow_type = entry.workflow_type
         else:
             print(f"✗ No workflow found with name '{name}'")
             print(f"\nSearched:")
-            print(f"  - {feature_path}")
-            print(f"  - {bug_path}")
+            print(f"  - {cfg.get_workflow_path(name, 'feature')}")
+            print(f"  - {cfg.get_workflow_path(name, 'bug')}")
             print(f"\nCreate one first:")
             print(f"  /add \"{name}\" — create new feature or bug")
             sys.exit(1)
     else:
         # Validate specified type exists
-        workflow_path = cfg.get_workflow_path(name, workflow_type)
-        if not workflow_path.exists():
+        entry = locate(name, (workflow_type,))
+        if entry is None:
+            workflow_path = cfg.get_workflow_path(name, workflow_type)
             print(f"✗ {workflow_type.capitalize()} '{name}' not found at {workflow_path}")
             print(f"\nCreate it first:")
             print(f"  /add \"{name}\" — create new {workflow_type}")
             sys.exit(1)
 
     # Validate state.yml exists
-    state_path = cfg.get_workflow_path(name, workflow_type) / "state.yml"
-    if not state_path.exists():
+    state_path = entry.path / "state.yml"
+    has_state = entry.has("state.yml")
+    if not has_state:
         print(f"⚠ Warning: state.yml not found in {workflow_type} '{name}'")
         print(f"  This may indicate a corrupted workflow.")
 
@@ -69,7 +75,7 @@ def set_current(name: str, workflow_type: str = None) -> None:
         print(f"✓ Current {workflow_type} set to: {name}")
 
         # Show workflow info
-        if state_path.exists():
+        if has_state:
             content = state_path.read_text()
             for line in content.split('\n'):
                 if line.startswith('status:'):
@@ -92,6 +98,7 @@ def set_current(name: str, workflow_type: str = None) -> None:
         sys.exit(1)
 
 
+@timing.instrument("set-current")
 def main():
     parser = argparse.ArgumentParser(
         description="Set current workflow context"
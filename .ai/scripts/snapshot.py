@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Workflow Snapshots
+Point-in-time copies of workflow files taken before destructive operations
+(cleanup, init-impl-plan replacing an incomplete implementation-plan).
+
+A snapshot hard-links the affected files into .ai/.snapshots/<id>, so taking
+one costs a link per file and no data is copied. This relies on every writer
+replacing files by rename (transaction.Transaction) instead of rewriting them
+in place: the snapshot keeps the old inode while the live tree moves on.
+Filesystems without hard links fall back to copying.
+
+Files that are edited in place share that edit with any snapshot linking
+them. Agents and editors edit prd.md, request.md and plan.md in place, so a
+manual `create` of a workflow that stays live is only as stable as those
+files; the automatic snapshots are taken right before the files leave the
+live tree. Restores copy files back (never link), so editing a restored
+file leaves the snapshot intact.
+
+Snapshots are pruned least-recently-used first (restoring one counts as a
+use) once there are more than DEFAULT_MAX_SNAPSHOTS of them or they hold more
+than DEFAULT_MAX_MB of files.
+
+Usage:
+  python snapshot.py list                            # List snapshots, newest first (JSON output)
+  python snapshot.py create .ai/features/my-feature  # Snapshot paths manually
+  python snapshot.py restore 20260214-101500-4242    # Put snapshotted paths back
+  python snapshot.py prune --max-count 5 --max-mb 100
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("snapshot")
+
+try:
+    from config import cfg
+    from transaction import atomic_write
+    import timing
+except ImportError:
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
+
+
+SNAPSHOT_DIRNAME = ".snapshots"
+MANIFEST_FILENAME = "snapshot.json"
+
+DEFAULT_MAX_SNAPSHOTS = 20
+DEFAULT_MAX_MB = 512
+
+
+def get_workspace_root() -> Path:
+    """The .ai folder; snapshot paths are stored relative to it."""
+    return cfg.get_features_path().parent
+
+
+def get_snapshots_path() -> Path:
+    """Get path to the .ai/.snapshots folder."""
+    return get_workspace_root() / SNAPSHOT_DIRNAME
+
+
+def _relative(path: Path) -> str:
+    """`path` relative to the workspace root (ValueError if outside it)."""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(get_workspace_root()))
+    if relative == "." or relative.startswith(".."):
+        raise ValueError(f"{path} is not inside {get_workspace_root()}")
+    return relative
+
+
+def _link(src: str, dst: str) -> None:
+    """Hard-link a file, copying it where links aren't possible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _link_tree(src: Path, dst: Path) -> tuple:
+    """Mirror a file or folder with hard links; returns (files, bytes)."""
+    if not src.is_dir():
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        _link(str(src), str(dst))
+        return 1, src.stat().st_size
+
+    files = size = 0
+    for dirpath, dirnames, filenames in os.walk(src):
+        target_dir = dst / os.path.relpath(dirpath, src)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for filename in filenames:
+            source = os.path.join(dirpath, filename)
+            _link(source, str(target_dir / filename))
+            files += 1
+            size += os.stat(source).st_size
+    return files, size
+
+
+def _new_snapshot_dir() -> Path:
+    """Create an empty, uniquely named snapshot folder."""
+    base = get_snapshots_path()
+    base.mkdir(parents=True, exist_ok=True)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    for n in range(1000):
+        path = base / (stamp if n == 0 else f"{stamp}.{n}")
+        try:
+            path.mkdir()
+            return path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Could not create a snapshot folder in {base}")
+
+
+def _write_manifest(snapshot_dir: Path, manifest: dict) -> None:
+    atomic_write(snapshot_dir / MANIFEST_FILENAME, json.dumps(manifest, indent=2) + "\n")
+
+
+def read_manifest(snapshot_dir: Path) -> dict:
+    """Read a snapshot's manifest ({} for incomplete snapshots)."""
+    try:
+        return json.loads((snapshot_dir / MANIFEST_FILENAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def create(paths: list, reason: str, prune_after: bool = True) -> dict:
+    """
+    Snapshot files and folders inside the workspace (missing paths are
+    skipped). Returns the manifest; "id" is None when nothing existed.
+    """
+    sources = [Path(path) for path in paths if os.path.lexists(path)]
+    if not sources:
+        return {"id": None, "reason": reason, "paths": [], "files": 0, "bytes": 0}
+
+    snapshot_dir = _new_snapshot_dir()
+    now = time.time()
+    manifest = {
+        "id": snapshot_dir.name,
+        "reason": reason,
+        "created": now,
+        "last_used": now,
+        "paths": [],
+        "files": 0,
+        "bytes": 0
+    }
+    try:
+        for source in sources:
+            relative = _relative(source)
+            files, size = _link_tree(source, snapshot_dir / "files" / relative)
+            manifest["paths"].append(relative.replace(os.sep, "/"))
+            manifest["files"] += files
+            manifest["bytes"] += size
+        # The manifest is written last: a snapshot without one is incomplete
+        _write_manifest(snapshot_dir, manifest)
+    except BaseException:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        raise
+
+    if prune_after:
+        prune()
+    return manifest
+
+
+def list_snapshots() -> list:
+    """Manifests of every complete snapshot, newest first."""
+    base = get_snapshots_path()
+    if not base.exists():
+        return []
+
+    snapshots = []
+    for entry in os.scandir(base):
+        if not entry.is_dir():
+            continue
+        manifest = read_manifest(Path(entry.path))
+        if manifest:
+            snapshots.append(manifest)
+    snapshots.sort(key=lambda m: m.get("created", 0), reverse=True)
+    return snapshots
+
+
+def _replace_with_copy(source: Path, target: Path) -> None:
+    """Swap `target` for a copy of `source` (no links into the snapshot)."""
+    staging = target.with_name(f".{target.name}.restore-{os.getpid()}")
+    replaced = target.with_name(f".{target.name}.replaced-{os.getpid()}")
+    if source.is_dir():
+        shutil.copytree(source, staging, copy_function=shutil.copy2)
+    else:
+        shutil.copy2(source, staging)
+
+    had_target = os.path.lexists(target)
+    if had_target:
+        os.rename(target, replaced)
+    os.rename(staging, target)
+    if had_target:
+        if replaced.is_dir():
+            shutil.rmtree(replaced, ignore_errors=True)
+        else:
+            replaced.unlink()
+
+
+def restore(snapshot_id: str) -> dict:
+    """
+    Put every path of a snapshot back in place. The current versions of
+    those paths are snapshotted first, so a restore can be undone.
+    """
+    snapshot_dir = get_snapshots_path() / snapshot_id
+    manifest = read_manifest(snapshot_dir) if snapshot_id and "/" not in snapshot_id else {}
+    if not manifest:
+        return {"status": "error", "error": f"Snapshot '{snapshot_id}' not found"}
+
+    root = get_workspace_root()
+    targets = [root / relative for relative in manifest["paths"]]
+    before = create(targets, reason=f"before restoring {snapshot_id}", prune_after=False)
+
+    for relative, target in zip(manifest["paths"], targets):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _replace_with_copy(snapshot_dir / "files" / relative, target)
+
+    manifest["last_used"] = time.time()
+    _write_manifest(snapshot_dir, manifest)
+
+    return {
+        "status": "success",
+        "restored": manifest["id"],
+        "paths": manifest["paths"],
+        "previous_state_snapshot": before["id"]
+    }
+
+
+def prune(max_count: int = DEFAULT_MAX_SNAPSHOTS, max_mb: float = DEFAULT_MAX_MB) -> list:
+    """Delete least recently used snapshots beyond the caps; returns their ids."""
+    base = get_snapshots_path()
+    snapshots = sorted(list_snapshots(), key=lambda m: m.get("last_used", 0), reverse=True)
+
+    removed = []
+    total = 0
+    for index, manifest in enumerate(snapshots):
+        total += manifest.get("bytes", 0)
+        # The most recently used snapshot is always kept, whatever its size
+        if index > 0 and (index >= max_count or total > max_mb * 1024 * 1024):
+            shutil.rmtree(base / manifest["id"], ignore_errors=True)
+            removed.append(manifest["id"])
+    return removed
+
+
+@timing.instrument("snapshot")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage workflow snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    subparsers.add_parser("list", help="List snapshots, newest first")
+
+    create_parser = subparsers.add_parser("create", help="Snapshot files or folders")
+    create_parser.add_argument("paths", nargs="+", help="Paths inside the .ai folder")
+    create_parser.add_argument("--reason", default="manual", help="Note stored with the snapshot")
+
+    restore_parser = subparsers.add_parser("restore", help="Put a snapshot's paths back in place")
+    restore_parser.add_argument("snapshot_id", help="Snapshot id (see list)")
+
+    prune_parser = subparsers.add_parser("prune", help="Delete least recently used snapshots")
+    prune_parser.add_argument("--max-count", type=int, default=DEFAULT_MAX_SNAPSHOTS,
+                              help=f"Snapshots to keep (default: {DEFAULT_MAX_SNAPSHOTS})")
+    prune_parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB,
+                              help=f"Total size to keep in MB (default: {DEFAULT_MAX_MB})")
+
+    args = parser.parse_args()
+
+    if args.action == "list":
+        snapshots = list_snapshots()
+        result = {"status": "success", "count": len(snapshots), "snapshots": snapshots}
+    elif args.action == "create":
+        try:
+            result = {"status": "success", **create(args.paths, args.reason)}
+        except ValueError as e:
+            result = {"status": "error", "error": str(e)}
+    elif args.action == "restore":
+        result = restore(args.snapshot_id)
+    else:
+        removed = prune(args.max_count, args.max_mb)
+        result = {"status": "success", "removed": removed}
+
+    print(json.dumps(result, indent=2))
+    if result["status"] == "error":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
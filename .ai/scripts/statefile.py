@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+State File Codec
+Reads and writes the workflow YAML files (state.yml, plan-state.yml,
+global-state.yml) through one pluggable backend:
+
+  auto     - builtin, handing anything outside its schema to libyaml/pyyaml
+             (default)
+  libyaml  - PyYAML's C loader/dumper (CSafeLoader/CSafeDumper)
+  pyyaml   - PyYAML's pure-Python SafeLoader/SafeDumper
+  builtin  - single-pass parser/emitter for the restricted schema these files
+             use; no dependencies
+
+Set AI_WORKFLOW_YAML_BACKEND to force a backend. Every backend keeps dates as
+plain strings (no date objects, no quoting on write), so results are
+JSON-serializable and round-trip unchanged. For the values state files hold,
+the builtin emitter writes the same text as PyYAML's dumper.
+
+Restricted schema (builtin backend): nested mappings, block lists of scalars
+or mappings, flow lists of plain scalars, and plain/quoted scalars (null,
+bool, int, float, str). Anything else (block scalars, anchors, tags,
+multi-line scalars, ...) raises StateFileError rather than being misread.
+
+Benchmark: python -m bench.yaml_backends
+"""
+
+import os
+
+from timing import span
+
+BACKEND_ENV = "AI_WORKFLOW_YAML_BACKEND"
+DEFAULT_BACKEND = "auto"
+# Full YAML backends the auto backend falls back to, fastest first
+FULL_BACKENDS = ("libyaml", "pyyaml")
+
+_TIMESTAMP_TAG = "tag:yaml.org,2002:timestamp"
+
+
+class StateFileError(ValueError):
+    """A state file could not be parsed."""
+
+
+# --- PyYAML backends -------------------------------------------------------
+
+class _PyYamlBackend:
+    """PyYAML with the timestamp resolver removed (dates stay strings)."""
+
+    name = "pyyaml"
+
+    def __init__(self, yaml, loader_base, dumper_base):
+        self._yaml = yaml
+        self.loader = self._without_timestamps(loader_base)
+        self.dumper = self._without_timestamps(dumper_base)
+
+    @staticmethod
+    def _without_timestamps(base):
+        cls = type(f"State{base.__name__}", (base,), {})
+        cls.yaml_implicit_resolvers = {
+            first: [(tag, regexp) for tag, regexp in resolvers if tag != _TIMESTAMP_TAG]
+            for first, resolvers in base.yaml_implicit_resolvers.items()
+        }
+        return cls
+
+    def loads(self, text: str) -> dict:
+        try:
+            data = self._yaml.load(text, Loader=self.loader)
+        except self._yaml.YAMLError as e:
+            raise StateFileError(str(e)) from e
+        return data if data is not None else {}
+
+    def dumps(self, data: dict) -> str:
+        return self._yaml.dump(
+            data, Dumper=self.dumper, default_flow_style=False, sort_keys=False, allow_unicode=True
+        )
+
+
+def _load_pyyaml(c_backend: bool):
+    """Build a PyYAML backend, or None if PyYAML (or libyaml) is unavailable."""
+    try:
+        import yaml
+    except ImportError:
+        return None
+
+    if c_backend:
+        if not getattr(yaml, "__with_libyaml__", False):
+            return None
+        backend = _PyYamlBackend(yaml, yaml.CSafeLoader, yaml.CSafeDumper)
+        backend.name = "libyaml"
+        return backend
+    return _PyYamlBackend(yaml, yaml.SafeLoader, yaml.SafeDumper)
+
+
+# --- Builtin backend -------------------------------------------------------
+
+_NULLS = {"", "~", "null", "Null", "NULL"}
+_BOOLS = {
+    "true": True, "True": True, "TRUE": True, "yes": True, "Yes": True, "YES": True,
+    "on": True, "On": True, "ON": True,
+    "false": False, "False": False, "FALSE": False, "no": False, "No": False, "NO": False,
+    "off": False, "Off": False, "OFF": False,
+}
+# Characters that force quoting when they start a plain scalar
+_INDICATORS = set("-?:,[]{}#&*!|>'\"%@`")
+# Leading characters of YAML features outside the restricted schema
+_UNSUPPORTED = set("|>&*!%@`")
+
+
+def _parse_scalar(text: str):
+    """Convert a scalar token to None/bool/int/float/str."""
+    if not text:
+        return None
+
+    first = text[0]
+    if first == "'":
+        end = text.rfind("'")
+        if end <= 0:
+            raise StateFileError(f"Unterminated quoted scalar: {text}")
+        return text[1:end].replace("''", "'")
+    if first == '"':
+        end = text.rfind('"')
+        if end <= 0:
+            raise StateFileError(f"Unterminated quoted scalar: {text}")
+        inner = text[1:end]
+        if "\\" in inner.replace('\\"', "").replace("\\n", "").replace("\\\\", ""):
+            raise StateFileError(f"Unsupported escape sequence: {text}")
+        return inner.replace('\\"', '"').replace("\\n", "\n").replace("\\\\", "\\")
+    if first in _UNSUPPORTED:
+        raise StateFileError(f"Unsupported YAML syntax: {text}")
+
+    # Strip inline comments from plain scalars
+    hash_at = text.find(" #")
+    if hash_at != -1:
+        text = text[:hash_at].rstrip()
+
+    if first == "[":
+        inner = text[1:-1].strip()
+        if text[-1] != "]" or any(c in inner for c in "[]{}'\"#"):
+            raise StateFileError(f"Unsupported flow sequence: {text}")
+        return [_parse_scalar(item.strip()) for item in inner.split(",")] if inner else []
+    if first == "{":
+        if text != "{}":
+            raise StateFileError(f"Unsupported flow mapping: {text}")
+        return {}
+    if ": " in text or first == ".":
+        raise StateFileError(f"Unsupported plain scalar: {text}")
+    if text in _NULLS:
+        return None
+    if text in _BOOLS:
+        return _BOOLS[text]
+
+    digits = text[1:] if first in "+-" else text
+    if digits.isdigit():
+        if len(digits) > 1 and digits[0] == "0":
+            raise StateFileError(f"Unsupported octal integer: {text}")
+        return int(text)
+    if digits.replace(".", "", 1).isdigit() and "." in digits:
+        return float(text)
+    if digits[:1].isdigit() and (":" in digits or "_" in digits or digits[:2] in ("0x", "0o", "0b")
+                                  or "e" in digits.lower()):
+        raise StateFileError(f"Unsupported number format: {text}")
+    return text
+
+
+def _is_plain_key(key: str) -> bool:
+    """Check that a key reads back as the same string without quoting."""
+    if key.isidentifier():
+        return key not in _BOOLS and key not in _NULLS
+    try:
+        return bool(key) and key[0] not in _INDICATORS and _parse_scalar(key) == key
+    except StateFileError:
+        return False
+
+
+def _split_key(content: str):
+    """
+    Split 'key: value' / 'key:' into (key, value text, value column within
+    content); None if not a key. For a bare key the column is just past the
+    colon, where a value would be inserted.
+    """
+    if content.endswith(":"):
+        key, value, value_at = content[:-1].strip(), "", len(content)
+    else:
+        sep = content.find(": ")
+        if sep <= 0:
+            return None
+        key, rest = content[:sep].strip(), content[sep + 2:]
+        value = rest.strip()
+        value_at = sep + 2 + len(rest) - len(rest.lstrip())
+        if value.startswith("#"):
+            value, value_at = "", sep + 1
+    # Only plain string keys are in the schema ("on", "1", quoted keys are not)
+    if not _is_plain_key(key):
+        raise StateFileError(f"Unsupported mapping key: {key}")
+    return key, value, value_at
+
+
+def _value_length(value: str) -> int:
+    """Length of a scalar token, excluding any trailing comment."""
+    if value[0] in "'\"":
+        return value.rfind(value[0]) + 1
+    hash_at = value.find(" #")
+    return len((value[:hash_at] if hash_at != -1 else value).rstrip())
+
+
+def _builtin_loads(text: str, spans: dict = None) -> dict:
+    """
+    Single-pass parser for the restricted state-file schema. When `spans` is
+    given it is filled with path -> (line index, start, end) for every scalar
+    value, path being the tuple of keys and list indexes leading to it.
+    """
+    root = {}
+    # Open containers as (indent, container, path); for lists the indent is
+    # the dash column, for mappings the key column
+    stack = [(0, root, ())]
+    pending = None  # (indent, mapping, key, path) awaiting a nested block
+
+    for lineno, raw in enumerate(text.split("\n")):
+        content = raw.strip()
+        if not content or content[0] == "#" or content == "---":
+            continue
+        indent = len(raw) - len(raw.lstrip(" "))
+        if raw[indent] == "\t":
+            raise StateFileError(f"Line {lineno + 1}: tab indentation")
+        is_item = content == "-" or content.startswith("- ")
+
+        # Open the nested block a bare "key:" announced
+        if pending is not None:
+            p_indent, p_mapping, p_key, p_path = pending
+            pending = None
+            if is_item and indent >= p_indent:
+                p_mapping[p_key] = []
+                stack.append((indent, p_mapping[p_key], p_path))
+            elif not is_item and indent > p_indent:
+                p_mapping[p_key] = {}
+                stack.append((indent, p_mapping[p_key], p_path))
+
+        while stack[-1][0] > indent or (
+            stack[-1][0] == indent and isinstance(stack[-1][1], list) and not is_item
+        ):
+            stack.pop()
+
+        top_indent, container, path = stack[-1]
+
+        if is_item:
+            if not isinstance(container, list) or top_indent != indent:
+                raise StateFileError(f"Line {lineno + 1}: unexpected list item")
+            rest = content[1:]
+            content = rest.lstrip(" ")
+            if not content:
+                raise StateFileError(f"Line {lineno + 1}: empty list item")
+            # Column of the item's content, after the dash
+            indent += 1 + len(rest) - len(content)
+            path += (len(container),)
+            split = _split_key(content)
+            if split is None:
+                if spans is not None:
+                    spans[path] = (lineno, indent, indent + _value_length(content))
+                container.append(_parse_scalar(content))
+                continue
+            # "- key: value" opens a mapping whose keys align after the dash
+            item = {}
+            container.append(item)
+            stack.append((indent, item, path))
+            container = item
+        else:
+            split = _split_key(content)
+            if split is None or not isinstance(container, dict):
+                raise StateFileError(f"Line {lineno + 1}: expected 'key: value'")
+            if top_indent != indent:
+                raise StateFileError(f"Line {lineno + 1}: bad indentation")
+
+        key, value, value_at = split
+        path += (key,)
+        start = indent + value_at
+        if value:
+            container[key] = _parse_scalar(value)
+            if spans is not None:
+                spans[path] = (lineno, start, start + _value_length(value))
+        else:
+            container[key] = None
+            if spans is not None:
+                spans[path] = (lineno, start, start)
+            pending = (indent, container, key, path)
+
+    return root
+
+
+def _format_scalar(value) -> str:
+    """Render a scalar so the builtin parser (and YAML) reads it back unchanged."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return repr(value)
+    if isinstance(value, float):
+        text = repr(value)
+        if not text.lstrip("-").replace(".", "", 1).isdigit():
+            raise StateFileError(f"Unsupported float for the builtin backend: {text}")
+        return text
+
+    text = str(value)
+    if not text.isprintable():
+        raise StateFileError(f"Unsupported string for the builtin backend: {text!r}")
+    needs_quotes = (
+        not text
+        or text[0] in _INDICATORS
+        or text != text.strip()
+        or ": " in text
+        or " #" in text
+        or text.endswith(":")
+    )
+    if not needs_quotes:
+        try:
+            needs_quotes = not isinstance(_parse_scalar(text), str)
+        except StateFileError:
+            needs_quotes = True
+    if needs_quotes:
+        return "'" + text.replace("'", "''") + "'"
+    return text
+
+
+def _format_key(key) -> str:
+    """Render a mapping key; only keys that need no quoting are supported."""
+    if not isinstance(key, str) or not _is_plain_key(key) or (
+            not key.isidentifier() and _format_scalar(key) != key):
+        raise StateFileError(f"Unsupported mapping key for the builtin backend: {key!r}")
+    return key
+
+
+def _emit_mapping(data: dict, indent: int, lines: list, first_prefix: str = None) -> None:
+    """Emit a block mapping; the first key may carry a list dash prefix."""
+    pad = " " * indent
+    for i, (key, value) in enumerate(data.items()):
+        key = _format_key(key)
+        prefix = first_prefix if (i == 0 and first_prefix is not None) else pad
+        if isinstance(value, dict) and value:
+            lines.append(f"{prefix}{key}:")
+            _emit_mapping(value, indent + 2, lines)
+        elif isinstance(value, list) and value:
+            lines.append(f"{prefix}{key}:")
+            _emit_sequence(value, indent, lines)
+        elif isinstance(value, dict):
+            lines.append(f"{prefix}{key}: {{}}")
+        elif isinstance(value, list):
+            lines.append(f"{prefix}{key}: []")
+        else:
+            lines.append(f"{prefix}{key}: {_format_scalar(value)}")
+
+
+def _emit_sequence(items: list, indent: int, lines: list) -> None:
+    """Emit a block list with dashes at `indent` (PyYAML's default layout)."""
+    pad = " " * indent
+    for item in items:
+        if isinstance(item, dict) and item:
+            _emit_mapping(item, indent + 2, lines, first_prefix=f"{pad}- ")
+        elif isinstance(item, list) and item:
+            raise StateFileError("Nested lists are not supported by the builtin backend")
+        elif isinstance(item, dict):
+            lines.append(f"{pad}- {{}}")
+        elif isinstance(item, list):
+            lines.append(f"{pad}- []")
+        else:
+            lines.append(f"{pad}- {_format_scalar(item)}")
+
+
+class _BuiltinBackend:
+    """Dependency-free codec for the restricted schema."""
+
+    name = "builtin"
+
+    def loads(self, text: str) -> dict:
+        return _builtin_loads(text)
+
+    def dumps(self, data: dict) -> str:
+        lines = []
+        _emit_mapping(data, 0, lines)
+        return "\n".join(lines) + "\n" if lines else "{}\n"
+
+
+class _AutoBackend:
+    """Builtin codec, falling back to full YAML for text outside its schema."""
+
+    name = "auto"
+
+    def __init__(self):
+        self._builtin = _BuiltinBackend()
+        self._full = None
+
+    def _full_backend(self):
+        if self._full is None:
+            self._full = next(
+                (backend for backend in (BACKENDS[name]() for name in FULL_BACKENDS) if backend),
+                False,
+            )
+        return self._full or None
+
+    def loads(self, text: str) -> dict:
+        try:
+            return self._builtin.loads(text)
+        except StateFileError:
+            full = self._full_backend()
+            if full is None:
+                raise
+            return full.loads(text)
+
+    def dumps(self, data: dict) -> str:
+        try:
+            return self._builtin.dumps(data)
+        except StateFileError:
+            full = self._full_backend()
+            if full is None:
+                raise
+            return full.dumps(data)
+
+
+# --- Backend selection -----------------------------------------------------
+
+BACKENDS = {
+    "auto": _AutoBackend,
+    "libyaml": lambda: _load_pyyaml(c_backend=True),
+    "pyyaml": lambda: _load_pyyaml(c_backend=False),
+    "builtin": _BuiltinBackend,
+}
+
+_backends = {}
+
+
+def get_backend(name: str = None):
+    """
+    Return a codec backend: the named one, the one set in
+    AI_WORKFLOW_YAML_BACKEND, or the auto backend.
+    """
+    name = name or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown YAML backend: {name} (choose from {', '.join(BACKENDS)})")
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    if _backends[name] is None:
+        raise ValueError(f"YAML backend not available: {name}")
+    return _backends[name]
+
+
+def available_backends() -> list:
+    """Names of the backends usable in this environment."""
+    result = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ValueError:
+            continue
+        result.append(name)
+    return result
+
+
+def loads(text: str) -> dict:
+    """Parse state-file text into a dict ({} for an empty document)."""
+    with span("yaml.parse"):
+        data = get_backend().loads(text)
+    if not isinstance(data, dict):
+        raise StateFileError("State file must contain a mapping")
+    return data
+
+
+def dumps(data: dict) -> str:
+    """Serialize a dict in the state-file layout."""
+    return get_backend().dumps(data)
+
+
+def load(path) -> dict:
+    """Read and parse a state file."""
+    with open(path, encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def dump(path, data: dict) -> None:
+    """Serialize a dict and atomically replace a state file with it."""
+    from transaction import atomic_write
+
+    atomic_write(path, dumps(data))
+
+
+# --- Round-trip patching ---------------------------------------------------
+
+class _StructureChanged(Exception):
+    """Keys or list items were added, removed or reordered."""
+
+
+def _diff(old, new, path: tuple, changes: list) -> None:
+    """Collect (path, value) for every scalar that differs between two trees."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        if list(old) != list(new):
+            raise _StructureChanged(path)
+        for key, value in old.items():
+            _diff(value, new[key], path + (key,), changes)
+    elif isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            raise _StructureChanged(path)
+        for index, value in enumerate(old):
+            _diff(value, new[index], path + (index,), changes)
+    elif isinstance(old, (dict, list)) or isinstance(new, (dict, list)):
+        raise _StructureChanged(path)
+    elif type(old) is not type(new) or old != new:
+        changes.append((path, new))
+
+
+def _flow_changes(changes: list, spans: dict, data: dict) -> list:
+    """Map changes inside flow lists ([a, b]) onto the whole list value."""
+    result = {}
+    for path, value in changes:
+        if path not in spans:
+            # Items of a flow list have no span of their own
+            path = path[:-1]
+            if path not in spans:
+                raise StateFileError(f"No span for {path}")
+            value = data
+            for part in path:
+                value = value[part]
+        result[path] = value
+    return list(result.items())
+
+
+def _format_flow(items: list) -> str:
+    """Render a flow list of plain scalars."""
+    formatted = [_format_scalar(item) for item in items]
+    if any(item[:1] in ("'", '"') or "," in item for item in formatted):
+        raise StateFileError("Flow list items need quoting")
+    return "[" + ", ".join(formatted) + "]"
+
+
+def patch_text(text: str, data: dict):
+    """
+    Return `text` with the scalar values that differ from `data` rewritten in
+    place; every other byte (key order, comments, quoting) is kept. Returns
+    None when the structure changed or the text is outside the builtin schema.
+    """
+    spans = {}
+    try:
+        old = _builtin_loads(text, spans)
+        changes = []
+        _diff(old, data, (), changes)
+        if not changes:
+            return text
+
+        lines = text.split("\n")
+        for path, value in _flow_changes(changes, spans, data):
+            lineno, start, end = spans[path]
+            formatted = _format_flow(value) if isinstance(value, list) else _format_scalar(value)
+            if start == end:
+                formatted = " " + formatted  # value for a bare "key:"
+            raw = lines[lineno]
+            lines[lineno] = raw[:start] + formatted + raw[end:]
+    except (StateFileError, _StructureChanged):
+        return None
+    return "\n".join(lines)
+
+
+def patch(path, data: dict) -> bool:
+    """
+    Write `data` to a state file, changing only the values that differ.
+    Key order, comments and untouched lines are preserved; a structural
+    change (keys or list items added/removed) re-serializes the file. The
+    file is replaced atomically (transaction.atomic_write semantics).
+    Returns False without touching the file when nothing changed.
+    """
+    from transaction import Transaction
+
+    with Transaction() as txn:
+        return txn.patch(path, data)
@@ -0,0 +1,45 @@
+"""Shared fixtures for the workflow script tests."""
+
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+os.environ.setdefault("AI_WORKFLOW_NO_DAEMON", "1")
+os.environ.setdefault("AI_WORKFLOW_NO_TRACE", "1")
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    An empty project with no config.yml, used as the working directory and
+    as the global config (Config() defaults, paths relative to tmp_path).
+    """
+    import config
+
+    monkeypatch.chdir(tmp_path)
+    cfg = config.Config()
+    monkeypatch.setattr(config, "cfg", cfg, raising=False)
+    # Scripts bind `cfg` at import time; paths are relative to the cwd, so
+    # cached parses from another test's workspace must not be reused
+    for module in list(sys.modules.values()):
+        if module is not config and isinstance(vars(module).get("cfg"), config.Config):
+            monkeypatch.setattr(module, "cfg", cfg)
+    monkeypatch.setattr(config, "_parse_cache", {})
+    return tmp_path
+
+
+def make_workflow(root, workflow_type: str, name: str, status: str = None):
+    """Create a workflow folder (with a state.yml when status is given)."""
+    folder = {"feature": "features", "bug": "bugs", "idea": "ideas"}[workflow_type]
+    path = root / ".ai" / folder / name
+    path.mkdir(parents=True)
+    if status is not None:
+        (path / "state.yml").write_text(
+            f"workflow_type: {workflow_type}\nname: {name}\nstatus: {status}\n", encoding="utf-8"
+        )
+    return path
@@ -0,0 +1,61 @@
+"""Archive: pack finished workflows, look them up and restore them."""
+
+import pytest
+
+import archive
+import cleanup
+from conftest import make_workflow
+
+
+@pytest.fixture
+def workflows(workspace, monkeypatch):
+    monkeypatch.setattr(cleanup, "start_reaper", lambda jobs=None: False)
+    done = make_workflow(workspace, "feature", "done", "completed")
+    (done / "prd.md").write_text("# PRD\n", encoding="utf-8")
+    (done / "updates").mkdir()
+    (done / "updates" / "01.md").write_text("Shipped\n", encoding="utf-8")
+    make_workflow(workspace, "feature", "wip", "in-progress")
+    make_workflow(workspace, "bug", "crash", "closed")
+    return workspace
+
+
+def test_pack_archives_finished_workflows(workflows):
+    result = archive.pack()
+
+    assert sorted((w["type"], w["name"]) for w in result["selected"]) == [("bug", "crash"), ("feature", "done")]
+    assert len(result["packs"]) == 1
+    assert not (workflows / ".ai" / "features" / "done").exists()
+    assert (workflows / ".ai" / "features" / "wip").exists()
+    assert [(w.workflow_type, w.name) for w in archive.list_archived()] == [("bug", "crash"), ("feature", "done")]
+
+
+def test_lookup_finds_packed_workflow(workflows):
+    archive.pack()
+
+    archived = archive.lookup("done")
+    assert archived.workflow_type == "feature" and archived.status == "completed"
+    assert sorted(archived.members()) == ["prd.md", "state.yml", "updates/", "updates/01.md"]
+    assert archive.lookup("wip") is None
+    assert archive.lookup("crash", types=("feature",)) is None
+
+
+def test_restore_puts_workflow_back(workflows):
+    state = (workflows / ".ai" / "features" / "done" / "state.yml").read_text()
+    archive.pack()
+
+    result = archive.restore("done")
+
+    restored = workflows / ".ai" / "features" / "done"
+    assert result["status"] == "success"
+    assert (restored / "state.yml").read_text() == state
+    assert (restored / "updates" / "01.md").read_text() == "Shipped\n"
+    assert archive.lookup("done") is None
+    assert archive.restore("done")["status"] == "error"
+
+
+def test_dry_run_changes_nothing(workflows):
+    result = archive.pack(dry_run=True)
+
+    assert result["status"] == "dry_run" and result["packs"] == []
+    assert (workflows / ".ai" / "features" / "done").exists()
+    assert archive.lookup("done") is None
@@ -0,0 +1,38 @@
+"""Full and selective cleanup of the workflow folders."""
+
+import cleanup
+import statefile
+from conftest import make_workflow
+
+
+def test_full_cleanup_recreates_only_existing_folders(workspace):
+    make_workflow(workspace, "feature", "login", "in-progress")
+    memory = workspace / ".ai" / "memory"
+    memory.mkdir(parents=True)
+    (memory / "global-state.yml").write_text("current: [unparseable\n", encoding="utf-8")
+
+    result = cleanup.cleanup(background=False, take_snapshot=False)
+
+    assert result["status"] == "success" and result["global_state_reset"]
+    ai = workspace / ".ai"
+    assert sorted(p.name for p in (ai / "features").iterdir()) == [".gitkeep"]
+    assert not (ai / "bugs").exists() and not (ai / "ideas").exists()
+    assert statefile.load(memory / "global-state.yml")["current"]["name"] is None
+
+
+def test_selective_cleanup_keeps_context_of_other_workflows(workspace):
+    make_workflow(workspace, "feature", "login", "in-progress")
+    make_workflow(workspace, "bug", "crash", "closed")
+    memory = workspace / ".ai" / "memory"
+    memory.mkdir(parents=True)
+    (memory / "global-state.yml").write_text(
+        "current:\n  name: login\n  workflow_type: feature\n", encoding="utf-8"
+    )
+
+    result = cleanup.cleanup(statuses=["closed"], background=False, take_snapshot=False)
+
+    assert [w["name"] for w in result["selected"]] == ["crash"]
+    assert not result["global_state_reset"]
+    assert (workspace / ".ai" / "features" / "login").exists()
+    assert not (workspace / ".ai" / "bugs" / "crash").exists()
+    assert statefile.load(memory / "global-state.yml")["current"]["name"] == "login"
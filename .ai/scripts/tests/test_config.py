@@ -0,0 +1,112 @@
+"""Config: parse cache and the compiled config cache."""
+
+import os
+
+import pytest
+
+import config
+
+
+def test_cached_parse_sees_same_size_rename_rewrite(tmp_path):
+    path = tmp_path / "state.yml"
+    path.write_text("status: aaaa\n")
+    calls = []
+
+    def parser(p):
+        calls.append(p)
+        return {"status": open(p).read().split()[1]}
+
+    assert config.cached_parse(path, parser) == {"status": "aaaa"}
+    assert config.cached_parse(path, parser) == {"status": "aaaa"} and len(calls) == 1
+
+    # Same size and same mtime, new inode (as a Transaction rewrite leaves it)
+    st = os.stat(path)
+    replacement = tmp_path / "state.yml.tmp"
+    replacement.write_text("status: bbbb\n")
+    os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(replacement, path)
+
+    assert config.cached_parse(path, parser) == {"status": "bbbb"}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project with a config.yml, and a private compiled-config cache."""
+    pytest.importorskip("yaml")
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", str(tmp_path / "cache" / "config.pickle"))
+    root = tmp_path / "project"
+    (root / ".ai").mkdir(parents=True)
+    (root / ".ai" / "config.yml").write_text("paths:\n  features: work/features\n")
+    monkeypatch.chdir(root)
+    return root
+
+
+@pytest.fixture
+def yaml_loads(monkeypatch):
+    """Count the config loads that parse YAML."""
+    loads = []
+    real = config._yaml
+
+    def counting():
+        loads.append(1)
+        return real()
+
+    monkeypatch.setattr(config, "_yaml", counting)
+    return loads
+
+
+def test_cache_hit_skips_yaml(project, yaml_loads):
+    first = config.Config.load()
+    second = config.Config.load()
+
+    assert first.paths.features == second.paths.features == "work/features"
+    assert len(yaml_loads) == 1
+    assert os.path.exists(config._CONFIG_CACHE_PATH)
+
+
+def test_cache_invalidated_by_size_and_mtime(project, yaml_loads):
+    path = project / ".ai" / "config.yml"
+    config.Config.load()
+
+    path.write_text("paths:\n  features: work/other-features\n")
+    assert config.Config.load().paths.features == "work/other-features"
+
+    st = os.stat(path)
+    path.write_text("paths:\n  features: work/other-featureZ\n")  # Same size
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+    assert config.Config.load().paths.features == "work/other-featureZ"
+    assert len(yaml_loads) == 3
+
+
+def test_corrupt_cache_is_ignored_and_rewritten(project, yaml_loads):
+    os.makedirs(os.path.dirname(config._CONFIG_CACHE_PATH))
+    with open(config._CONFIG_CACHE_PATH, "wb") as f:
+        f.write(b"not a pickle")
+
+    assert config.Config.load().paths.features == "work/features"
+    assert config.Config.load().paths.features == "work/features"
+    assert len(yaml_loads) == 1
+
+
+def test_unwritable_cache_falls_back_to_parsing(project, monkeypatch, yaml_loads, tmp_path):
+    (tmp_path / "blocker").write_text("a file, not a folder\n")
+    monkeypatch.setattr(config, "_CONFIG_CACHE_PATH", str(tmp_path / "blocker" / "config.pickle"))
+
+    assert config.Config.load().paths.features == "work/features"
+    assert config.Config.load().paths.features == "work/features"
+    assert len(yaml_loads) == 2
+
+
+def test_remembered_roots_are_bounded(project, monkeypatch):
+    monkeypatch.setattr(config, "_CONFIG_CACHE_MAX_ROOTS", 3)
+    folders = []
+    for n in range(5):
+        folder = project / f"sub{n}"
+        folder.mkdir()
+        folders.append(str(folder))
+        monkeypatch.chdir(folder)
+        config.Config.load()
+
+    cache = config._read_config_cache()
+    assert list(cache["roots"]) == folders[-3:]
+    assert list(cache["configs"]) == [str(project / ".ai" / "config.yml")]
@@ -0,0 +1,43 @@
+"""Event journal: transaction batching and segment rotation."""
+
+import json
+
+import journal
+from transaction import Transaction
+
+
+def test_records_follow_their_transaction(workspace, monkeypatch):
+    monkeypatch.setenv(journal.ACTOR_ENV, "tester")
+
+    txn = Transaction(sync=False)
+    journal.record("status", "dropped", "feature", "planning", "in-progress", txn=txn)
+    txn.rollback()
+    journal.record("status", "kept", "feature", "planning", "in-progress", txn=txn)
+    journal.record("phase", "kept", "feature", "pending", "in-progress", phase=1, txn=txn)
+    assert list(journal.iter_events()) == []
+    txn.commit()
+
+    events = list(journal.iter_events())
+    assert [(e["workflow"], e["event"]) for e in events] == [("kept", "status"), ("kept", "phase")]
+    assert events[1]["phase"] == 1 and events[1]["actor"] == "tester"
+
+
+def test_rotation_keeps_every_record_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "SEGMENT_MAX_BYTES", 500)
+    path = tmp_path / journal.JOURNAL_FILENAME
+
+    for i in range(40):
+        journal.append([{"i": i, "pad": "x" * 40}], path)
+
+    files = journal.segments(path)
+    assert files[-1] == path
+    assert [f.name for f in files[:2]] == ["events.000001.jsonl", "events.000002.jsonl"]
+    assert all(500 < f.stat().st_size < 600 for f in files[:-1])
+    assert [e["i"] for e in journal.iter_events(path)] == list(range(40))
+
+
+def test_torn_lines_are_skipped(tmp_path):
+    path = tmp_path / journal.JOURNAL_FILENAME
+    path.write_text(json.dumps({"i": 1}) + "\n" + '{"i": 2, "tor' + "\n", encoding="utf-8")
+
+    assert list(journal.iter_events(path)) == [{"i": 1}]
@@ -0,0 +1,43 @@
+"""Typed state records: decoding defaults and encoding back as stored."""
+
+from model import Phase, PlanState, Status, WorkflowState
+
+
+def test_decoded_phase_encodes_as_stored():
+    raw = {"name": "API", "status": "in-progress", "notes": "see PR", "started": "2026-01-10"}
+
+    phase = Phase.decode(raw)
+
+    assert phase.status is Status.IN_PROGRESS and phase.completed is None
+    assert list(phase.encode().items()) == list(raw.items())
+
+
+def test_changed_values_are_added_after_stored_keys():
+    phase = Phase.decode({"name": "API", "status": "pending"})
+
+    done = phase._replace(status=Status.COMPLETED, completed="2026-01-12")
+
+    assert done.encode() == {"name": "API", "status": "completed", "completed": "2026-01-12"}
+    assert type(done.encode()["status"]) is str
+
+
+def test_plan_round_trip_keeps_phases_and_extra_keys():
+    raw = {
+        "status": "in-progress",
+        "phases": [{"name": "A", "status": "completed"}, {"name": "B"}],
+        "owner": "team-a",
+        "current_phase": 2,
+    }
+
+    assert PlanState.decode(raw).encode() == raw
+    assert PlanState.decode({}).current_phase == 0
+
+
+def test_records_built_in_code_encode_every_key():
+    state = WorkflowState("feature", "login", Status.CLARIFYING, "2026-01-05", "2026-01-05")
+
+    assert state.encode() == {
+        "workflow_type": "feature", "name": "login", "status": "clarifying",
+        "created": "2026-01-05", "updated": "2026-01-05",
+    }
+    assert WorkflowState.decode({"name": "login"}).status is Status.UNKNOWN
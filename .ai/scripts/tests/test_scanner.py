@@ -0,0 +1,53 @@
+"""Workspace scanner: type to folder mapping and artifact listing."""
+
+import config
+import scanner
+from conftest import make_workflow
+
+
+def test_scan_without_config_maps_each_type_to_its_folder(workspace):
+    make_workflow(workspace, "feature", "login", "planning")
+    make_workflow(workspace, "bug", "crash", "reported")
+    make_workflow(workspace, "idea", "dark-mode", "exploring")
+
+    snapshot = scanner.scan(cfg=config.Config())
+
+    assert [e.name for e in snapshot.of_type("feature")] == ["login"]
+    assert [e.name for e in snapshot.of_type("bug")] == ["crash"]
+    assert [e.name for e in snapshot.of_type("idea")] == ["dark-mode"]
+    assert snapshot.base_paths == {
+        "feature": config.Path(".ai/features"),
+        "bug": config.Path(".ai/bugs"),
+        "idea": config.Path(".ai/ideas"),
+    }
+
+
+def test_missing_type_folder_is_skipped(workspace):
+    make_workflow(workspace, "feature", "login")
+
+    snapshot = scanner.scan(cfg=config.Config())
+
+    assert [e.workflow_type for e in snapshot] == ["feature"]
+    assert not snapshot.exists("bug")
+
+
+def test_locate_and_artifacts(workspace):
+    make_workflow(workspace, "bug", "crash", "reported")
+    (workspace / ".ai" / "bugs" / "crash" / "fix-plan").mkdir()
+
+    entry = scanner.locate("crash", cfg=config.Config())
+
+    assert entry.workflow_type == "bug"
+    assert entry.has("state.yml") and entry.has("fix-plan")
+    assert scanner.locate("missing", cfg=config.Config()) is None
+
+
+def test_configured_type_uses_its_base_path(workspace):
+    cfg = config.Config._from_dict({
+        "paths": {"bugs": "tracker"},
+        "workflow_types": {"bug": {"states": ["reported"], "initial_state": "reported"}},
+    })
+    (workspace / "tracker" / "crash").mkdir(parents=True)
+
+    assert cfg.get_workflow_base_path("bug") == config.Path("tracker")
+    assert [e.name for e in scanner.iter_workflows(("bug",), cfg=cfg)] == ["crash"]
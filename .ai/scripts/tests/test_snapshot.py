@@ -0,0 +1,43 @@
+"""Snapshots: restores copy files back and leave the snapshot intact."""
+
+import os
+
+import snapshot
+from conftest import make_workflow
+
+
+def test_restore_copies_and_keeps_snapshot_immutable(workspace):
+    path = make_workflow(workspace, "feature", "login", "planning")
+    (path / "prd.md").write_text("# PRD v1\n", encoding="utf-8")
+    taken = snapshot.create([path], reason="test", prune_after=False)
+
+    # Writers replace files by rename, so the snapshot keeps v1
+    os.replace(_write(path / "prd.md.tmp", "# PRD v2\n"), path / "prd.md")
+    result = snapshot.restore(taken["id"])
+
+    assert result["status"] == "success"
+    restored = path / "prd.md"
+    stored = snapshot.get_snapshots_path() / taken["id"] / "files" / "features" / "login" / "prd.md"
+    assert restored.read_text() == "# PRD v1\n"
+    assert not os.path.samefile(restored, stored)
+
+    # An in-place edit of the restored file must not reach the snapshot
+    with open(restored, "a", encoding="utf-8") as f:
+        f.write("edited\n")
+    assert stored.read_text() == "# PRD v1\n"
+
+
+def test_restore_snapshots_the_current_version_first(workspace):
+    path = make_workflow(workspace, "feature", "login", "planning")
+    taken = snapshot.create([path], reason="test", prune_after=False)
+    (path / "state.yml").unlink()
+
+    result = snapshot.restore(taken["id"])
+
+    assert (path / "state.yml").exists()
+    assert result["previous_state_snapshot"] not in (None, taken["id"])
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
@@ -0,0 +1,86 @@
+"""State-file codec: builtin backend against PyYAML, and in-place patches."""
+
+import pytest
+
+import statefile
+
+STATE = {
+    "workflow_type": "feature",
+    "name": "login-flow",
+    "status": "in-progress",
+    "created": "2026-01-05",
+    "updated": "2026-02-11",
+    "owner": None,
+    "priority": 2,
+    "tags": ["auth", "ui"],
+}
+
+PLAN = {
+    "status": "in-progress",
+    "current_phase": 2,
+    "created": "2026-01-06",
+    "updated": "2026-02-11",
+    "phases": [
+        {"name": "Schema: users table", "status": "completed",
+         "started": "2026-01-06", "completed": "2026-01-09"},
+        {"name": "API", "status": "in-progress", "started": "2026-01-10", "completed": None},
+        {"name": "UI", "status": "pending", "started": None, "completed": None},
+    ],
+}
+
+
+@pytest.fixture
+def pyyaml():
+    pytest.importorskip("yaml")
+    return statefile.get_backend("pyyaml")
+
+
+@pytest.mark.parametrize("data", [STATE, PLAN], ids=["state", "plan"])
+def test_builtin_dumps_like_pyyaml(pyyaml, data):
+    builtin = statefile.get_backend("builtin")
+
+    assert builtin.dumps(data) == pyyaml.dumps(data)
+
+
+@pytest.mark.parametrize("data", [STATE, PLAN], ids=["state", "plan"])
+def test_round_trip_on_every_backend(data):
+    for name in statefile.available_backends():
+        backend = statefile.get_backend(name)
+        assert backend.loads(backend.dumps(data)) == data, name
+
+
+def test_builtin_reads_pyyaml_output(pyyaml):
+    builtin = statefile.get_backend("builtin")
+
+    assert builtin.loads(pyyaml.dumps(PLAN)) == pyyaml.loads(pyyaml.dumps(PLAN))
+
+
+def test_patch_rewrites_only_changed_values(pyyaml):
+    text = pyyaml.dumps(PLAN)
+    new = dict(PLAN, status="completed", current_phase=3, phases=[
+        PLAN["phases"][0],
+        dict(PLAN["phases"][1], status="completed", completed="2026-02-12"),
+        PLAN["phases"][2],
+    ])
+
+    assert statefile.patch_text(text, new) == pyyaml.dumps(new)
+
+
+def test_patch_keeps_comments_and_layout():
+    text = "# Managed by the workflow\nstatus: planning   # see prd.md\nname: 'login-flow'\n"
+
+    patched = statefile.patch_text(text, {"status": "in-progress", "name": "login-flow"})
+
+    assert patched == "# Managed by the workflow\nstatus: in-progress   # see prd.md\nname: 'login-flow'\n"
+    assert statefile.patch_text(text, {"status": "planning", "name": "login-flow"}) == text
+
+
+def test_patch_declines_structural_changes():
+    text = statefile.get_backend("builtin").dumps(STATE)
+
+    assert statefile.patch_text(text, dict(STATE, extra="added")) is None
+
+
+def test_builtin_rejects_unsupported_yaml():
+    with pytest.raises(statefile.StateFileError):
+        statefile.get_backend("builtin").loads("notes: |\n  multi\n  line\n")
@@ -0,0 +1,38 @@
+"""Timing trace: rotation when the trace grows past its limit."""
+
+import json
+
+import pytest
+
+import timing
+
+
+@pytest.fixture
+def trace(tmp_path, monkeypatch):
+    path = tmp_path / "timings.jsonl"
+    monkeypatch.setattr(timing, "TRACE_PATH", str(path))
+    monkeypatch.setattr(timing, "TRACE_MAX_BYTES", 1000)
+    return path
+
+
+def test_trace_rotates_once_past_the_limit(trace):
+    for i in range(30):
+        timing._append_trace({"i": i, "pad": "x" * 40})
+
+    rotated = trace.with_name("timings.jsonl.1")
+    assert rotated.stat().st_size > 1000
+    records = [json.loads(line) for path in (rotated, trace) for line in path.read_text().splitlines()]
+    assert [r["i"] for r in records][-1] == 29
+
+
+def test_late_rotation_keeps_the_rotated_file(trace):
+    trace.write_text("x" * 2000 + "\n")
+    timing._rotate_trace()
+    rotated = trace.with_name("timings.jsonl.1")
+
+    # A writer that saw the old size rotates after another one already did
+    trace.write_text("fresh\n")
+    timing._rotate_trace()
+
+    assert rotated.stat().st_size == 2001
+    assert trace.read_text() == "fresh\n"
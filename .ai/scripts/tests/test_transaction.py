@@ -0,0 +1,78 @@
+"""Transactions: all-or-nothing staging, failed commits and callbacks."""
+
+import os
+
+import pytest
+
+import transaction
+from transaction import Transaction
+
+
+@pytest.fixture
+def files(tmp_path):
+    for name in ("a.yml", "b.yml"):
+        (tmp_path / name).write_text(f"{name}: old\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_commit_replaces_every_file(files):
+    with Transaction(sync=True) as txn:
+        txn.write(files / "a.yml", "a.yml: new\n")
+        txn.write(files / "sub" / "c.yml", "c.yml: new\n")
+
+    assert (files / "a.yml").read_text() == "a.yml: new\n"
+    assert (files / "sub" / "c.yml").read_text() == "c.yml: new\n"
+    assert txn.committed == [files / "a.yml", files / "sub" / "c.yml"]
+
+
+def test_exception_in_block_rolls_back(files):
+    dropped = []
+    with pytest.raises(RuntimeError):
+        with Transaction() as txn:
+            txn.write(files / "a.yml", "a.yml: new\n")
+            txn.after_commit(lambda: dropped.append("commit"), lambda: dropped.append("rollback"))
+            raise RuntimeError("validation failed")
+
+    assert (files / "a.yml").read_text() == "a.yml: old\n"
+    assert dropped == ["rollback"]
+
+
+def test_failed_write_midway_leaves_targets_and_no_temp_files(files):
+    (files / "blocker").write_text("not a folder\n")
+    ran = []
+    txn = Transaction(sync=False)
+    txn.write(files / "a.yml", "a.yml: new\n")
+    txn.write(files / "blocker" / "c.yml", "c.yml: new\n")  # Its parent is a file
+    txn.write(files / "b.yml", "b.yml: new\n")
+    txn.after_commit(lambda: ran.append("commit"))
+
+    with pytest.raises(OSError):
+        txn.commit()
+
+    assert (files / "a.yml").read_text() == "a.yml: old\n"
+    assert (files / "b.yml").read_text() == "b.yml: old\n"
+    assert sorted(os.listdir(files)) == ["a.yml", "b.yml", "blocker"]
+    assert ran == []
+    assert len(txn) == 0
+
+
+def test_patch_skips_unchanged_file(files):
+    path = files / "state.yml"
+    path.write_text("status: planning\nname: x\n", encoding="utf-8")
+    txn = Transaction()
+
+    assert not txn.patch(path, {"status": "planning", "name": "x"})
+    assert txn.patch(path, {"status": "in-progress", "name": "x"})
+    assert txn.read_text(path) == "status: in-progress\nname: x\n"
+    txn.commit()
+    assert path.read_text() == "status: in-progress\nname: x\n"
+
+
+def test_atomic_write_keeps_mode(files):
+    path = files / "a.yml"
+    os.chmod(path, 0o600)
+
+    transaction.atomic_write(path, "a.yml: new\n", sync=False)
+
+    assert path.read_text() == "a.yml: new\n"
+    assert os.stat(path).st_mode & 0o777 == 0o600
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Workflow Timings
+Span-based timing of the workflow scripts, to see where a slow command spends
+its time: interpreter startup, config load, state-file (YAML) parsing,
+filesystem scans or subprocess calls.
+
+Every entry point in run.COMMANDS wraps its main() with
+`instrument(<command>)`; library code marks phases with `with span("name"):`.
+Spans nest, and repeated spans with the same name under the same parent are
+merged (total ms and count), so a scan over thousands of workflows stays one
+line. Recording starts when this module is imported, so phases run at import
+time (e.g. `from config import cfg` loading the config) count towards the
+first invocation. "startup_ms" is the time from process start to that import,
+and "total_ms" includes it.
+Spans from worker threads, or run in the daemon outside a request, cost
+nothing and are not recorded.
+
+Pass --timings to cleanup.py, get-workflow-info.py or create-pr.py (or set
+AI_WORKFLOW_TIMINGS=1) to add a "timings" block to their JSON output. Every
+instrumented invocation also appends one record to .ai/.cache/timings.jsonl
+(set AI_WORKFLOW_NO_TRACE=1 to skip it); `stats` aggregates those records.
+
+Usage:
+  python timing.py stats                        # p50/p95/p99 per command (JSON output)
+  python timing.py stats --command create-pr    # One command only
+  python timing.py stats --last 100             # Only the 100 most recent records
+"""
+
+import os
+import time
+from _thread import get_ident
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("timings")
+
+TIMINGS_ENV = "AI_WORKFLOW_TIMINGS"
+NO_TRACE_ENV = "AI_WORKFLOW_NO_TRACE"
+
+# The trace lives in .ai/.cache next to this scripts folder (see daemon.py);
+# config.py imports this module, so it can't use config.get_cache_path
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACE_PATH = os.path.join(os.path.dirname(SCRIPTS_DIR), ".cache", "timings.jsonl")
+TRACE_MAX_BYTES = 4 * 1024 * 1024  # Rotated to timings.jsonl.1 beyond this
+
+# Upper bounds (ms) of the stats histogram buckets
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _Node:
+    """Accumulated time of one span name under one parent."""
+    __slots__ = ("ms", "count", "children")
+
+    def __init__(self):
+        self.ms = 0.0
+        self.count = 0
+        self.children = {}
+
+    def to_dict(self) -> dict:
+        result = {"ms": round(self.ms, 3), "count": self.count}
+        if self.children:
+            result["spans"] = {name: node.to_dict() for name, node in self.children.items()}
+        return result
+
+    def flatten(self, prefix: str, into: dict) -> dict:
+        """{"parent/child": ms} for every span below this node."""
+        for name, node in self.children.items():
+            path = f"{prefix}/{name}" if prefix else name
+            into[path] = round(into.get(path, 0.0) + node.ms, 3)
+            node.flatten(path, into)
+        return into
+
+
+class _Invocation:
+    """Span tree of one instrumented command run."""
+
+    def __init__(self, command: str = None, startup_ms: float = None):
+        self.command = command
+        self.thread = get_ident()
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        self.startup_ms = startup_ms
+        self.report = False
+        self.traced = True
+        self.root = _Node()
+        self.stack = [self.root]
+
+    def total_ms(self) -> float:
+        return (self.startup_ms or 0.0) + (time.perf_counter() - self.started) * 1000
+
+
+class _Span:
+    """Context manager timing one span of the current invocation."""
+    __slots__ = ("invocation", "name", "node", "start")
+
+    def __init__(self, invocation: _Invocation, name: str):
+        self.invocation = invocation
+        self.name = name
+
+    def __enter__(self):
+        stack = self.invocation.stack
+        children = stack[-1].children
+        node = children.get(self.name)
+        if node is None:
+            node = children[self.name] = _Node()
+        stack.append(node)
+        self.node = node
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.node.ms += (time.perf_counter() - self.start) * 1000
+        self.node.count += 1
+        stack = self.invocation.stack
+        if len(stack) > 1 and stack[-1] is self.node:
+            stack.pop()
+        return False
+
+
+class _NoSpan:
+    """Span stand-in used when nothing is being recorded."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _process_age_ms():
+    """Milliseconds since this process started (Linux only, 10 ms resolution)."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        # Fields after "(comm)": state is field 3, starttime field 22
+        start_ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        started = start_ticks / os.sysconf("SC_CLK_TCK")
+        return round((time.clock_gettime(time.CLOCK_BOOTTIME) - started) * 1000, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+_daemon = False  # Invocations are served by the long-lived daemon
+# Spans recorded at import time, adopted by the first invocation
+_current = _Invocation(startup_ms=_process_age_ms())
+
+
+def mark_daemon() -> None:
+    """Record invocations as daemon-served (no interpreter startup to measure)."""
+    global _daemon, _current
+    _daemon = True
+    _current = None
+
+
+def span(name: str):
+    """Time a phase of the current invocation: `with span("scan"): ...`."""
+    invocation = _current
+    if invocation is None or invocation.thread != get_ident():
+        return _NO_SPAN
+    return _Span(invocation, name)
+
+
+def enable() -> None:
+    """Add the timings block to the current invocation's output (--timings)."""
+    if _current is not None:
+        _current.report = True
+
+
+def skip_trace() -> None:
+    """Keep the current invocation out of the trace (long-running modes like --watch)."""
+    if _current is not None:
+        _current.traced = False
+
+
+def summary() -> dict:
+    """Timings of the current invocation so far."""
+    invocation = _current
+    if invocation is None:
+        return {}
+    return {
+        "total_ms": round(invocation.total_ms(), 3),
+        "startup_ms": invocation.startup_ms,
+        "daemon": _daemon,
+        "spans": invocation.root.to_dict().get("spans", {})
+    }
+
+
+def attach(result: dict) -> dict:
+    """Add a "timings" block to a JSON result when timings were requested."""
+    if _current is not None and _current.report:
+        result["timings"] = summary()
+    return result
+
+
+def _rotate_trace() -> None:
+    """
+    Move the trace to timings.jsonl.1 under a lock. The size is checked again
+    once the lock is held, so writers crossing the threshold together rotate
+    once instead of replacing the fresh .1 with a nearly empty file.
+    """
+    from transaction import FileLock
+
+    with FileLock(TRACE_PATH + ".lock"):
+        try:
+            if os.stat(TRACE_PATH).st_size > TRACE_MAX_BYTES:
+                os.replace(TRACE_PATH, TRACE_PATH + ".1")
+        except FileNotFoundError:
+            pass
+
+
+def _append_trace(record: dict) -> None:
+    """Append one JSON line to the trace file, rotating it when large (best effort)."""
+    import json
+
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    try:
+        os.makedirs(os.path.dirname(TRACE_PATH), exist_ok=True)
+        fd = os.open(TRACE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size > TRACE_MAX_BYTES:
+                _rotate_trace()
+                os.close(fd)
+                fd = os.open(TRACE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            # A single O_APPEND write keeps concurrent records on separate lines
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _finish(invocation: _Invocation, status: str) -> None:
+    if os.environ.get(NO_TRACE_ENV) or not invocation.traced:
+        return
+    _append_trace({
+        "time": round(invocation.wall, 3),
+        "command": invocation.command,
+        "status": status,
+        "total_ms": round(invocation.total_ms(), 3),
+        "startup_ms": invocation.startup_ms,
+        "daemon": _daemon,
+        "spans": invocation.root.flatten("", {})
+    })
+
+
+def instrument(command: str):
+    """Decorator recording spans and a trace record for each call of a main()."""
+    def decorator(main):
+        def wrapper(*args, **kwargs):
+            global _current
+            invocation = _current
+            if invocation is None or invocation.command is not None:
+                invocation = _current = _Invocation()
+            invocation.command = command
+            invocation.report = bool(os.environ.get(TIMINGS_ENV))
+            status = "error"
+            try:
+                result = main(*args, **kwargs)
+                status = "success"
+                return result
+            except SystemExit as e:
+                status = "success" if e.code in (None, 0) else "error"
+                raise
+            finally:
+                _current = None
+                _finish(invocation, status)
+
+        wrapper.__name__ = main.__name__
+        wrapper.__doc__ = main.__doc__
+        wrapper.__wrapped__ = main
+        return wrapper
+    return decorator
+
+
+def read_trace(last: int = None) -> list:
+    """Trace records, oldest first (including the rotated file)."""
+    import json
+
+    records = []
+    for path in (TRACE_PATH + ".1", TRACE_PATH):
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Torn line from a crashed writer
+        except OSError:
+            continue
+    return records[-last:] if last else records
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    import math
+
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _distribution(values: list) -> dict:
+    values = sorted(values)
+    return {
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3)
+    }
+
+
+def _histogram(values: list) -> dict:
+    """Counts per latency bucket ("<10ms", ..., ">=2500ms")."""
+    labels = [f"<{bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">={HISTOGRAM_BOUNDS_MS[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for value in values:
+        for bound, label in zip(HISTOGRAM_BOUNDS_MS, labels):
+            if value < bound:
+                counts[label] += 1
+                break
+        else:
+            counts[labels[-1]] += 1
+    return counts
+
+
+def stats(records: list, command: str = None) -> dict:
+    """Per-command latency percentiles and histograms, with per-span percentiles."""
+    by_command = {}
+    for record in records:
+        if command and record.get("command") != command:
+            continue
+        by_command.setdefault(record.get("command"), []).append(record)
+
+    commands = {}
+    for name, runs in sorted(by_command.items(), key=lambda item: str(item[0])):
+        totals = [run.get("total_ms", 0.0) for run in runs]
+        phases = {}
+        startups = [run["startup_ms"] for run in runs if run.get("startup_ms") is not None]
+        if startups:
+            phases["startup"] = startups
+        for run in runs:
+            for path, ms in run.get("spans", {}).items():
+                phases.setdefault(path, []).append(ms)
+
+        commands[name] = {
+            "count": len(runs),
+            "errors": sum(run.get("status") == "error" for run in runs),
+            "daemon": sum(bool(run.get("daemon")) for run in runs),
+            **_distribution(totals),
+            "histogram": _histogram(totals),
+            "spans": {path: {"count": len(values), **_distribution(values)}
+                      for path, values in sorted(phases.items())}
+        }
+    return commands
+
+
+@instrument("timings")
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Aggregate workflow command timings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    stats_parser = subparsers.add_parser("stats", help="Latency percentiles per command")
+    stats_parser.add_argument("--command", help="Only this command (e.g. create-pr)")
+    stats_parser.add_argument("--last", type=int, help="Only the N most recent records")
+
+    args = parser.parse_args()
+
+    records = read_trace(args.last)
+    result = {
+        "status": "success",
+        "trace": TRACE_PATH,
+        "records": len(records),
+        "commands": stats(records, args.command)
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+State File Transactions
+Batches the writes of one logical step (init-impl-plan's plan-state.yml,
+plan.md and state.yml; init-workflow's artifacts and global-state.yml) so
+they land together:
+
+  1. each staged file is written to a temp file next to its target and
+     fsynced
+  2. the temp files are renamed over their targets
+  3. the folders holding them are fsynced, once per folder, so the renames
+     are durable too (skipped where folders can't be opened, e.g. Windows)
+
+A crash or a concurrent reader sees every file either complete in its old or
+its new version, never half-written. Renames happen one by one, so a crash in
+step 2 can leave some files of a batch updated and others not.
+
+Files are always replaced by rename (never rewritten in place), so hard links
+to an older version keep that version intact.
+
+Set AI_WORKFLOW_NO_FSYNC=1 to skip the sync (tests, benchmarks, tmpfs).
+
+Usage:
+  from transaction import Transaction
+
+  with Transaction() as txn:
+      txn.write(path / "plan.md", content)
+      txn.patch(path / "state.yml", state)   # statefile.patch semantics
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import statefile
+
+SYNC_ENV = "AI_WORKFLOW_NO_FSYNC"
+
+
+def sync_enabled() -> bool:
+    """Whether commits sync data to disk before renaming."""
+    return os.environ.get(SYNC_ENV, "") in ("", "0")
+
+
+class Transaction:
+    """
+    Staged writes committed as one batch (see module docstring).
+    Staging different paths from several threads is safe; commit from one.
+    """
+
+    def __init__(self, sync: bool = None):
+        self.sync = sync_enabled() if sync is None else sync
+        self._staged = {}  # Path -> bytes, in staging order
+        self._after_commit = []  # (on commit, on rollback) callbacks
+        self.committed = []  # Paths written by the last commit
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def write(self, path, content) -> None:
+        """Stage `content` (str or bytes) as the new contents of `path`."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._staged[Path(path)] = content
+
+    def read_text(self, path) -> str:
+        """Contents of `path` as this transaction would leave it."""
+        staged = self._staged.get(Path(path))
+        if staged is not None:
+            return staged.decode("utf-8")
+        with open(path, encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def patch(self, path, data: dict) -> bool:
+        """
+        Stage a state file update that changes only the values that differ
+        (statefile.patch_text). Returns False, staging nothing, if the file
+        already holds `data`.
+        """
+        try:
+            old_text = self.read_text(path)
+        except FileNotFoundError:
+            self.write(path, statefile.dumps(data))
+            return True
+
+        new_text = statefile.patch_text(old_text, data)
+        if new_text is None:
+            new_text = statefile.dumps(data)
+        if new_text == old_text:
+            return False
+        self.write(path, new_text)
+        return True
+
+    def after_commit(self, callback, on_rollback=None) -> None:
+        """
+        Run callback() after the next commit has renamed its files. If the
+        transaction is rolled back instead, on_rollback() runs (if given).
+        """
+        self._after_commit.append((callback, on_rollback))
+
+    def rollback(self) -> None:
+        """Discard everything staged."""
+        callbacks = list(self._after_commit)
+        self._staged.clear()
+        self._after_commit.clear()
+        for _, on_rollback in callbacks:
+            if on_rollback is not None:
+                on_rollback()
+
+    def commit(self) -> list:
+        """Write, sync and rename every staged file; returns their paths."""
+        staged = list(self._staged.items())
+        callbacks = list(self._after_commit)
+        self._staged.clear()
+        self._after_commit.clear()
+        self.committed = []
+        if not staged:
+            for callback, _ in callbacks:
+                callback()
+            return []
+
+        temps = []
+        try:
+            for path, content in staged:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}-{len(temps)}.tmp")
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, _file_mode(path))
+                temps.append((tmp, path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                    if self.sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+
+            for tmp, path in temps:
+                os.replace(tmp, path)
+                self.committed.append(path)
+        except BaseException:
+            for tmp, _ in temps:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+            raise
+
+        if self.sync:
+            for folder in dict.fromkeys(path.parent for path in self.committed):
+                _fsync_dir(folder)
+
+        for callback, _ in callbacks:
+            callback()
+        return self.committed
+
+
+def _file_mode(path: Path) -> int:
+    """Permission bits for a replacement file: the target's, or the default."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666  # narrowed by the umask, as with open()
+
+
+def _fsync_dir(folder: Path) -> None:
+    """Make renames in a folder durable (no-op where folders can't be opened)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Some filesystems don't support syncing folders
+    finally:
+        os.close(fd)
+
+
+class FileLock:
+    """
+    Exclusive lock on a sidecar lock file, for appenders that rotate a file
+    (flock; msvcrt on Windows). Best effort: if the lock can't be taken the
+    block runs unlocked rather than dropping the caller's data.
+
+      with FileLock(path.with_name("events.lock")):
+          ...
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self.fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except OSError:
+            pass
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        os.close(self.fd)  # Releases the lock
+        self.fd = None
+
+
+def atomic_write(path, content, sync: bool = None) -> None:
+    """Replace one file atomically (a one-file transaction)."""
+    with Transaction(sync) as txn:
+        txn.write(path, content)
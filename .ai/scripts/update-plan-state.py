@@ -1,72 +1,57 @@
 #!/usr/bin/env python3
-"""Update implementation plan state during execution."""
+"""
+Update implementation plan state during execution.
+
+Usage:
+  python update-plan-state.py <feature> <action> [phase-or-status]
+  python update-plan-state.py <feature> --batch <action> [arg] <action> [arg] ...
+  python update-plan-state.py <feature> --stdin < actions.jsonl
+
+Batch mode applies every action to one in-memory copy of plan-state.yml and
+state.yml, validates the result and writes once (nothing is written if any
+action fails). It prints per-action results as JSON. JSON lines look like:
+  {"action": "update-feature-state", "status": "in-progress"}
+  {"action": "start-phase", "phase": 2}
+
+Examples:
+  python update-plan-state.py my-feature start-phase 2
+  python update-plan-state.py my-feature --batch update-feature-state in-progress start-plan
+"""
 
 import argparse
+import json
 import sys
 from datetime import date
 from pathlib import Path
 
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("update-plan-state")
+
 try:
-    from config import cfg
-    HAS_YAML = True
-    try:
-        import yaml
-    except ImportError:
-        HAS_YAML = False
+    from config import cfg, cached_parse
+    from model import PlanState, WorkflowState
+    from transaction import Transaction
+    import journal
+    import statefile
+    import timing
 except ImportError:
-    # Fallback if config module not available
-    HAS_YAML = False
-    class FallbackConfig:
-        class paths:
-            features = ".ai/features"
-        class defaults:
-            date_format = "%Y-%m-%d"
-        def get_feature_path(self, name):
-            return Path(self.paths.features) / name
-    cfg = FallbackConfig()
-
-
-def read_plan_state_no_yaml(state_path: Path) -> dict:
-    """Parse plan-state.yml without PyYAML (fallback)."""
-    state = {
-        'status': 'pending',
-        'current_phase': 0,
-        'created': None,
-        'updated': None,
-        'phases': []
-    }
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
 
-    content = state_path.read_text()
-    lines = content.split('\n')
 
-    in_phases = False
-    current_phase_obj = None
+VALID_ACTIONS = ['start-plan', 'start-phase', 'complete-phase', 'complete-plan', 'update-feature-state']
+PHASE_ACTIONS = ('start-phase', 'complete-phase')
+VALID_FEATURE_STATUSES = ['clarifying', 'clarified', 'prd-draft', 'prd-approved', 'planning', 'in-progress', 'in-review', 'completed']
 
-    for line in lines:
-        stripped = line.strip()
-
-        if stripped.startswith('status:'):
-            state['status'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('current_phase:'):
-            state['current_phase'] = int(stripped.split(':', 1)[1].strip())
-        elif stripped.startswith('created:'):
-            state['created'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('updated:'):
-            state['updated'] = stripped.split(':', 1)[1].strip()
-        elif stripped.startswith('phases:'):
-            in_phases = True
-        elif in_phases and stripped.startswith('- name:'):
-            if current_phase_obj:
-                state['phases'].append(current_phase_obj)
-            current_phase_obj = {'name': stripped.split(':', 1)[1].strip()}
-        elif in_phases and stripped.startswith('status:'):
-            if current_phase_obj:
-                current_phase_obj['status'] = stripped.split(':', 1)[1].strip()
-
-    if current_phase_obj:
-        state['phases'].append(current_phase_obj)
-
-    return state
+
+class PlanStateError(Exception):
+    """An action could not be applied; `details` are extra lines for the user."""
+
+    def __init__(self, message: str, *details: str):
+        super().__init__(message)
+        self.details = details
 
 
 def read_plan_state(state_path: Path) -> dict:
@@ -74,38 +59,7 @@ def read_plan_state(state_path: Path) -> dict:
     if not state_path.exists():
         raise FileNotFoundError(f"plan-state.yml not found at {state_path}")
 
-    if HAS_YAML:
-        import yaml
-        with open(state_path) as f:
-            return yaml.safe_load(f) or {}
-    else:
-        return read_plan_state_no_yaml(state_path)
-
-
-def write_plan_state_no_yaml(state_path: Path, state: dict) -> None:
-    """Write plan-state.yml without PyYAML (fallback)."""
-    content = f"""status: {state['status']}
-current_phase: {state['current_phase']}
-created: {state['created']}
-updated: {state['updated']}
-phases:
-"""
-
-    for phase in state['phases']:
-        content += f"  - name: {phase['name']}\n"
-        content += f"    status: {phase['status']}\n"
-
-    state_path.write_text(content)
-
-
-def write_plan_state(state_path: Path, state: dict) -> None:
-    """Write plan-state.yml."""
-    if HAS_YAML:
-        import yaml
-        with open(state_path, 'w') as f:
-            yaml.dump(state, f, default_flow_style=False, sort_keys=False)
-    else:
-        write_plan_state_no_yaml(state_path, state)
+    return cached_parse(state_path, statefile.load)
 
 
 def read_feature_state(state_path: Path) -> dict:
@@ -113,213 +67,349 @@ def read_feature_state(state_path: Path) -> dict:
     if not state_path.exists():
         raise FileNotFoundError(f"state.yml not found at {state_path}")
 
-    if HAS_YAML:
-        import yaml
-        with open(state_path) as f:
-            return yaml.safe_load(f) or {}
-    else:
-        # Simple fallback parser for feature state.yml
-        state = {}
-        content = state_path.read_text()
-        for line in content.split('\n'):
-            stripped = line.strip()
-            if ':' in stripped and not stripped.startswith('#'):
-                key, value = stripped.split(':', 1)
-                state[key.strip()] = value.strip()
-        return state
-
-
-def write_feature_state(state_path: Path, state: dict) -> None:
-    """Write feature state.yml."""
-    if HAS_YAML:
-        import yaml
-        with open(state_path, 'w') as f:
-            yaml.dump(state, f, default_flow_style=False, sort_keys=False)
-    else:
-        # Simple fallback writer
-        content = '\n'.join(f"{k}: {v}" for k, v in state.items())
-        state_path.write_text(content)
-
-
-def update_feature_state_status(feature_name: str, new_status: str) -> None:
-    """Update feature state.yml status."""
-    today = date.today().strftime(cfg.defaults.date_format)
-    feature_path = cfg.get_feature_path(feature_name)
-    state_path = feature_path / "state.yml"
-
-    # Check feature exists
-    if not feature_path.exists():
-        print(f"[ERROR] Feature '{feature_name}' not found at {feature_path}")
-        sys.exit(1)
-
-    # Check state.yml exists
-    if not state_path.exists():
-        print(f"[ERROR] state.yml not found for '{feature_name}'")
-        sys.exit(1)
+    return cached_parse(state_path, statefile.load)
+
+
+class PlanSession:
+    """
+    Plan and feature state of one feature, read on first use, changed in
+    memory by apply() and written once by write().
+    """
+
+    def __init__(self, feature_name: str):
+        self.feature_name = feature_name
+        self.today = date.today().strftime(cfg.defaults.date_format)
+        self.feature_path = cfg.get_feature_path(feature_name)
+        self.impl_path = self.feature_path / "implementation-plan"
+        self.plan_path = self.impl_path / "plan-state.yml"
+        self.state_path = self.feature_path / "state.yml"
+        self._plan = None
+        self._feature_state = None
+        # As read, to journal the transitions on write
+        self._plan_before = None
+        self._state_before = None
+
+    def _check_feature(self) -> None:
+        if not self.feature_path.exists():
+            raise PlanStateError(f"Feature '{self.feature_name}' not found at {self.feature_path}")
+
+    @property
+    def plan(self) -> dict:
+        """plan-state.yml contents."""
+        if self._plan is None:
+            self._check_feature()
+            if not self.impl_path.exists() or not self.plan_path.exists():
+                raise PlanStateError(
+                    f"Implementation plan not found for '{self.feature_name}'",
+                    f"\nRun first: /define-implementation-plan {self.feature_name}"
+                )
+            try:
+                self._plan = read_plan_state(self.plan_path)
+            except Exception as e:
+                raise PlanStateError(f"Failed to read plan state: {e}")
+            self._plan_before = PlanState.decode(self._plan)
+        return self._plan
+
+    @property
+    def feature_state(self) -> dict:
+        """Feature state.yml contents."""
+        if self._feature_state is None:
+            self._check_feature()
+            if not self.state_path.exists():
+                raise PlanStateError(f"state.yml not found for '{self.feature_name}'")
+            try:
+                self._feature_state = read_feature_state(self.state_path)
+            except Exception as e:
+                raise PlanStateError(f"Failed to read feature state: {e}")
+            self._state_before = WorkflowState.decode(self._feature_state)
+        return self._feature_state
+
+    def apply(self, action: str, arg=None) -> list:
+        """Apply one action in memory; returns its report lines."""
+        if action not in VALID_ACTIONS:
+            raise PlanStateError(f"Invalid action: {action}", f"Valid actions: {', '.join(VALID_ACTIONS)}")
+
+        if action == 'update-feature-state':
+            if not arg:
+                raise PlanStateError(
+                    f"Feature status required for action: {action}",
+                    f"Usage: update-plan-state.py {self.feature_name} update-feature-state <status>"
+                )
+            return self._update_feature_status(arg)
+
+        phase_number = None
+        if arg is not None:
+            try:
+                phase_number = int(arg)
+            except (TypeError, ValueError):
+                raise PlanStateError(f"Invalid phase number: {arg}")
+        return self._update_plan(action, phase_number)
+
+    def _update_feature_status(self, new_status: str) -> list:
+        """Set the feature state.yml status."""
+        self._check_feature()
+        if not self.state_path.exists():
+            raise PlanStateError(f"state.yml not found for '{self.feature_name}'")
+        if new_status not in VALID_FEATURE_STATUSES:
+            raise PlanStateError(
+                f"Invalid status: {new_status}",
+                f"Valid statuses: {', '.join(VALID_FEATURE_STATUSES)}"
+            )
+
+        state = self.feature_state
+        old_status = WorkflowState.decode(state).status
+        state['status'] = new_status
+        state['updated'] = self.today
+
+        return [
+            f"[OK] Feature state updated for '{self.feature_name}'",
+            f"  Status: {old_status} → {new_status}",
+        ]
+
+    def _update_plan(self, action: str, phase_number: int = None) -> list:
+        """Apply a plan action to plan-state.yml."""
+        state = self.plan
+        today = self.today
+        total_phases = len(state.get('phases', []))
+
+        # Validate phase number for phase-specific actions
+        if action in PHASE_ACTIONS:
+            if phase_number is None:
+                raise PlanStateError(
+                    f"Phase number required for action: {action}",
+                    f"Usage: update-plan-state.py {self.feature_name} {action} <phase-number>"
+                )
+            if phase_number < 1 or phase_number > total_phases:
+                raise PlanStateError(f"Invalid phase number: {phase_number}", f"Valid range: 1-{total_phases}")
+
+        lines = []
+        if action == 'start-plan':
+            state['status'] = 'in-progress'
+            state['current_phase'] = 1
+            if total_phases > 0:
+                state['phases'][0]['status'] = 'in-progress'
+            state['updated'] = today
 
-    # Valid feature states
-    valid_statuses = ['clarifying', 'clarified', 'prd-draft', 'prd-approved', 'planning', 'in-progress', 'in-review', 'completed']
-    if new_status not in valid_statuses:
-        print(f"[ERROR] Invalid status: {new_status}")
-        print(f"Valid statuses: {', '.join(valid_statuses)}")
-        sys.exit(1)
+            lines.append(f"[OK] Plan execution started for '{self.feature_name}'")
+            lines.append(f"  Status: in-progress")
+            lines.append(f"  Current phase: 1 of {total_phases}")
+            if total_phases > 0:
+                lines.append(f"  Phase 1: {state['phases'][0]['name']} (in-progress)")
 
-    # Read current state
-    try:
-        state = read_feature_state(state_path)
-    except Exception as e:
-        print(f"[ERROR] Failed to read feature state: {e}")
-        sys.exit(1)
-
-    old_status = state.get('status', 'unknown')
-    state['status'] = new_status
-    state['updated'] = today
+        elif action == 'start-phase':
+            state['current_phase'] = phase_number
+            state['phases'][phase_number - 1]['status'] = 'in-progress'
+            state['updated'] = today
 
-    # Write updated state
-    try:
-        write_feature_state(state_path, state)
-    except Exception as e:
-        print(f"[ERROR] Failed to write feature state: {e}")
-        sys.exit(1)
+            phase_name = state['phases'][phase_number - 1]['name']
+            lines.append(f"[OK] Phase {phase_number} started: {phase_name}")
+            lines.append(f"  Status: in-progress")
+
+        elif action == 'complete-phase':
+            # Mark current phase as completed
+            state['phases'][phase_number - 1]['status'] = 'completed'
+
+            # If not last phase, start next phase
+            if phase_number < total_phases:
+                state['current_phase'] = phase_number + 1
+                state['phases'][phase_number]['status'] = 'in-progress'
+                state['updated'] = today
+
+                phase_name = state['phases'][phase_number - 1]['name']
+                next_phase_name = state['phases'][phase_number]['name']
+                lines.append(f"[OK] Phase {phase_number} completed: {phase_name}")
+                lines.append(f"  Next phase: {phase_number + 1} - {next_phase_name} (in-progress)")
+            else:
+                # Last phase - mark plan as completed
+                state['status'] = 'completed'
+                state['updated'] = today
+
+                phase_name = state['phases'][phase_number - 1]['name']
+                lines.append(f"[OK] Phase {phase_number} completed: {phase_name}")
+                lines.append(f"[OK] All phases completed!")
+                lines.append(f"  Plan status: completed")
+
+        elif action == 'complete-plan':
+            state['status'] = 'completed'
+            for phase in state['phases']:
+                phase['status'] = 'completed'
+            state['updated'] = today
 
-    print(f"[OK] Feature state updated for '{feature_name}'")
-    print(f"  Status: {old_status} → {new_status}")
-    print(f"\nUpdated: {state_path}")
+            lines.append(f"[OK] Plan completed for '{self.feature_name}'")
+            lines.append(f"  All {total_phases} phases marked as completed")
+
+        return lines
+
+    def validate(self) -> list:
+        """Consistency problems in the in-memory state (empty if none)."""
+        problems = []
+        if self._plan is not None:
+            phases = self._plan.get('phases', [])
+            if not isinstance(phases, list):
+                problems.append("plan-state.yml: phases is not a list")
+                phases = []
+            current = self._plan.get('current_phase', 0)
+            if not isinstance(current, int) or not 0 <= current <= len(phases):
+                problems.append(f"plan-state.yml: current_phase {current} outside 0-{len(phases)}")
+            for number, phase in enumerate(phases, 1):
+                if not isinstance(phase, dict) or 'name' not in phase:
+                    problems.append(f"plan-state.yml: phase {number} has no name")
+        if self._feature_state is not None:
+            status = self._feature_state.get('status')
+            if status not in VALID_FEATURE_STATUSES:
+                problems.append(f"state.yml: invalid status {status}")
+        return problems
+
+    def write(self) -> list:
+        """Write the changed files in one transaction; returns the paths written."""
+        txn = Transaction()
+        if self._plan is not None:
+            txn.patch(self.plan_path, self._plan)
+            journal.record_plan(self.feature_name, 'feature', self._plan_before,
+                                PlanState.decode(self._plan), txn)
+        if self._feature_state is not None:
+            txn.patch(self.state_path, self._feature_state)
+            journal.record_state(self.feature_name, 'feature', self._state_before,
+                                 WorkflowState.decode(self._feature_state), txn)
+        return txn.commit()
 
 
 def update_plan_state(feature_name: str, action: str, phase_number: int = None, feature_status: str = None) -> None:
-    """Update plan state based on action."""
-
-    # Handle feature state update action separately
-    if action == 'update-feature-state':
-        if not feature_status:
-            print(f"[ERROR] Feature status required for action: {action}")
-            print(f"Usage: update-plan-state.py {feature_name} update-feature-state <status>")
-            sys.exit(1)
-        update_feature_state_status(feature_name, feature_status)
-        return
-
-    today = date.today().strftime(cfg.defaults.date_format)
-    feature_path = cfg.get_feature_path(feature_name)
-    impl_path = feature_path / "implementation-plan"
-    state_path = impl_path / "plan-state.yml"
-
-    # Check feature exists
-    if not feature_path.exists():
-        print(f"[ERROR] Feature '{feature_name}' not found at {feature_path}")
-        sys.exit(1)
+    """Apply one action and write it (raises PlanStateError)."""
+    session = PlanSession(feature_name)
+    arg = feature_status if action == 'update-feature-state' else phase_number
+    lines = session.apply(action, arg)
 
-    # Check plan exists
-    if not impl_path.exists() or not state_path.exists():
-        print(f"[ERROR] Implementation plan not found for '{feature_name}'")
-        print(f"\nRun first: /define-implementation-plan {feature_name}")
-        sys.exit(1)
-
-    # Read current state
     try:
-        state = read_plan_state(state_path)
+        session.write()
     except Exception as e:
-        print(f"[ERROR] Failed to read plan state: {e}")
-        sys.exit(1)
-
-    total_phases = len(state.get('phases', []))
-
-    # Validate action
-    valid_actions = ['start-plan', 'start-phase', 'complete-phase', 'complete-plan', 'update-feature-state']
-    if action not in valid_actions:
-        print(f"[ERROR] Invalid action: {action}")
-        print(f"Valid actions: {', '.join(valid_actions)}")
-        sys.exit(1)
-
-    # Validate phase number for phase-specific actions
-    if action in ['start-phase', 'complete-phase']:
-        if phase_number is None:
-            print(f"[ERROR] Phase number required for action: {action}")
-            print(f"Usage: update-plan-state.py {feature_name} {action} <phase-number>")
-            sys.exit(1)
+        kind = "feature" if action == 'update-feature-state' else "plan"
+        raise PlanStateError(f"Failed to write {kind} state: {e}")
 
-        if phase_number < 1 or phase_number > total_phases:
-            print(f"[ERROR] Invalid phase number: {phase_number}")
-            print(f"Valid range: 1-{total_phases}")
-            sys.exit(1)
-
-    # Execute action
-    if action == 'start-plan':
-        state['status'] = 'in-progress'
-        state['current_phase'] = 1
-        if total_phases > 0:
-            state['phases'][0]['status'] = 'in-progress'
-        state['updated'] = today
-
-        print(f"[OK] Plan execution started for '{feature_name}'")
-        print(f"  Status: in-progress")
-        print(f"  Current phase: 1 of {total_phases}")
-        if total_phases > 0:
-            print(f"  Phase 1: {state['phases'][0]['name']} (in-progress)")
-
-    elif action == 'start-phase':
-        state['current_phase'] = phase_number
-        state['phases'][phase_number - 1]['status'] = 'in-progress'
-        state['updated'] = today
-
-        phase_name = state['phases'][phase_number - 1]['name']
-        print(f"[OK] Phase {phase_number} started: {phase_name}")
-        print(f"  Status: in-progress")
-
-    elif action == 'complete-phase':
-        # Mark current phase as completed
-        state['phases'][phase_number - 1]['status'] = 'completed'
-
-        # If not last phase, start next phase
-        if phase_number < total_phases:
-            state['current_phase'] = phase_number + 1
-            state['phases'][phase_number]['status'] = 'in-progress'
-            state['updated'] = today
+    for line in lines:
+        print(line)
+    updated = session.state_path if action == 'update-feature-state' else session.plan_path
+    print(f"\nUpdated: {updated}")
+
+
+def parse_batch_args(tokens: list) -> list:
+    """Split `action [arg] action [arg] ...` into (action, arg) steps."""
+    steps = []
+    tokens = list(tokens)
+    while tokens:
+        action = tokens.pop(0)
+        if action not in VALID_ACTIONS:
+            raise PlanStateError(f"Invalid action: {action}", f"Valid actions: {', '.join(VALID_ACTIONS)}")
+        arg = None
+        if action in PHASE_ACTIONS or action == 'update-feature-state':
+            if not tokens:
+                raise PlanStateError(f"Missing argument for action: {action}")
+            arg = tokens.pop(0)
+        steps.append((action, arg))
+    return steps
+
+
+def parse_batch_lines(lines) -> list:
+    """Read (action, arg) steps from JSON lines."""
+    steps = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise PlanStateError(f"Invalid JSON on line {lineno}: {e}")
+        if not isinstance(item, dict) or 'action' not in item:
+            raise PlanStateError(f"Line {lineno}: expected an object with an \"action\" key")
+        steps.append((item['action'], item.get('phase', item.get('status'))))
+    return steps
+
+
+def run_batch(feature_name: str, steps: list) -> dict:
+    """
+    Apply all steps to one in-memory state, validate, and write once.
+    Stops at the first failing action; nothing is written unless all succeed.
+    """
+    session = PlanSession(feature_name)
+    result = {
+        "status": "success",
+        "feature": feature_name,
+        "actions": [],
+        "written": []
+    }
 
-            phase_name = state['phases'][phase_number - 1]['name']
-            next_phase_name = state['phases'][phase_number]['name']
-            print(f"[OK] Phase {phase_number} completed: {phase_name}")
-            print(f"  Next phase: {phase_number + 1} - {next_phase_name} (in-progress)")
+    for action, arg in steps:
+        report = {"action": action, "arg": arg, "status": "skipped"}
+        if result["status"] == "success":
+            try:
+                report["messages"] = session.apply(action, arg)
+                report["status"] = "ok"
+            except PlanStateError as e:
+                report["status"] = "error"
+                report["error"] = str(e)
+                report["details"] = [d.strip() for d in e.details]
+                result["status"] = "error"
+        result["actions"].append(report)
+
+    if result["status"] == "success":
+        problems = session.validate()
+        if problems:
+            result["status"] = "invalid"
+            result["problems"] = problems
         else:
-            # Last phase - mark plan as completed
-            state['status'] = 'completed'
-            state['updated'] = today
-
-            phase_name = state['phases'][phase_number - 1]['name']
-            print(f"[OK] Phase {phase_number} completed: {phase_name}")
-            print(f"[OK] All phases completed!")
-            print(f"  Plan status: completed")
+            try:
+                result["written"] = [str(path) for path in session.write()]
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = f"Failed to write state: {e}"
 
-    elif action == 'complete-plan':
-        state['status'] = 'completed'
-        for phase in state['phases']:
-            phase['status'] = 'completed'
-        state['updated'] = today
+    return result
 
-        print(f"[OK] Plan completed for '{feature_name}'")
-        print(f"  All {total_phases} phases marked as completed")
-
-    # Write updated state
-    try:
-        write_plan_state(state_path, state)
-    except Exception as e:
-        print(f"[ERROR] Failed to write plan state: {e}")
-        sys.exit(1)
 
-    print(f"\nUpdated: {state_path}")
+def _fail(error: PlanStateError) -> None:
+    """Print an action error the way the single-action CLI always has and exit."""
+    print(f"[ERROR] {error}")
+    for line in error.details:
+        print(line)
+    sys.exit(1)
 
 
+@timing.instrument("update-plan-state")
 def main():
-    parser = argparse.ArgumentParser(description="Update implementation plan state")
+    parser = argparse.ArgumentParser(
+        description="Update implementation plan state",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
     parser.add_argument("feature", help="Feature name")
-    parser.add_argument("action",
-                       choices=['start-plan', 'start-phase', 'complete-phase', 'complete-plan', 'update-feature-state'],
+    parser.add_argument("action", nargs='?',
+                       choices=VALID_ACTIONS,
                        help="Action to perform")
     parser.add_argument("phase_or_status", nargs='?',
                        help="Phase number (for start-phase/complete-phase) or status (for update-feature-state)")
+    parser.add_argument("--batch", nargs='+', metavar="ACTION_OR_ARG",
+                       help="Apply a sequence of actions (action [arg] ...) and write once")
+    parser.add_argument("--stdin", action="store_true",
+                       help="Read batch actions as JSON lines from stdin")
 
     args = parser.parse_args()
 
+    modes = sum(bool(m) for m in (args.action, args.batch, args.stdin))
+    if modes != 1:
+        parser.error("give exactly one of: an action, --batch, or --stdin")
+
+    if args.batch or args.stdin:
+        try:
+            steps = parse_batch_args(args.batch) if args.batch else parse_batch_lines(sys.stdin)
+        except PlanStateError as e:
+            _fail(e)
+        result = run_batch(args.feature, steps)
+        print(json.dumps(result, indent=2))
+        if result["status"] != "success":
+            sys.exit(1)
+        return
+
     # Determine if third argument is phase number or feature status
     phase_number = None
     feature_status = None
@@ -333,7 +423,10 @@ def main():
             print(f"[ERROR] Invalid phase number: {args.phase_or_status}")
             sys.exit(1)
 
-    update_plan_state(args.feature, args.action, phase_number, feature_status)
+    try:
+        update_plan_state(args.feature, args.action, phase_number, feature_status)
+    except PlanStateError as e:
+        _fail(e)
 
 
 if __name__ == "__main__":
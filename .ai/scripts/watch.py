@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""Workspace watcher behind `get-workflow-info.py --watch`.
+
+Reports workflow state changes as events (dicts with an "event" key):
+
+  workflow_created      a feature, bug or idea with a state.yml appeared
+  workflow_removed      it is gone (cleanup, archive)
+  status_changed        its state.yml status changed
+  plan_status_changed   its plan-state.yml status changed (old is null for a new plan)
+  phase_started         a phase became in-progress
+  phase_completed       a phase became completed
+  context_changed       global-state.yml points at another workflow
+
+On Linux the watcher sleeps on inotify (through ctypes) on the workflow
+folders, their plan folders and the memory folder, and re-reads only the
+workflows that reported events. Elsewhere, or when inotify is unavailable or
+out of watches (fs.inotify.max_user_watches), it polls: every interval it
+stats the state files and re-reads the ones whose mtime or size changed.
+
+Events of a burst (a transaction replacing several files) are collected
+until the tree has been quiet for the debounce time, so every change is
+diffed once, against the final state.
+"""
+
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from config import cfg, read_global_state
+from model import Status, plan_state_path, read_plan, read_state
+from scanner import WORKFLOW_TYPES, iter_workflows
+
+DEFAULT_INTERVAL = 1.0  # Seconds between polls
+DEFAULT_DEBOUNCE = 0.1  # Quiet time that ends a burst
+MAX_DELAY = 1.0  # Longest a burst holds back its events
+
+PLAN_FOLDERS = ("implementation-plan", "fix-plan")
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Writes go through temp files renamed into place (transaction.py); in-place
+# writes end with IN_CLOSE_WRITE
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class WatchUnavailable(Exception):
+    """inotify can't be used (other platform, no libc support, out of watches)."""
+
+
+class Observed(NamedTuple):
+    """What the watcher tracks of one workflow."""
+    status: Optional[str]
+    plan_status: Optional[str]
+    phases: tuple  # (name, status) per phase
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def read_workflow(path: Path) -> Optional[Observed]:
+    """Observed state of a workflow folder (None until it has a readable state.yml)."""
+    state = read_state(path / "state.yml")
+    if state is None:
+        return None
+    plan = read_plan(plan_state_path(path))
+    if plan is None:
+        return Observed(state.status, None, ())
+    return Observed(state.status, plan.status, tuple((phase.name, phase.status) for phase in plan.phases))
+
+
+def read_context() -> tuple:
+    """(name, workflow_type) of the current context."""
+    current = read_global_state().get('current') or {}
+    return current.get('name'), current.get('workflow_type')
+
+
+def diff_workflow(workflow_type: str, name: str, old: Optional[Observed],
+                  new: Optional[Observed]) -> list:
+    """Events turning `old` into `new` (None: no workflow)."""
+    base = {"workflow_type": workflow_type, "name": name}
+    if old is None and new is None:
+        return []
+    if old is None:
+        return [{"event": "workflow_created", **base, "status": new.status, "plan_status": new.plan_status}]
+    if new is None:
+        return [{"event": "workflow_removed", **base}]
+
+    events = []
+    if new.status != old.status:
+        events.append({"event": "status_changed", **base, "old": old.status, "new": new.status})
+    if new.plan_status != old.plan_status:
+        events.append({"event": "plan_status_changed", **base, "old": old.plan_status, "new": new.plan_status})
+    for number, (phase_name, status) in enumerate(new.phases, 1):
+        before = old.phases[number - 1][1] if number <= len(old.phases) else None
+        if status == before:
+            continue
+        if status == Status.IN_PROGRESS:
+            events.append({"event": "phase_started", **base, "phase": number, "phase_name": phase_name})
+        elif status == Status.COMPLETED:
+            events.append({"event": "phase_completed", **base, "phase": number, "phase_name": phase_name})
+    return events
+
+
+class Workspace:
+    """
+    The watched state of every workflow plus the current context. refresh()
+    re-reads what a source reported dirty and returns the events:
+      "all"                     everything
+      "context"                 global-state.yml
+      ("base", type)            the list of workflows of a type
+      ("workflow", type, name)  one workflow's state files
+    """
+
+    def __init__(self, types: tuple = WORKFLOW_TYPES):
+        self.types = types
+        self.source = None
+        self.context = None
+        self.workflows = {}  # (type, name) -> Observed or None
+        for entry in iter_workflows(types, cfg=cfg, artifacts=False):
+            self.workflows[(entry.workflow_type, entry.name)] = None
+
+    def load(self) -> None:
+        """Read the context and every workflow (after the source is watching them)."""
+        self.context = read_context()
+        for workflow_type, name in self.workflows:
+            self.workflows[(workflow_type, name)] = read_workflow(self.path(workflow_type, name))
+
+    def path(self, workflow_type: str, name: str) -> Path:
+        return cfg.get_workflow_base_path(workflow_type) / name
+
+    def _list(self, workflow_type: str) -> set:
+        return {entry.name for entry in iter_workflows((workflow_type,), cfg=cfg, artifacts=False)}
+
+    def refresh(self, dirty: set) -> list:
+        if "all" in dirty:
+            dirty = {"context", *(("base", workflow_type) for workflow_type in self.types)}
+            dirty.update(("workflow",) + key for key in self.workflows)
+
+        # New workflows first: a source that runs out of watches raises here,
+        # before anything is reported, and the caller refreshes "all" instead
+        changed = {key[1:] for key in dirty if key[0] == "workflow"}
+        for key in dirty:
+            if key[0] != "base":
+                continue
+            workflow_type = key[1]
+            names = self._list(workflow_type)
+            known = {name for known_type, name in self.workflows if known_type == workflow_type}
+            for name in names - known:
+                if self.source is not None:
+                    self.source.track(workflow_type, name, self.path(workflow_type, name))
+                self.workflows[(workflow_type, name)] = None
+                changed.add((workflow_type, name))
+            for name in known - names:
+                changed.add((workflow_type, name))
+
+        events = []
+        if "context" in dirty:
+            context = read_context()
+            if context != self.context:
+                events.append({
+                    "event": "context_changed",
+                    "old": {"name": self.context[0], "workflow_type": self.context[1]},
+                    "new": {"name": context[0], "workflow_type": context[1]},
+                })
+                self.context = context
+
+        for workflow_type, name in sorted(changed):
+            key = (workflow_type, name)
+            if key not in self.workflows:
+                continue  # Reported by a watch on a folder that has since gone
+            path = self.path(workflow_type, name)
+            new = read_workflow(path) if path.is_dir() else None
+            events.extend(diff_workflow(workflow_type, name, self.workflows[key], new))
+            if path.is_dir():
+                self.workflows[key] = new
+            else:
+                del self.workflows[key]
+                if self.source is not None:
+                    self.source.untrack(workflow_type, name, path)
+
+        now = _now()
+        for event in events:
+            event["time"] = now
+        return events
+
+
+class InotifySource:
+    """Dirty keys from inotify events on the workspace folders."""
+
+    mode = "inotify"
+
+    def __init__(self, workspace: Workspace):
+        if not sys.platform.startswith("linux"):
+            raise WatchUnavailable(f"inotify is not available on {sys.platform}")
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            init = libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise WatchUnavailable(f"inotify is not available: {e}")
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise WatchUnavailable(f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        self.watches = {}  # wd -> (kind, key, path)
+        self.wds = {}  # path -> wd
+
+        # Folders that may be created later are found through their parent
+        self.pending = {}  # parent path -> {child name: (kind, key)}
+        memory = cfg.get_memory_path()
+        self._watch_or_wait(memory, ("memory", "context"))
+        for workflow_type in workspace.types:
+            self._watch_or_wait(cfg.get_workflow_base_path(workflow_type), ("base", ("base", workflow_type)))
+        try:
+            for workflow_type, name in workspace.workflows:
+                self.track(workflow_type, name, workspace.path(workflow_type, name))
+        except WatchUnavailable:
+            self.close()
+            raise
+
+    def _add(self, path: Path, target: tuple) -> bool:
+        """Watch a folder for target (kind, key); False if it doesn't exist (any more)."""
+        path = os.fspath(path)
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            if self._ctypes.get_errno() == errno.ENOSPC:
+                raise WatchUnavailable("out of inotify watches (fs.inotify.max_user_watches)")
+            return False
+        self.watches[wd] = (*target, path)
+        self.wds[path] = wd
+        return True
+
+    def _watch_or_wait(self, path: Path, target: tuple) -> None:
+        if not self._add(path, target):
+            self.pending.setdefault(os.fspath(path.parent), {})[path.name] = target
+            self._add(path.parent, ("parent", os.fspath(path.parent)))
+
+    def track(self, workflow_type: str, name: str, path: Path) -> None:
+        """Watch a workflow folder and its plan folders."""
+        key = ("workflow", workflow_type, name)
+        self._add(path, ("workflow", key))
+        for folder in PLAN_FOLDERS:
+            self._add(path / folder, ("plan", key))
+
+    def untrack(self, workflow_type: str, name: str, path: Path) -> None:
+        """Drop the watches of a removed (or moved away) workflow."""
+        for watched in (path, *(path / folder for folder in PLAN_FOLDERS)):
+            wd = self.wds.pop(os.fspath(watched), None)
+            if wd is not None and self.watches.pop(wd, None) is not None:
+                self._rm_watch(self.fd, wd)
+
+    def _read(self, timeout: Optional[float]) -> set:
+        """Dirty keys of the events that arrive within `timeout` (None: block)."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        dirty = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode(
+                "utf-8", "surrogateescape")
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                dirty.add("all")
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches:
+                continue
+            kind, key, path = self.watches[wd]
+            gone = mask & (IN_DELETE_SELF | IN_MOVE_SELF)
+            if kind in ("memory", "base"):
+                if gone:
+                    # Wait for the folder to be created again
+                    self.wds.pop(path, None)
+                    self._watch_or_wait(Path(path), (kind, key))
+                    dirty.add(key)
+                elif kind == "base" and name and not name.startswith("."):
+                    dirty.add(key)
+                elif kind == "memory" and name == cfg.get_global_state_path().name:
+                    dirty.add(key)
+            elif kind == "workflow":
+                if name in PLAN_FOLDERS and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add(Path(path) / name, ("plan", key))
+                if name in ("state.yml", *PLAN_FOLDERS) or gone:
+                    dirty.add(key)
+            elif kind == "plan":
+                if name == "plan-state.yml" or gone:
+                    dirty.add(key)
+            elif kind == "parent":
+                waiting = self.pending.get(key, {})
+                if name in waiting and mask & (IN_CREATE | IN_MOVED_TO):
+                    child = waiting.pop(name)
+                    self._add(Path(key) / name, child)
+                    dirty.add(child[1])
+        return dirty
+
+    def wait(self, timeout: Optional[float]) -> set:
+        return self._read(timeout)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollSource:
+    """Dirty keys from comparing state file mtimes and sizes every interval."""
+
+    mode = "poll"
+
+    def __init__(self, workspace: Workspace, interval: float = DEFAULT_INTERVAL):
+        self.workspace = workspace
+        self.interval = interval
+        self.context = self._signature(cfg.get_global_state_path())
+        self.bases = {
+            workflow_type: self._signature(cfg.get_workflow_base_path(workflow_type))
+            for workflow_type in workspace.types
+        }
+        self.signatures = {}  # (type, name) -> signatures of its state files
+        for workflow_type, name in workspace.workflows:
+            self.track(workflow_type, name, workspace.path(workflow_type, name))
+
+    @staticmethod
+    def _signature(path) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _workflow_signature(self, path: Path) -> tuple:
+        return (self._signature(path / "state.yml"),
+                *(self._signature(path / folder / "plan-state.yml") for folder in PLAN_FOLDERS))
+
+    def track(self, workflow_type: str, name: str, path: Path) -> None:
+        self.signatures[(workflow_type, name)] = self._workflow_signature(path)
+
+    def untrack(self, workflow_type: str, name: str, path: Path) -> None:
+        self.signatures.pop((workflow_type, name), None)
+
+    def _check(self) -> set:
+        dirty = set()
+        context = self._signature(cfg.get_global_state_path())
+        if context != self.context:
+            self.context = context
+            dirty.add("context")
+        # A folder's mtime changes when workflows are added or removed
+        for workflow_type, signature in self.bases.items():
+            current = self._signature(cfg.get_workflow_base_path(workflow_type))
+            if current != signature:
+                self.bases[workflow_type] = current
+                dirty.add(("base", workflow_type))
+        for (workflow_type, name), signature in self.signatures.items():
+            current = self._workflow_signature(self.workspace.path(workflow_type, name))
+            if current != signature:
+                self.signatures[(workflow_type, name)] = current
+                dirty.add(("workflow", workflow_type, name))
+        return dirty
+
+    def wait(self, timeout: Optional[float]) -> set:
+        while True:
+            time.sleep(self.interval if timeout is None else timeout)
+            dirty = self._check()
+            if dirty or timeout is not None:
+                return dirty
+
+    def close(self) -> None:
+        pass
+
+
+def watch(emit, name: str = None, poll: bool = False, interval: float = DEFAULT_INTERVAL,
+          debounce: float = DEFAULT_DEBOUNCE) -> None:
+    """
+    Call emit(event) for every change until interrupted. The first event is
+    "watching" (mode, workflow count); with `name`, workflow events are
+    limited to that workflow.
+    """
+    workspace = Workspace()
+    fallback = None
+    source = None
+    if not poll:
+        try:
+            source = InotifySource(workspace)
+        except WatchUnavailable as e:
+            fallback = str(e)
+    if source is None:
+        source = PollSource(workspace, interval)
+    workspace.source = source
+    workspace.load()
+
+    emit({"event": "watching", "mode": source.mode, "workflows": len(workspace.workflows),
+          "fallback_reason": fallback, "time": _now()})
+    try:
+        while True:
+            dirty = source.wait(None)
+            deadline = time.monotonic() + MAX_DELAY
+            while time.monotonic() < deadline:
+                more = source.wait(debounce)
+                if not more:
+                    break
+                dirty |= more
+
+            try:
+                events = workspace.refresh(dirty)
+            except WatchUnavailable as e:
+                # Out of watches for new workflows: poll from here on
+                source.close()
+                source = workspace.source = PollSource(workspace, interval)
+                events = workspace.refresh({"all"})
+                events.insert(0, {"event": "watching", "mode": source.mode,
+                                  "workflows": len(workspace.workflows),
+                                  "fallback_reason": str(e), "time": _now()})
+
+            for event in events:
+                if name is None or event.get("name", name) == name:
+                    emit(event)
+    finally:
+        source.close()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Workflow Index
+Persistent SQLite index of every feature, bug and idea, stored in
+.ai/memory/workflow-index.sqlite. One row per workflow holds its type, status,
+dates, plan status, current phase, phase count and artifact flags.
+
+Rows refresh incrementally: a workflow is re-read only when the mtime/size of
+its state.yml or plan-state.yml, or the mtime of its folder (artifact added or
+removed), changed since the last refresh.
+
+Usage:
+  python workflow_index.py refresh                     # Sync the index with the tree (JSON output)
+  python workflow_index.py query                       # List all workflows (JSON output)
+  python workflow_index.py query --status in-progress --type bug --updated-after 2026-01-01
+  python workflow_index.py list --no-refresh           # Answer from the index without a stat sweep
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+if __name__ == "__main__":
+    # Hand the invocation to the workflow daemon when one is running
+    from daemon import forward
+    forward("index")
+
+try:
+    from config import cfg
+    from model import PlanState, WorkflowState
+    from scanner import iter_workflows, load_entry
+    import statefile
+    import timing
+except ImportError:
+    print("✗ Error: Could not import config module", file=sys.stderr)
+    sys.exit(1)
+
+
+INDEX_FILENAME = "workflow-index.sqlite"
+SCHEMA_VERSION = 1
+
+# Artifact file/folder name -> flag column
+ARTIFACT_COLUMNS = {
+    "context.md": "has_context",
+    "prd.md": "has_prd",
+    "implementation-plan": "has_implementation_plan",
+    "triage.md": "has_triage",
+    "fix-plan.md": "has_fix_plan",
+}
+
+COLUMNS = [
+    "type", "name", "status", "created", "updated",
+    "plan_status", "current_phase", "phase_count",
+    *ARTIFACT_COLUMNS.values(),
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS workflows (
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT,
+    created TEXT,
+    updated TEXT,
+    plan_status TEXT,
+    current_phase INTEGER,
+    phase_count INTEGER,
+    {", ".join(f"{col} INTEGER NOT NULL DEFAULT 0" for col in ARTIFACT_COLUMNS.values())},
+    signature TEXT NOT NULL,
+    PRIMARY KEY (type, name)
+);
+CREATE INDEX IF NOT EXISTS idx_workflows_status ON workflows (status);
+CREATE INDEX IF NOT EXISTS idx_workflows_updated ON workflows (updated);
+"""
+
+
+def get_index_path() -> Path:
+    """Get path to the SQLite index file."""
+    return cfg.get_memory_path() / INDEX_FILENAME
+
+
+def connect(index_path: Path = None):
+    """Open the index, creating or rebuilding the schema as needed."""
+    import sqlite3
+
+    index_path = index_path or get_index_path()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(index_path))
+    conn.row_factory = sqlite3.Row
+
+    version = None
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        version = int(row[0]) if row else None
+    except sqlite3.OperationalError:
+        pass
+
+    if version != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS workflows; DROP TABLE IF EXISTS meta;")
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+
+    return conn
+
+
+def _stat_key(path: str) -> str:
+    """Compact mtime/size fingerprint of a file ('-' if missing)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _plan_state_path(workflow_dir: str) -> str:
+    """Locate plan-state.yml (implementation-plan for features, fix-plan for bugs)."""
+    for folder in ("implementation-plan", "fix-plan"):
+        path = os.path.join(workflow_dir, folder, "plan-state.yml")
+        if os.path.exists(path):
+            return path
+    return os.path.join(workflow_dir, "implementation-plan", "plan-state.yml")
+
+
+def _read_yaml(path: str) -> dict:
+    """Read a state or plan file into a dict ({} if missing or unreadable)."""
+    try:
+        return statefile.load(path)
+    except (OSError, statefile.StateFileError):
+        return {}
+
+
+def _as_text(value):
+    """Normalize YAML scalars (ints, floats) to the strings stored in the index."""
+    return None if value is None else str(value)
+
+
+def _as_int(value):
+    """Parse an optional integer value."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_workflow_row(workflow_type: str, name: str, workflow_dir: str, artifacts: set) -> dict:
+    """Build an index row for one workflow folder."""
+    state = WorkflowState.decode(_read_yaml(os.path.join(workflow_dir, "state.yml")))
+    plan_data = _read_yaml(_plan_state_path(workflow_dir))
+    plan = PlanState.decode(plan_data) if plan_data else None
+
+    row = {
+        "type": workflow_type,
+        "name": name,
+        "status": _as_text(state.status),
+        "created": _as_text(state.created),
+        "updated": _as_text(state.updated),
+        "plan_status": _as_text(plan.status) if plan else None,
+        "current_phase": _as_int(plan.current_phase) if plan else None,
+        "phase_count": len(plan.phases) if plan else None,
+    }
+    for artifact, column in ARTIFACT_COLUMNS.items():
+        row[column] = int(artifact in artifacts)
+    return row
+
+
+def refresh(conn) -> dict:
+    """Incrementally sync the index with the workflow folders on disk."""
+    known = {
+        (row["type"], row["name"]): row["signature"]
+        for row in conn.execute("SELECT type, name, signature FROM workflows")
+    }
+    seen = set()
+    upserts = []
+
+    # Folders are listed without their contents; only changed workflows are
+    # opened (for artifacts) and parsed
+    for entry in iter_workflows(cfg=cfg, artifacts=False):
+        key = (entry.workflow_type, entry.name)
+        seen.add(key)
+
+        workflow_dir = str(entry.path)
+        signature = "|".join((
+            _stat_key(workflow_dir),
+            _stat_key(os.path.join(workflow_dir, "state.yml")),
+            _stat_key(_plan_state_path(workflow_dir)),
+        ))
+        if known.get(key) == signature:
+            continue
+
+        loaded = load_entry(entry.workflow_type, entry.path)
+        if loaded is None:
+            continue
+        row = read_workflow_row(entry.workflow_type, entry.name, workflow_dir, loaded.artifacts)
+        row["signature"] = signature
+        upserts.append(row)
+
+    removed = [key for key in known if key not in seen]
+
+    columns = COLUMNS + ["signature"]
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO workflows ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            [tuple(row[col] for col in columns) for row in upserts],
+        )
+        conn.executemany("DELETE FROM workflows WHERE type = ? AND name = ?", removed)
+
+    return {
+        "scanned": len(seen),
+        "updated": len(upserts),
+        "removed": len(removed),
+    }
+
+
+def _split(values: list) -> list:
+    """Flatten repeatable, comma-separated filter values."""
+    result = []
+    for value in values or []:
+        result.extend(v.strip() for v in value.split(",") if v.strip())
+    return result
+
+
+def query(conn, types: list = None, statuses: list = None, plan_statuses: list = None,
+          name: str = None, updated_after: str = None, updated_before: str = None,
+          created_after: str = None, created_before: str = None,
+          limit: int = None, offset: int = 0) -> list:
+    """Query workflows from the index; dates compare as ISO strings."""
+    clauses = []
+    params = []
+
+    for column, values in (("type", types), ("status", statuses), ("plan_status", plan_statuses)):
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    if name:
+        clauses.append("name LIKE ?")
+        params.append(f"%{name}%")
+    for column, op, value in (
+        ("updated", ">", updated_after),
+        ("updated", "<", updated_before),
+        ("created", ">", created_after),
+        ("created", "<", created_before),
+    ):
+        if value:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+
+    sql = f"SELECT {', '.join(COLUMNS)} FROM workflows"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY type, name"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+    workflows = []
+    for row in conn.execute(sql, params):
+        item = dict(row)
+        for column in ARTIFACT_COLUMNS.values():
+            item[column] = bool(item[column])
+        workflows.append(item)
+    return workflows
+
+
+@timing.instrument("index")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query the persistent workflow index",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    subparsers.add_parser("refresh", help="Sync the index with workflow folders")
+
+    query_parser = subparsers.add_parser("query", aliases=["list"], help="List workflows matching filters")
+    query_parser.add_argument("--type", action="append", help="Workflow type(s): feature, bug, idea")
+    query_parser.add_argument("--status", action="append", help="Workflow status(es)")
+    query_parser.add_argument("--plan-status", action="append", help="Plan status(es)")
+    query_parser.add_argument("--name", help="Substring of the workflow name")
+    query_parser.add_argument("--updated-after", help="Only workflows updated after this date (YYYY-MM-DD)")
+    query_parser.add_argument("--updated-before", help="Only workflows updated before this date (YYYY-MM-DD)")
+    query_parser.add_argument("--created-after", help="Only workflows created after this date (YYYY-MM-DD)")
+    query_parser.add_argument("--created-before", help="Only workflows created before this date (YYYY-MM-DD)")
+    query_parser.add_argument("--limit", type=int, help="Maximum number of results")
+    query_parser.add_argument("--offset", type=int, default=0, help="Skip this many results")
+    query_parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Answer from the index as-is, without checking files for changes"
+    )
+
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.action == "refresh":
+            result = {"status": "success", "index": str(get_index_path()), **refresh(conn)}
+        else:
+            refreshed = None if args.no_refresh else refresh(conn)
+            workflows = query(
+                conn,
+                types=_split(args.type),
+                statuses=_split(args.status),
+                plan_statuses=_split(args.plan_status),
+                name=args.name,
+                updated_after=args.updated_after,
+                updated_before=args.updated_before,
+                created_after=args.created_after,
+                created_before=args.created_before,
+                limit=args.limit,
+                offset=args.offset,
+            )
+            result = {
+                "status": "success",
+                "refreshed": refreshed,
+                "count": len(workflows),
+                "workflows": workflows
+            }
+    finally:
+        conn.close()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()